@@ -1,17 +1,29 @@
 from collections.abc import AsyncGenerator
 from typing import cast
 
+from calculator import CALCULATOR_TOOL_NAMES
+from catalog import CATALOG_TOOL_NAME, get_dataset_catalog
 from config import config
-from initialize import get_prompts, get_tools
+from gazetteer import GAZETTEER_TOOL_NAME, get_gazetteer
+from initialize import discovery_report, get_prompts, get_tools
 from langfuse import get_client
 from langfuse.types import TraceContext
 from llama_index.core.agent.workflow import ReActAgent
 from llama_index.core.prompts import PromptTemplate
 from llama_index.llms.litellm import LiteLLM
+from llm_client import get_shared_llm
 from logging_config import get_logger
+from observation_encoding import get_observation_encoder
+from observations import READ_TOOL_NAME, get_observation_spill
 from openinference.instrumentation.llama_index import LlamaIndexInstrumentor
+from parallel_agent import ParallelReActAgent, add_parallel_actions_prompt
+from prefetch import start_prefetch
+from prompt_cache import CachedReActChatFormatter
 from schemas import Config, LLMConfig
+from tool_journal import JournaledReActAgent
+from tool_retrieval import ToolRetriever
 from workflows.events import Event
+from workspace import run_in_workspace, temp_workspace
 
 langfuse = get_client()
 LlamaIndexInstrumentor().instrument()
@@ -22,6 +34,8 @@ logger = get_logger(__name__)
 def get_llm(specific_config: LLMConfig | None = None) -> LiteLLM:
     """Get the LLM model.
 
+    The client and its connection pool are shared by every request using the same config.
+
     Returns:
         A configured ChatLiteLLM instance
     """
@@ -29,17 +43,10 @@ def get_llm(specific_config: LLMConfig | None = None) -> LiteLLM:
         specific_config = config.llm
 
     logger.info("Getting LLM with model: %s", specific_config.model)
-    return LiteLLM(
-        model=specific_config.model,
-        temperature=specific_config.temperature,
-        additional_kwargs={
-            "stop": ["Observation:"],
-            "aws_region_name": specific_config.region_name,
-        },
-    )
+    return get_shared_llm(specific_config)
 
 
-async def create_agent(specific_config: Config | None = None) -> ReActAgent:
+async def create_agent(specific_config: Config | None = None) -> JournaledReActAgent:
     """Create a ReAct agent with the given LLM, tools and system prompt.
 
     Returns:
@@ -51,17 +58,76 @@ async def create_agent(specific_config: Config | None = None) -> ReActAgent:
     logger.info("Creating agent")
     prompts = get_prompts()
     tools = await get_tools(specific_config.mcp)
+    observation_encoder = get_observation_encoder(specific_config.agent.observations)
+    # Spilled observations stay readable, the catalog searchable and country names
+    # resolvable whatever the question, when tool retrieval is enabled
+    always_include: list[str] = []
+    observation_spill = get_observation_spill(specific_config.agent.observations)
+    if observation_spill is not None:
+        tools = [*tools, *observation_spill.get_tools()]
+        always_include.append(READ_TOOL_NAME)
+    catalog = get_dataset_catalog(specific_config.agent.catalog, specific_config.mcp)
+    if catalog is not None:
+        catalog.schedule_refresh()
+        tools = [*tools, *catalog.get_tools()]
+        always_include.append(CATALOG_TOOL_NAME)
+    gazetteer = get_gazetteer(specific_config.agent.gazetteer)
+    if gazetteer is not None:
+        tools = [*tools, *gazetteer.get_tools()]
+        always_include.append(GAZETTEER_TOOL_NAME)
     llm = get_llm(specific_config.llm)
-
-    agent = ReActAgent(
-        tools=tools,
-        llm=llm,
-        system_prompt=prompts.system_prompt,
-    )
+    # Calculator tools take references to the numeric tables stored from observations
+    column_tools = list(CALCULATOR_TOOL_NAMES)
+    tool_retriever: ToolRetriever | None = None
+    retrieval_config = specific_config.agent.tool_retrieval
+    if retrieval_config.enabled:
+        tool_retriever = ToolRetriever(
+            tools,
+            retrieval_config,
+            always_include=always_include,
+            chains=[
+                discovery_report[server].tool_names
+                for server in retrieval_config.chained_servers
+                if server in discovery_report
+            ],
+        )
+
+    header_prompt = prompts.header_prompt
+    formatter = CachedReActChatFormatter.from_defaults(context=prompts.system_prompt)
+    if specific_config.agent.parallel_tool_calls:
+        header_prompt = add_parallel_actions_prompt(header_prompt, prompts.parallel_actions_prompt)
+        agent: JournaledReActAgent = ParallelReActAgent(
+            tools=None if tool_retriever else tools,
+            tool_retriever=tool_retriever,
+            llm=llm,
+            system_prompt=prompts.system_prompt,
+            formatter=formatter,
+            max_repeated_tool_calls=specific_config.agent.max_repeated_tool_calls,
+            unreplayable_tools=specific_config.mcp.tool_cache.uncacheable_tools,
+            observation_encoder=observation_encoder,
+            observation_spill=observation_spill,
+            observation_store_config=specific_config.agent.observation_store,
+            column_tools=column_tools,
+            max_parallel_tool_calls=specific_config.agent.max_parallel_tool_calls,
+        )
+    else:
+        agent = JournaledReActAgent(
+            tools=None if tool_retriever else tools,
+            tool_retriever=tool_retriever,
+            llm=llm,
+            system_prompt=prompts.system_prompt,
+            formatter=formatter,
+            max_repeated_tool_calls=specific_config.agent.max_repeated_tool_calls,
+            unreplayable_tools=specific_config.mcp.tool_cache.uncacheable_tools,
+            observation_encoder=observation_encoder,
+            observation_spill=observation_spill,
+            observation_store_config=specific_config.agent.observation_store,
+            column_tools=column_tools,
+        )
 
     agent.update_prompts(
         {
-            "react_header": PromptTemplate(prompts.header_prompt),
+            "react_header": PromptTemplate(header_prompt),
         }
     )
     logger.info("Agent created")
@@ -145,12 +211,14 @@ def build_conversation_prompt(
     return "\n".join(lines)
 
 
-async def run_agent(
+async def run_agent(  # noqa: PLR0913
     agent: ReActAgent,
     prompt_text: str,
     trace_id: str,
     session_id: str,
     tags: list[str] | None = None,
+    specific_config: Config | None = None,
+    question: str | None = None,
 ) -> AsyncGenerator[Event, None]:
     """Run a ReAct agent with the given inputs and stream the results.
 
@@ -160,10 +228,16 @@ async def run_agent(
         trace_id: The trace ID to associate with this model
         session_id: The session ID to associate with this model
         tags: List of tags to associate with the trace
+        specific_config: Config the agent was built from, the global config by default
+        question: The latest user message, matched against the prefetch keywords so earlier
+            turns do not trigger it. The whole prompt by default
 
     Yields:
         Chunks of the agent's response stream
     """
+    if specific_config is None:
+        specific_config = config
+
     logger.info("Running agent with prompt: %s", prompt_text)
     with langfuse.start_as_current_span(
         trace_context=TraceContext(trace_id=trace_id),
@@ -172,15 +246,28 @@ async def run_agent(
     ) as root_span:
         root_span.update_trace(session_id=session_id, tags=tags)
         try:
-            handler = agent.run(prompt_text)  # type: ignore[arg-type]
-
-            async for chunk in handler.stream_events():
-                if hasattr(chunk, "delta") and chunk.delta == "":
-                    continue
-                yield chunk
-
-            response = cast("Event", await handler)
-            yield response
+            async with temp_workspace(specific_config.mcp) as workspace:
+                # The prefetched result is only reused through the tool cache
+                if specific_config.mcp.tool_cache.enabled:
+                    run_in_workspace(
+                        workspace,
+                        start_prefetch,
+                        agent,
+                        question or prompt_text,
+                        specific_config.agent.prefetch,
+                    )
+                handler = run_in_workspace(workspace, agent.run, prompt_text)  # type: ignore[misc]
+
+                async for chunk in handler.stream_events():
+                    if hasattr(chunk, "delta") and chunk.delta == "":
+                        continue
+                    yield chunk
+
+                response = cast("Event", await handler)
+                if isinstance(agent, JournaledReActAgent):
+                    journal = agent.get_journal(handler.ctx)  # type: ignore[arg-type]
+                    root_span.update(metadata={"tool_journal": journal.stats})  # type: ignore[misc]
+                yield response
         except Exception as e:
             msg = f"Error running agent: {e}"
             logger.exception(msg)
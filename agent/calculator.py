@@ -1,44 +1,123 @@
-from __future__ import annotations
+from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 from llama_index.core.tools.function_tool import FunctionTool
 from logging_config import get_logger
+from observation_store import StoredColumn
 
 logger = get_logger(__name__)
 
+# A number, a list of numbers, or a "<handle>.<column>" reference the agent resolves to a
+# `StoredColumn`
+Operand = float | list[float] | str
 
-def add(a: float, b: float) -> dict[str, float | dict[str, float]]:
+Result = dict[str, float | None | list[float | None] | dict[str, float | list[float] | str]]
+
+COLUMN_NOTE = (
+    'Numbers may be lists or stored table columns such as "t1.value", computed element-wise.'
+)
+
+MAX_PERCENTILE = 100.0
+
+SERIES_NOTE = 'Values may be a list or a stored table column such as "t1.value".'
+
+# Names of the tools returned by `get_calculator_tools`
+CALCULATOR_TOOL_NAMES = (
+    "add",
+    "subtract",
+    "multiply",
+    "divide",
+    "percentage",
+    "sum",
+    "mean",
+    "median",
+    "percentiles",
+    "growth_rates",
+    "weighted_average",
+)
+
+
+def _values(value: Operand | StoredColumn) -> npt.NDArray[np.float64]:
+    if isinstance(value, StoredColumn):
+        return value.values
+    if isinstance(value, list):
+        return np.asarray(value, dtype=np.float64)
+    return np.asarray(float(value))
+
+
+def _series(values: Operand | StoredColumn) -> npt.NDArray[np.float64]:
+    """The values as a one-dimensional array.
+
+    Raises:
+        ValueError: If there is no value, missing ones aside
+    """
+    series = np.atleast_1d(_values(values))
+    if np.isnan(series).all():
+        msg = "No values given"
+        logger.error(msg)
+        raise ValueError(msg)
+    return series
+
+
+def _argument(value: Operand | StoredColumn) -> float | list[float] | str:
+    """The argument as the model wrote it, a reference instead of the column it points to."""
+    return value.reference if isinstance(value, StoredColumn) else value
+
+
+def _result(values: npt.NDArray[np.floating[Any]]) -> float | None | list[float | None]:
+    """The values as JSON numbers, missing ones (NaN) as null."""
+    if values.ndim == 0:
+        return None if np.isnan(values) else float(values)
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def add(a: Operand, b: Operand) -> Result:
     """Return the sum of a and b."""
     logger.info("Adding %s and %s", a, b)
-    return {"result": float(a) + float(b), "input_arguments": {"a": a, "b": b}}
+    return {
+        "result": _result(_values(a) + _values(b)),
+        "input_arguments": {"a": _argument(a), "b": _argument(b)},
+    }
 
 
-def subtract(a: float, b: float) -> dict[str, float | dict[str, float]]:
+def subtract(a: Operand, b: Operand) -> Result:
     """Return the difference a - b."""
     logger.info("Subtracting %s and %s", a, b)
-    return {"result": float(a) - float(b), "input_arguments": {"a": a, "b": b}}
+    return {
+        "result": _result(_values(a) - _values(b)),
+        "input_arguments": {"a": _argument(a), "b": _argument(b)},
+    }
 
 
-def multiply(a: float, b: float) -> dict[str, float | dict[str, float]]:
+def multiply(a: Operand, b: Operand) -> Result:
     """Return the product a * b."""
     logger.info("Multiplying %s and %s", a, b)
-    return {"result": float(a) * float(b), "input_arguments": {"a": a, "b": b}}
+    return {
+        "result": _result(_values(a) * _values(b)),
+        "input_arguments": {"a": _argument(a), "b": _argument(b)},
+    }
 
 
-def divide(a: float, b: float) -> dict[str, float | dict[str, float]]:
+def divide(a: Operand, b: Operand) -> Result:
     """Return the quotient a / b.
 
     Raises:
         ValueError: If b == 0
     """
     logger.info("Dividing %s by %s", a, b)
-    if float(b) == 0.0:
+    divisor = _values(b)
+    if np.any(divisor == 0.0):
         msg = "Division by zero is not allowed"
         logger.error(msg)
         raise ValueError(msg)
-    return {"result": float(a) / float(b), "input_arguments": {"a": a, "b": b}}
+    return {
+        "result": _result(_values(a) / divisor),
+        "input_arguments": {"a": _argument(a), "b": _argument(b)},
+    }
 
 
-def percentage(part: float, whole: float) -> dict[str, float | dict[str, float]]:
+def percentage(part: Operand, whole: Operand) -> Result:
     """Return the percentage that 'part' is of 'whole'.
 
     Example: percentage(2, 8) => 25.0
@@ -47,33 +126,161 @@ def percentage(part: float, whole: float) -> dict[str, float | dict[str, float]]
         ValueError: If whole == 0
     """
     logger.info("Calculating percentage of %s by %s", part, whole)
-    if float(whole) == 0.0:
+    whole_values = _values(whole)
+    if np.any(whole_values == 0.0):
         msg = "Percentage of zero is undefined"
         logger.error(msg)
         raise ValueError(msg)
     return {
-        "result": (float(part) / float(whole)) * 100.0,
-        "input_arguments": {"part": part, "whole": whole},
+        "result": _result(_values(part) / whole_values * 100.0),
+        "input_arguments": {"part": _argument(part), "whole": _argument(whole)},
+    }
+
+
+def sum_values(values: Operand) -> Result:
+    """Return the sum of the values, skipping missing ones."""
+    logger.info("Summing %s", values)
+    return {
+        "result": float(np.nansum(_series(values))),
+        "input_arguments": {"values": _argument(values)},
+    }
+
+
+def mean(values: Operand) -> Result:
+    """Return the arithmetic mean of the values, skipping missing ones."""
+    logger.info("Calculating mean of %s", values)
+    return {
+        "result": float(np.nanmean(_series(values))),
+        "input_arguments": {"values": _argument(values)},
+    }
+
+
+def median(values: Operand) -> Result:
+    """Return the median of the values, skipping missing ones."""
+    logger.info("Calculating median of %s", values)
+    return {
+        "result": float(np.nanmedian(_series(values))),
+        "input_arguments": {"values": _argument(values)},
+    }
+
+
+def percentiles(values: Operand, q: list[float]) -> Result:
+    """Return the q-th percentiles of the values, skipping missing ones.
+
+    Example: percentiles([1, 2, 3, 4, 5], [50, 90]) => [3.0, 4.6]
+
+    Raises:
+        ValueError: If a percentile is outside [0, 100]
+    """
+    logger.info("Calculating percentiles %s of %s", q, values)
+    ranks = np.atleast_1d(_values(q))
+    if np.any((ranks < 0.0) | (ranks > MAX_PERCENTILE)):
+        msg = "Percentiles must be between 0 and 100"
+        logger.error(msg)
+        raise ValueError(msg)
+    return {
+        "result": _result(np.nanpercentile(_series(values), ranks)),
+        "input_arguments": {"values": _argument(values), "q": q},
+    }
+
+
+def growth_rates(values: Operand) -> Result:
+    """Return the percent change of each value from the previous one.
+
+    Example: growth_rates([100, 110, 99]) => [10.0, -10.0]
+
+    Raises:
+        ValueError: If a value other than the last is 0
+    """
+    logger.info("Calculating growth rates of %s", values)
+    series = _series(values)
+    previous = series[:-1]
+    if np.any(previous == 0.0):
+        msg = "Growth from zero is undefined"
+        logger.error(msg)
+        raise ValueError(msg)
+    return {
+        "result": _result(np.diff(series) / previous * 100.0),
+        "input_arguments": {"values": _argument(values)},
+    }
+
+
+def weighted_average(values: Operand, weights: Operand) -> Result:
+    """Return the average of the values weighted by weights, skipping missing pairs.
+
+    Example: weighted_average([10, 20], [1, 3]) => 17.5
+
+    Raises:
+        ValueError: If the weights sum to 0
+    """
+    logger.info("Calculating weighted average of %s by %s", values, weights)
+    series, weight = np.broadcast_arrays(_series(values), _values(weights))
+    present = ~(np.isnan(series) | np.isnan(weight))
+    total_weight = weight[present].sum()
+    if total_weight == 0.0:
+        msg = "Weights sum to zero"
+        logger.error(msg)
+        raise ValueError(msg)
+    return {
+        "result": float((series[present] * weight[present]).sum() / total_weight),
+        "input_arguments": {"values": _argument(values), "weights": _argument(weights)},
     }
 
 
 def get_calculator_tools() -> list[FunctionTool]:
     """Return a list of FunctionTool instances for calculator operations."""
     tools: list[FunctionTool] = [
-        FunctionTool.from_defaults(fn=add, name="add", description="Add two numbers: a + b"),
         FunctionTool.from_defaults(
-            fn=subtract, name="subtract", description="Subtract two numbers: a - b"
+            fn=add, name="add", description=f"Add two numbers: a + b. {COLUMN_NOTE}"
+        ),
+        FunctionTool.from_defaults(
+            fn=subtract, name="subtract", description=f"Subtract two numbers: a - b. {COLUMN_NOTE}"
         ),
         FunctionTool.from_defaults(
-            fn=multiply, name="multiply", description="Multiply two numbers: a * b"
+            fn=multiply, name="multiply", description=f"Multiply two numbers: a * b. {COLUMN_NOTE}"
         ),
         FunctionTool.from_defaults(
-            fn=divide, name="divide", description="Divide two numbers: a / b (no zero divisor)"
+            fn=divide,
+            name="divide",
+            description=f"Divide two numbers: a / b (no zero divisor). {COLUMN_NOTE}",
         ),
         FunctionTool.from_defaults(
             fn=percentage,
             name="percentage",
-            description="Compute percentage: (part / whole) * 100",
+            description=f"Compute percentage: (part / whole) * 100. {COLUMN_NOTE}",
+        ),
+        FunctionTool.from_defaults(
+            fn=sum_values,
+            name="sum",
+            description=f"Add up a series of numbers in one call. {SERIES_NOTE}",
+        ),
+        FunctionTool.from_defaults(
+            fn=mean,
+            name="mean",
+            description=f"Mean (average) of a series of numbers. {SERIES_NOTE}",
+        ),
+        FunctionTool.from_defaults(
+            fn=median, name="median", description=f"Median of a series of numbers. {SERIES_NOTE}"
+        ),
+        FunctionTool.from_defaults(
+            fn=percentiles,
+            name="percentiles",
+            description=(
+                f"Percentiles q (0-100), e.g. [25, 50, 75], of a series of numbers. {SERIES_NOTE}"
+            ),
+        ),
+        FunctionTool.from_defaults(
+            fn=growth_rates,
+            name="growth_rates",
+            description=(
+                "Year-over-year (period-over-period) growth in % of a series of numbers, "
+                f"one rate per consecutive pair. {SERIES_NOTE}"
+            ),
+        ),
+        FunctionTool.from_defaults(
+            fn=weighted_average,
+            name="weighted_average",
+            description=f"Average of values weighted by weights of the same length. {SERIES_NOTE}",
         ),
     ]
     return tools
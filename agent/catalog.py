@@ -0,0 +1,246 @@
+import asyncio
+import json
+import time
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from typing import Any
+
+from llama_index.core.tools.function_tool import FunctionTool
+from logging_config import get_logger
+from mcp import types
+from mcp_pool import get_mcp_client, get_mcp_server_urls
+from schemas import CatalogConfig, CatalogEntry, CatalogSourceConfig, MCPConfig
+from tool_retrieval import tokenize
+
+logger = get_logger(__name__)
+
+CATALOG_TOOL_NAME = "search_catalog"
+
+
+def _records(payload: object) -> list[Any]:
+    """Return the records of a listing: the payload itself or its first list value."""
+    if isinstance(payload, list):
+        return payload  # type: ignore[return-value]
+    if isinstance(payload, dict):
+        for value in payload.values():  # type: ignore[misc]
+            if isinstance(value, list):
+                return value  # type: ignore[return-value]
+    return []
+
+
+def _first_field(record: dict[str, Any], fields: Sequence[str]) -> tuple[str, str] | None:
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str | int) and str(value):
+            return field, str(value)
+    return None
+
+
+def parse_entries(
+    source: str, result: types.CallToolResult, catalog_config: CatalogConfig
+) -> list[CatalogEntry]:
+    """Read catalog entries from the JSON listing returned by a source tool.
+
+    Records may be plain identifiers or objects; the identifier and name are taken from the
+    first of `id_fields` and `name_fields` they have, and their other text fields become the
+    description. Records without an identifier or name are skipped.
+    """
+    entries: list[CatalogEntry] = []
+    for block in result.content:
+        if not isinstance(block, types.TextContent):
+            continue
+        try:
+            payload = json.loads(block.text)
+        except ValueError:
+            continue
+        for record in _records(payload):
+            if isinstance(record, str):
+                entries.append(CatalogEntry(source=source, id=record, name=record))
+                continue
+            if not isinstance(record, dict):
+                continue
+            name = _first_field(record, catalog_config.name_fields)  # type: ignore[arg-type]
+            identifier = _first_field(record, catalog_config.id_fields) or name  # type: ignore[arg-type]
+            if identifier is None:
+                continue
+            used = {identifier[0], name[0] if name else ""}
+            description = " ".join(
+                value
+                for key, value in record.items()  # type: ignore[misc]
+                if key not in used and isinstance(value, str)
+            )
+            entries.append(
+                CatalogEntry(
+                    source=source,
+                    id=identifier[1],
+                    name=name[1] if name else "",
+                    description=description,
+                )
+            )
+    return entries
+
+
+class CatalogIndex:
+    """Inverted index from terms to the catalog entries mentioning them.
+
+    Postings are sorted arrays of entry positions, so a search only touches the entries that
+    share a term with the query.
+    """
+
+    def __init__(self, entries: Sequence[CatalogEntry]) -> None:
+        self.entries = list(entries)
+        postings: dict[str, set[int]] = {}
+        for position, entry in enumerate(self.entries):
+            text = f"{entry.source} {entry.id} {entry.name} {entry.description}"
+            for term in tokenize(text):
+                postings.setdefault(term, set()).add(position)
+        self._postings = {term: array("I", sorted(ids)) for term, ids in postings.items()}
+
+    def search(self, query: str, limit: int) -> list[CatalogEntry]:
+        """Entries sharing the most terms with `query`, in catalog order on ties."""
+        matched: Counter[int] = Counter()
+        for term in set(tokenize(query)):
+            matched.update(self._postings.get(term, ()))
+        ranked = sorted(matched, key=lambda position: (-matched[position], position))
+        return [self.entries[position] for position in ranked[:limit]]
+
+
+class DatasetCatalog:
+    """Datasets of every catalog source, re-read in the background once stale.
+
+    A source that fails to load keeps its previous entries, and is reported in search results
+    so the model knows to check it with the server tools instead.
+    """
+
+    def __init__(self, catalog_config: CatalogConfig, mcp_config: MCPConfig) -> None:
+        self.catalog_config = catalog_config
+        self.mcp_config = mcp_config
+        self.index = CatalogIndex([])
+        self.refreshed_at: float | None = None
+        self.errors: dict[str, str] = {}
+        self._entries: dict[str, list[CatalogEntry]] = {}
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._searches = 0
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.refreshed_at is None
+            or time.time() - self.refreshed_at >= self.catalog_config.refresh_interval_seconds
+        )
+
+    def _record_error(self, source: CatalogSourceConfig, error: str) -> None:
+        self.errors[source.name] = error
+        logger.warning("Could not load %s catalog: %s", source.name, error)
+
+    async def _load_source(self, source: CatalogSourceConfig) -> None:
+        url = get_mcp_server_urls(self.mcp_config).get(source.server)
+        if url is None:
+            self._record_error(source, f"Unknown MCP server {source.server}")
+            return
+        try:
+            result = await get_mcp_client(source.server, url, self.mcp_config).call_tool(
+                source.tool, source.arguments
+            )
+        except Exception as e:  # noqa: BLE001
+            self._record_error(source, str(e) or type(e).__name__)
+            return
+        if result.isError:
+            self._record_error(source, f"{source.tool} failed")
+            return
+        self.errors.pop(source.name, None)
+        self._entries[source.name] = parse_entries(source.name, result, self.catalog_config)
+
+    async def refresh(self) -> None:
+        """Re-read every source and rebuild the index."""
+        started = time.perf_counter()
+        await asyncio.gather(*(self._load_source(source) for source in self.catalog_config.sources))
+        self.index = CatalogIndex(
+            [entry for entries in self._entries.values() for entry in entries]
+        )
+        self.refreshed_at = time.time()
+        logger.info(
+            "Indexed %d catalog entries in %.2fs",
+            len(self.index.entries),
+            time.perf_counter() - started,
+        )
+
+    def schedule_refresh(self) -> None:
+        """Start a background refresh if the catalog is stale and none is running."""
+        if not self.stale or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    def search(self, query: str) -> dict[str, Any]:
+        """Search the catalog, scheduling a refresh if it is stale."""
+        self.schedule_refresh()
+        self._searches += 1
+        if self.refreshed_at is None:
+            return {
+                "status": "loading",
+                "message": "Catalog still loading, check availability with the server tools.",
+            }
+        matches = self.index.search(query, self.catalog_config.max_results)
+        return {
+            "query": query,
+            "matches": [match.model_dump() for match in matches],
+            "entries_per_source": {
+                source: len(entries) for source, entries in self._entries.items()
+            },
+            "unavailable_sources": sorted(
+                name for name in self.errors if name not in self._entries
+            ),
+        }
+
+    def get_tools(self) -> list[FunctionTool]:
+        """Return the tool searching the catalog."""
+
+        async def search_catalog(query: str) -> dict[str, Any]:
+            """Check instantly which Datawarehouse indicators and GEE datasets exist.
+
+            Search the local catalog with keywords such as an indicator, hazard or dataset name.
+            Use it for the data availability check before calling the server tools. Sources
+            listed in unavailable_sources could not be loaded and must be checked with the
+            server tools.
+            """
+            return self.search(query)
+
+        return [FunctionTool.from_defaults(async_fn=search_catalog, name=CATALOG_TOOL_NAME)]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Entry counts per source, load errors, age and search count."""
+        return {
+            "entries_per_source": {
+                source: len(entries) for source, entries in self._entries.items()
+            },
+            "errors": dict(self.errors),
+            "age_seconds": None if self.refreshed_at is None else time.time() - self.refreshed_at,
+            "searches": self._searches,
+        }
+
+
+# Process-wide catalogs keyed by their configuration
+_catalogs: dict[str, DatasetCatalog] = {}
+
+
+def get_dataset_catalog(
+    catalog_config: CatalogConfig, mcp_config: MCPConfig
+) -> DatasetCatalog | None:
+    """Return the shared catalog for the given configuration, None if it is disabled."""
+    if not catalog_config.enabled or not catalog_config.sources:
+        return None
+    key = catalog_config.model_dump_json() + mcp_config.model_dump_json()
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = _catalogs[key] = DatasetCatalog(catalog_config, mcp_config)
+    return catalog
+
+
+def get_catalog_stats() -> dict[str, dict[str, Any]]:
+    """Stats of every shared catalog, keyed by source names."""
+    return {
+        ", ".join(source.name for source in catalog.catalog_config.sources): catalog.stats
+        for catalog in _catalogs.values()
+    }
@@ -0,0 +1,188 @@
+import asyncio
+import enum
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from logging_config import get_logger
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Upper bound for the jittered delay between retries
+MAX_RETRY_DELAY_SECONDS = 2.0
+
+# Codes of the McpErrors raised by the client itself when the server did not answer: a read
+# timeout, reported with the HTTP status code, or a closed connection
+TRANSPORT_ERROR_CODES = frozenset({408, CONNECTION_CLOSED})
+
+# Callbacks run whenever a breaker opens
+open_handlers: list[Callable[[], None]] = []
+
+
+def add_open_handler(handler: Callable[[], None]) -> None:
+    """Register a callback for breakers opening, e.g. to rebuild the agent without a backend."""
+    open_handlers.append(handler)
+
+
+def is_protocol_error(error: BaseException) -> bool:
+    """Whether `error` is an MCP error answered by the server, not a timeout or lost connection."""
+    return isinstance(error, McpError) and error.error.code not in TRANSPORT_ERROR_CODES
+
+
+class CircuitState(enum.StrEnum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in_seconds: float) -> None:
+        super().__init__(f"MCP server {name} is unavailable, try again in {retry_in_seconds:.0f}s")
+        self.name = name
+        self.retry_in_seconds = retry_in_seconds
+
+
+class CircuitBreaker:
+    """Circuit breaker with jittered retries for calls to a single backend.
+
+    After `failure_threshold` consecutive failed calls the breaker opens and calls fail
+    immediately with `CircuitOpenError`. Once `recovery_timeout_seconds` have passed, a single
+    half-open probe call is let through: success closes the breaker, failure opens it again.
+    MCP protocol errors are answers from a healthy server and do not count as failures, unlike
+    the request timeouts and closed connections the MCP client also raises as `McpError`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 3,
+        recovery_timeout_seconds: float = 30.0,
+        retries: int = 1,
+        retry_base_delay_seconds: float = 0.2,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout_seconds = recovery_timeout_seconds
+        self.retries = retries
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the recovery timeout passed."""
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.recovery_timeout_seconds
+        ):
+            self._state = CircuitState.HALF_OPEN
+            logger.info("Circuit breaker for %s is half-open", self.name)
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected without reaching the backend."""
+        return self.state is CircuitState.OPEN
+
+    def ensure_available(self) -> None:
+        """Raise `CircuitOpenError` if the breaker is open.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+        """
+        if self.is_open:
+            raise self._reject()
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        if self._state is not CircuitState.CLOSED:
+            logger.info("Circuit breaker for %s closed", self.name)
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold or after a failed probe."""
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        was_open = self._state is CircuitState.OPEN
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        if was_open:
+            return
+        logger.warning("Circuit breaker for %s opened after %d failures", self.name, self._failures)
+        for handler in open_handlers:
+            handler()
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter keeps clients that failed together from retrying in lockstep
+        ceiling = min(MAX_RETRY_DELAY_SECONDS, self.retry_base_delay_seconds * 2**attempt)
+        return random.uniform(0, ceiling)  # noqa: S311
+
+    def _reject(self) -> CircuitOpenError:
+        retry_in = self.recovery_timeout_seconds - (time.monotonic() - self._opened_at)
+        return CircuitOpenError(self.name, max(retry_in, 0.0))
+
+    async def call(self, operation: Callable[[], Awaitable[T]], *, retries: int | None = None) -> T:
+        """Run `operation` through the breaker, retrying failures with jittered backoff.
+
+        Args:
+            operation: Coroutine function calling the backend
+            retries: Number of retries after a failure, defaults to the breaker's `retries`
+
+        Returns:
+            The operation's result
+
+        Raises:
+            CircuitOpenError: If the breaker is open or a half-open probe is already running
+        """
+        state = self.state
+        if state is CircuitState.OPEN or (state is CircuitState.HALF_OPEN and self._probing):
+            raise self._reject()
+
+        probing = state is CircuitState.HALF_OPEN
+        if probing:
+            self._probing = True
+        try:
+            if retries is None:
+                retries = self.retries
+            return await self._call_with_retries(operation, retries=0 if probing else retries)
+        finally:
+            if probing:
+                self._probing = False
+
+    async def _call_with_retries(self, operation: Callable[[], Awaitable[T]], retries: int) -> T:
+        attempt = 0
+        while True:
+            try:
+                result = await operation()
+            except Exception as e:
+                if is_protocol_error(e):
+                    self.record_success()
+                    raise
+                if attempt >= retries:
+                    self.record_failure()
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Call to %s failed, retrying in %.2fs", self.name, delay, exc_info=True
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.record_success()
+                return result
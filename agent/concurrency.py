@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class BackendBusyError(Exception):
+    """Raised when a call waited too long for a free concurrency slot."""
+
+    def __init__(self, name: str, waited_seconds: float) -> None:
+        super().__init__(
+            f"MCP server {name} is busy, no call slot freed up within {waited_seconds:.0f}s"
+        )
+        self.name = name
+        self.waited_seconds = waited_seconds
+
+
+class ConcurrencyLimiter:
+    """Bounds the number of concurrent calls to one backend, queueing the rest.
+
+    Each backend has its own limiter, so a backlog of slow calls on one server never delays
+    calls to another. Waiting callers are served in FIFO order and give up with
+    `BackendBusyError` after `max_queue_seconds`.
+    """
+
+    def __init__(
+        self, name: str, max_concurrency: int, max_queue_seconds: float | None = None
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_seconds = max_queue_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_queue_seconds = 0.0
+        self._max_queue_seconds_seen = 0.0
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Concurrency and queue-time statistics."""
+        started = self._completed + self._in_flight
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_queue_seconds": self._total_queue_seconds / started if started else 0.0,
+            "max_queue_seconds": self._max_queue_seconds_seen,
+        }
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free call slot and hold it for the duration of the block.
+
+        Raises:
+            BackendBusyError: If no slot freed up within `max_queue_seconds`
+        """
+        queued_at = time.monotonic()
+        self._queued += 1
+        try:
+            async with asyncio.timeout(self.max_queue_seconds):
+                await self._semaphore.acquire()
+        except TimeoutError as e:
+            self._rejected += 1
+            waited = time.monotonic() - queued_at
+            logger.warning("Rejected call to %s after queueing for %.2fs", self.name, waited)
+            raise BackendBusyError(self.name, waited) from e
+        finally:
+            self._queued -= 1
+
+        waited = time.monotonic() - queued_at
+        self._total_queue_seconds += waited
+        self._max_queue_seconds_seen = max(self._max_queue_seconds_seen, waited)
+        if waited > 1.0:
+            logger.info("Call to %s queued for %.2fs", self.name, waited)
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
@@ -0,0 +1,144 @@
+import csv
+import difflib
+import re
+import unicodedata
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from llama_index.core.tools.function_tool import FunctionTool
+from logging_config import get_logger
+from schemas import Country, GazetteerConfig
+
+logger = get_logger(__name__)
+
+GAZETTEER_TOOL_NAME = "resolve_country"
+
+# Similarity below which close names are not even offered as alternatives
+ALTERNATIVE_MIN_SCORE = 0.6
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CODE = re.compile(r"[A-Z]{2,3}")
+
+
+def normalize(name: str) -> str:
+    """Lowercase words of a place name, without accents, punctuation or a leading "the"."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = _WORD.findall(ascii_name.lower().replace("&", " and "))
+    if words[:1] == ["the"]:
+        words = words[1:]
+    return " ".join(words)
+
+
+def load_countries(path: Path) -> list[Country]:
+    """Read the countries of a gazetteer CSV file."""
+    with path.open(encoding="utf-8", newline="") as file:
+        return [
+            Country(
+                iso3=row["iso3"],
+                iso2=row["iso2"],
+                name=row["name"],
+                aliases=[alias for alias in row["aliases"].split("|") if alias],
+            )
+            for row in csv.DictReader(file)
+        ]
+
+
+def _summary(country: Country) -> dict[str, str]:
+    return {"iso3": country.iso3, "iso2": country.iso2, "name": country.name}
+
+
+class Gazetteer:
+    """In-memory country lookup by ISO code, name or alias, tolerating misspellings.
+
+    Exact names and aliases are found by their normalized form, so accents, case and
+    punctuation do not matter. Other names are matched by similarity against every known name.
+    """
+
+    def __init__(self, countries: Sequence[Country], gazetteer_config: GazetteerConfig) -> None:
+        self.gazetteer_config = gazetteer_config
+        self._by_code: dict[str, Country] = {}
+        self._by_name: dict[str, Country] = {}
+        for country in countries:
+            self._by_code[country.iso3] = self._by_code[country.iso2] = country
+            for name in (country.name, *country.aliases):
+                self._by_name.setdefault(normalize(name), country)
+        self._names = list(self._by_name)
+
+    @classmethod
+    def from_config(cls, gazetteer_config: GazetteerConfig) -> "Gazetteer":
+        """Load the gazetteer file of the configuration, relative to the agent directory."""
+        countries = load_countries(Path(__file__).parent / gazetteer_config.path)
+        logger.info("Loaded %d countries into the gazetteer", len(countries))
+        return cls(countries, gazetteer_config)
+
+    def _close_matches(self, key: str) -> list[tuple[Country, float]]:
+        """Countries with a name close to `key`, best first, each with its best score."""
+        scores: dict[str, tuple[Country, float]] = {}
+        matcher = difflib.SequenceMatcher(b=key)
+        for name in difflib.get_close_matches(key, self._names, n=10, cutoff=ALTERNATIVE_MIN_SCORE):
+            country = self._by_name[name]
+            matcher.set_seq1(name)
+            score = matcher.ratio()
+            if country.iso3 not in scores or scores[country.iso3][1] < score:
+                scores[country.iso3] = (country, score)
+        return sorted(scores.values(), key=lambda match: -match[1])
+
+    def resolve(self, name: str) -> dict[str, Any]:
+        """Resolve a free-text country name or ISO code.
+
+        Returns:
+            dict: The query, the matched country or None, the match score and close alternatives
+        """
+        code = name.strip().upper()
+        country = self._by_code.get(code) if _CODE.fullmatch(code) else None
+        country = country or self._by_name.get(normalize(name))
+        if country is not None:
+            return {"query": name, "match": _summary(country), "score": 1.0, "alternatives": []}
+
+        matches = self._close_matches(normalize(name))
+        best = matches[0] if matches and matches[0][1] >= self.gazetteer_config.min_score else None
+        alternatives = matches[1:] if best else matches
+        if best is not None:
+            logger.info("Resolved %r to %s (score %.2f)", name, best[0].name, best[1])
+        else:
+            logger.info("No country matches %r", name)
+        return {
+            "query": name,
+            "match": _summary(best[0]) if best else None,
+            "score": round(best[1], 3) if best else 0.0,
+            "alternatives": [
+                {**_summary(country), "score": round(score, 3)}
+                for country, score in alternatives[: self.gazetteer_config.max_alternatives]
+            ],
+        }
+
+    def get_tools(self) -> list[FunctionTool]:
+        """Return the tool resolving country names."""
+
+        async def resolve_country(name: str) -> dict[str, Any]:
+            """Resolve a country name, alias, misspelling or ISO code to its ISO codes and name.
+
+            Answers instantly without calling any server. Use it before passing a country to
+            the Datawarehouse or GEE tools, e.g. "Ivory Coast" or "Cote dIvoire" both resolve
+            to CIV, Côte d'Ivoire. When match is null, pick one of the alternatives or ask the
+            user.
+            """
+            return self.resolve(name)
+
+        return [FunctionTool.from_defaults(async_fn=resolve_country, name=GAZETTEER_TOOL_NAME)]
+
+
+# Process-wide gazetteers keyed by their configuration
+_gazetteers: dict[str, Gazetteer] = {}
+
+
+def get_gazetteer(gazetteer_config: GazetteerConfig) -> Gazetteer | None:
+    """Return the shared gazetteer for the given configuration, None if it is disabled."""
+    if not gazetteer_config.enabled:
+        return None
+    key = gazetteer_config.model_dump_json()
+    gazetteer = _gazetteers.get(key)
+    if gazetteer is None:
+        gazetteer = _gazetteers[key] = Gazetteer.from_config(gazetteer_config)
+    return gazetteer
@@ -5,9 +5,10 @@ from collections.abc import AsyncGenerator
 from llama_index.core.agent.workflow import AgentOutput, AgentStream, ToolCallResult
 from llama_index.core.workflow import Event, StopEvent
 from logging_config import get_logger
+from registry import agent_registry, get_agent
 from schemas import Message, ReturnChunk, TextOutput, ToolOutput
 
-from agent import create_agent, run_agent
+from agent import run_agent
 
 logger = get_logger(__name__)
 
@@ -29,10 +30,11 @@ async def handle_response(
         JSON serialized chunks of the response
     """
     prompt_text = _build_conversation_prompt(messages)
+    question = next((m.content for m in reversed(messages) if m.role == "user"), None)
 
     logger.info("Running agent with prompt: %s", prompt_text)
 
-    async for chunk in respond(prompt_text, trace_id, session_id, tags):
+    async for chunk in respond(prompt_text, trace_id, session_id, tags, question=question):
         yield chunk
 
 
@@ -41,6 +43,7 @@ async def respond(
     trace_id: str,
     session_id: str,
     tags: list[str] | None = None,
+    question: str | None = None,
 ) -> AsyncGenerator[str, None]:
     """Process prompt and generate a response using the agent.
 
@@ -49,15 +52,24 @@ async def respond(
         trace_id: Unique identifier for tracing the request
         session_id: Unique identifier for the session
         tags: List of tags to associate with the trace
+        question: The latest user message, the whole prompt if None
     Yields:
         JSON serialized chunks of the response, including tool calls, agent streams,
         and the final answer
     """
-    agent = await create_agent()
+    agent = await get_agent()
 
     is_final_answer = False
     is_thought_chunk = True
-    async for chunk in run_agent(agent, prompt_text, trace_id, session_id, tags):
+    async for chunk in run_agent(
+        agent,
+        prompt_text,
+        trace_id,
+        session_id,
+        tags,
+        specific_config=agent_registry.config,
+        question=question,
+    ):
         processed_chunk = _process_chunk(
             chunk, trace_id, is_final_answer=is_final_answer, is_thought_chunk=is_thought_chunk
         )
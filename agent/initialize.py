@@ -1,14 +1,25 @@
+import asyncio
 import os
+import time
 from pathlib import Path
 
-import yaml
 from calculator import get_calculator_tools
+from circuit_breaker import CircuitOpenError
 from config import config
 from dotenv import load_dotenv
 from llama_index.core.tools.function_tool import FunctionTool
-from llama_index.tools.mcp import BasicMCPClient, McpToolSpec
 from logging_config import get_logger
-from schemas import MCPConfig, Prompts
+from mcp_pool import get_circuit_breaker, get_mcp_client, get_mcp_server_urls
+from prompt_cache import prompt_file_cache
+from schemas import MCPConfig, Prompts, ServerDiscovery, ServerToolSnapshot
+from tool_snapshot import (
+    build_function_tools,
+    fetch_tool_schemas,
+    load_tool_snapshot,
+    resolve_snapshot_path,
+    revalidate_in_background,
+    save_tool_snapshot,
+)
 
 logger = get_logger(__name__)
 
@@ -103,45 +114,131 @@ def set_env_vars() -> None:
         raise ValueError(msg) from e
 
 
+# Latest discovery outcome per MCP server, keyed by server name
+discovery_report: dict[str, ServerDiscovery] = {}
+
+
+async def _discover_server_tools(
+    name: str,
+    url: str,
+    mcp_config: MCPConfig,
+    cached: ServerToolSnapshot | None = None,
+) -> tuple[list[FunctionTool], ServerToolSnapshot | None]:
+    """Discover the tools of a single MCP server within the configured discovery timeout.
+
+    When a snapshot entry for the same URL is given, tools are built from it without contacting
+    the server. A server that fails, times out or has an open circuit breaker contributes no
+    tools instead of failing the whole discovery, so the agent can still answer with the
+    remaining servers.
+
+    Args:
+        name: Server name used in logs and in the discovery report
+        url: Server URL
+        mcp_config: MCP configuration with the discovery timeout and session pool settings
+        cached: Snapshot entry previously discovered for this server, if any
+
+    Returns:
+        tuple: The server's tools, empty if discovery failed, and the freshly discovered
+            snapshot entry, None if the tools came from the snapshot or discovery failed
+    """
+    logger.info("Connecting to %s", name)
+    client = get_mcp_client(name, url, mcp_config)
+    breaker = get_circuit_breaker(name, url, mcp_config)
+    timeout_seconds = mcp_config.discovery_timeout_seconds
+    started = time.perf_counter()
+    tools: list[FunctionTool] = []
+    discovered: ServerToolSnapshot | None = None
+    workspace_config = (
+        mcp_config.workspace
+        if mcp_config.workspace.enabled and mcp_config.workspace.server == name
+        else None
+    )
+    error: str | None = None
+    from_snapshot = cached is not None and cached.url == url
+    try:
+        breaker.ensure_available()
+        if from_snapshot and cached is not None:
+            tools = await build_function_tools(client, cached.tools, workspace_config)
+        else:
+            async with asyncio.timeout(timeout_seconds):
+                tool_schemas = await fetch_tool_schemas(client)
+            tools = await build_function_tools(client, tool_schemas, workspace_config)
+            discovered = ServerToolSnapshot(url=url, tools=tool_schemas)
+    except TimeoutError:
+        breaker.record_failure()
+        error = f"Timed out after {timeout_seconds}s"
+        logger.warning("Timed out getting %s tools after %ss", name, timeout_seconds)
+    except CircuitOpenError as e:
+        error = str(e)
+        logger.warning("Skipping %s tools: %s", name, e)
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        logger.exception("Failed to get %s tools", name)
+
+    duration = time.perf_counter() - started
+    discovery_report[name] = ServerDiscovery(
+        name=name,
+        url=url,
+        duration_seconds=duration,
+        tool_count=len(tools),
+        tool_names=[tool.metadata.get_name() for tool in tools],
+        error=error,
+        from_snapshot=from_snapshot,
+    )
+    logger.info(
+        "Got %d %s tools in %.2fs (from snapshot: %s)", len(tools), name, duration, from_snapshot
+    )
+    return tools, discovered
+
+
 async def get_tools(mcp_config: MCPConfig | None = None) -> list[FunctionTool]:
     """Get the tools for the agent.
 
+    The MCP servers are queried concurrently, each bounded by `discovery_timeout_seconds`. If a
+    tool snapshot is configured, servers found in it are served from the snapshot right away and
+    revalidated against the live servers in the background.
+
     Returns:
         list[FunctionTool]: The tools for the agent
     """
     if mcp_config is None:
         mcp_config = config.mcp
 
-    mcp_client_datawarehouse = BasicMCPClient(config.mcp.datawarehouse_url)
-    datawarehouse_tools = McpToolSpec(
-        client=mcp_client_datawarehouse,
-    )
-    logger.info("Connecting to datawarehouse")
-    mcp_client_rag = BasicMCPClient(config.mcp.rag_url)
-    rag_tools = McpToolSpec(
-        client=mcp_client_rag,
-    )
-    logger.info("Connecting to rag")
-    mcp_client_geospatial = BasicMCPClient(config.mcp.geospatial_url)
-    geospatial_tools = McpToolSpec(
-        client=mcp_client_geospatial,
-    )
+    snapshot_path = resolve_snapshot_path(mcp_config)
+    snapshot = load_tool_snapshot(snapshot_path) if snapshot_path else None
+    cached_servers = snapshot.servers if snapshot else {}
+    server_urls = get_mcp_server_urls(mcp_config)
+
     logger.info("Getting tools")
-    datawarehouse_tools_list = await datawarehouse_tools.to_tool_list_async()
-    logger.info("Got datawarehouse tools")
-    rag_tools_list = await rag_tools.to_tool_list_async()
-    logger.info("Got rag tools")
-    geospatial_tools_list = await geospatial_tools.to_tool_list_async()
-    logger.info("Got geospatial tools")
+    results = await asyncio.gather(
+        *(
+            _discover_server_tools(name, url, mcp_config, cached_servers.get(name))
+            for name, url in server_urls.items()
+        )
+    )
+
+    if snapshot_path is not None:
+        discovered = {
+            name: server
+            for name, (_, server) in zip(server_urls, results, strict=True)
+            if server is not None
+        }
+        if discovered:
+            save_tool_snapshot(snapshot_path, discovered)
+        served_from_snapshot = {
+            name: cached_servers[name]
+            for name in server_urls
+            if discovery_report[name].from_snapshot and discovery_report[name].error is None
+        }
+        if served_from_snapshot:
+            revalidate_in_background(snapshot_path, served_from_snapshot, mcp_config)
 
     logger.info("Getting calculator tools")
     calculator_tools = get_calculator_tools()
     logger.info("Got calculator tools")
 
     all_tools = [
-        *datawarehouse_tools_list,
-        *rag_tools_list,
-        *geospatial_tools_list,
+        *(tool for tools, _ in results for tool in tools),
         *calculator_tools,
     ]
 
@@ -149,10 +246,5 @@ async def get_tools(mcp_config: MCPConfig | None = None) -> list[FunctionTool]:
 
 
 def get_prompts() -> Prompts:
-    with Path("agent/prompts.yaml").open("r") as f:
-        prompts = yaml.safe_load(f)
-
-    header_prompt = prompts["header_prompt"]
-    system_prompt = prompts["system_prompt"]
-
-    return Prompts(header_prompt=header_prompt, system_prompt=system_prompt)
+    """Get the agent prompts, re-reading `prompts.yaml` only when it changed."""
+    return prompt_file_cache.get()
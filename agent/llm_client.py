@@ -0,0 +1,201 @@
+import importlib.util
+import os
+from typing import Any
+
+import httpx
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+from llama_index.llms.litellm import LiteLLM
+from logging_config import get_logger
+from openai import AsyncOpenAI
+from pydantic import PrivateAttr
+from schemas import LLMConfig, LLMHTTPConfig
+
+logger = get_logger(__name__)
+
+# httpx only speaks HTTP/2 when the optional `h2` package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_http_handlers: dict[str, "PooledHTTPHandler"] = {}
+_llms: dict[str, "PooledLiteLLM"] = {}
+
+
+class PooledHTTPHandler(AsyncHTTPHandler):
+    """LiteLLM HTTP handler backed by a tuned keep-alive connection pool.
+
+    httpx clients are safe to share between concurrent requests on the same event loop, so one
+    handler serves every agent run.
+    """
+
+    def __init__(self, http_config: LLMHTTPConfig) -> None:
+        self.http_config = http_config
+        self.http2 = http_config.http2 and HTTP2_AVAILABLE
+        self.requests = 0
+        if http_config.http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested for LLM requests but `h2` is not installed")
+        super().__init__(
+            timeout=httpx.Timeout(
+                http_config.timeout_seconds, connect=http_config.connect_timeout_seconds
+            ),
+            event_hooks={"request": [self._count_request]},
+            client_alias="llm",
+        )
+
+    def create_client(
+        self,
+        timeout: float | httpx.Timeout | None,
+        concurrent_limit: int,  # noqa: ARG002
+        event_hooks: Any,  # noqa: ANN401
+        ssl_verify: Any = None,  # noqa: ANN401, ARG002
+    ) -> httpx.AsyncClient:
+        """Create the pooled httpx client used for every provider request."""
+        return httpx.AsyncClient(
+            timeout=timeout,
+            event_hooks=event_hooks,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.http_config.max_connections,
+                max_keepalive_connections=self.http_config.max_keepalive_connections,
+                keepalive_expiry=self.http_config.keepalive_expiry_seconds,
+            ),
+        )
+
+    async def _count_request(self, request: httpx.Request) -> None:  # noqa: ARG002
+        self.requests += 1
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Connection pool statistics."""
+        # httpx has no public API for its connection pool, so read the httpcore pool of the
+        # default transport. Its connections are public httpcore API.
+        transport = self.client._transport  # type: ignore[attr-defined]  # noqa: SLF001
+        connections = (
+            transport._pool.connections  # type: ignore[attr-defined]  # noqa: SLF001
+            if isinstance(transport, httpx.AsyncHTTPTransport)
+            else []
+        )
+        return {
+            "max_connections": self.http_config.max_connections,
+            "connections": len(connections),
+            "idle": sum(1 for connection in connections if connection.is_idle()),
+            "http2": sum(1 for connection in connections if "HTTP/2" in connection.info()),
+            "requests": self.requests,
+        }
+
+
+class PooledLiteLLM(LiteLLM):
+    """`LiteLLM` that sends provider requests through a shared `PooledHTTPHandler`.
+
+    Bedrock and Vertex AI requests take the handler itself. LiteLLM sends OpenAI requests
+    through an `AsyncOpenAI` client instead, so one is built on the handler's httpx client. The
+    client is passed per call rather than through `additional_kwargs`, which must stay
+    serializable for tracing.
+    """
+
+    _http_handler: PooledHTTPHandler | None = PrivateAttr(default=None)
+    _provider: str | None = PrivateAttr(default=None)
+    _openai_client: AsyncOpenAI | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        http_handler: PooledHTTPHandler | None = None,
+        provider: str | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        super().__init__(**kwargs)
+        self._http_handler = http_handler
+        self._provider = provider
+
+    def _client(self) -> PooledHTTPHandler | AsyncOpenAI | None:
+        if self._http_handler is None or self._provider != "openai":
+            return self._http_handler
+        if self._openai_client is None:
+            # Built on first use, once the API key has been loaded into the environment
+            self._openai_client = AsyncOpenAI(http_client=self._http_handler.client)
+        return self._openai_client
+
+    def _get_all_kwargs(self, **kwargs: Any) -> dict[str, Any]:  # noqa: ANN401
+        all_kwargs = super()._get_all_kwargs(**kwargs)
+        client = self._client()
+        if client is not None:
+            all_kwargs.setdefault("client", client)
+        return all_kwargs
+
+
+def get_http_handler(http_config: LLMHTTPConfig) -> PooledHTTPHandler:
+    """Get the shared HTTP handler for the given pool settings, creating it on first use."""
+    key = http_config.model_dump_json()
+    handler = _http_handlers.get(key)
+    if handler is None:
+        handler = _http_handlers[key] = PooledHTTPHandler(http_config)
+        logger.info("Created LLM connection pool (http2=%s)", handler.http2)
+    return handler
+
+
+def get_shared_llm(llm_config: LLMConfig) -> PooledLiteLLM:
+    """Get the process-wide LLM client for `llm_config`, creating it on first use.
+
+    Args:
+        llm_config: LLM configuration
+
+    Returns:
+        PooledLiteLLM: The shared LLM client
+    """
+    key = llm_config.model_dump_json()
+    llm = _llms.get(key)
+    if llm is not None:
+        return llm
+
+    logger.info("Creating shared LLM client for model: %s", llm_config.model)
+    llm = _llms[key] = PooledLiteLLM(
+        http_handler=get_http_handler(llm_config.http),
+        provider=llm_config.provider,
+        model=llm_config.model,
+        temperature=llm_config.temperature,
+        additional_kwargs={
+            "stop": ["Observation:"],
+            "aws_region_name": llm_config.region_name,
+        },
+    )
+    return llm
+
+
+def get_provider_base_url(llm_config: LLMConfig) -> str:
+    """Base URL of the provider API that `llm_config` sends requests to."""
+    match llm_config.provider:
+        case "openai":
+            return "https://api.openai.com/"
+        case "bedrock":
+            return f"https://bedrock-runtime.{llm_config.region_name or 'us-east-1'}.amazonaws.com/"
+        case "vertexai":
+            location = os.environ.get("VERTEXAI_LOCATION", "us-central1")
+            return f"https://{location}-aiplatform.googleapis.com/"
+
+
+async def prime_llm_connection(llm_config: LLMConfig) -> dict[str, int]:
+    """Open a pooled connection to the provider so the first completion skips the handshakes.
+
+    Any HTTP response counts as success, only connection errors are raised.
+
+    Args:
+        llm_config: LLM configuration
+
+    Returns:
+        dict[str, int]: Statistics of the primed connection pool
+    """
+    get_shared_llm(llm_config)
+    handler = get_http_handler(llm_config.http)
+    await handler.client.head(get_provider_base_url(llm_config))
+    return handler.stats
+
+
+def get_llm_pool_stats() -> dict[str, dict[str, int]]:
+    """Statistics of every LLM connection pool, keyed by its settings."""
+    return {key: handler.stats for key, handler in _http_handlers.items()}
+
+
+async def close_llm_clients() -> None:
+    """Close every LLM connection pool and forget the shared clients."""
+    for handler in _http_handlers.values():
+        await handler.close()
+    _http_handlers.clear()
+    _llms.clear()
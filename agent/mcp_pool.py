@@ -0,0 +1,600 @@
+import asyncio
+import shlex
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from datetime import timedelta
+from typing import Any, TypeVar
+
+from circuit_breaker import CircuitBreaker, is_protocol_error
+from concurrency import ConcurrencyLimiter
+from logging_config import get_logger
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from pydantic import AnyUrl
+from schemas import MCPConfig, MCPTransportConfig
+from tool_cache import (
+    ToolCallCoalescer,
+    ToolResultCache,
+    get_tool_cache,
+    get_tool_coalescer,
+    tool_call_key,
+)
+from tool_store import ToolResultStore, get_tool_store
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+MessageHandler = Callable[[object], Awaitable[None]]
+SessionFactory = Callable[[], AbstractAsyncContextManager[ClientSession]]
+
+# Handlers receiving every request, notification or exception pushed by any pooled session
+message_handlers: list[MessageHandler] = []
+
+
+def add_message_handler(handler: MessageHandler) -> None:
+    """Register a handler for server-initiated messages on every pooled MCP session.
+
+    Args:
+        handler: Coroutine function called with each incoming message
+    """
+    message_handlers.append(handler)
+
+
+async def _dispatch_message(message: object) -> None:
+    for handler in message_handlers:
+        try:
+            await handler(message)
+        except Exception:
+            logger.exception("MCP message handler failed")
+
+
+def _session_factory(
+    open_transport: Callable[[], AbstractAsyncContextManager[tuple[Any, ...]]],
+    read_timeout_seconds: float,
+) -> SessionFactory:
+    @asynccontextmanager
+    async def open_session() -> AsyncIterator[ClientSession]:
+        async with open_transport() as streams:
+            read, write = streams[0], streams[1]
+            async with ClientSession(
+                read,
+                write,
+                read_timeout_seconds=timedelta(seconds=read_timeout_seconds),
+                message_handler=_dispatch_message,
+            ) as session:
+                await session.initialize()
+                yield session
+
+    return open_session
+
+
+def sse_session_factory(url: str, read_timeout_seconds: float) -> SessionFactory:
+    """Return a factory opening initialized SSE sessions against `url`.
+
+    Args:
+        url: SSE endpoint of the MCP server
+        read_timeout_seconds: Timeout for each request sent over the session
+
+    Returns:
+        SessionFactory: Callable returning an async context manager yielding the session
+    """
+    return _session_factory(lambda: sse_client(url), read_timeout_seconds)
+
+
+def streamable_http_session_factory(url: str, read_timeout_seconds: float) -> SessionFactory:
+    """Return a factory opening initialized streamable HTTP sessions against `url`.
+
+    Args:
+        url: Streamable HTTP endpoint of the MCP server, usually ending in `/mcp`
+        read_timeout_seconds: Timeout for each request sent over the session
+
+    Returns:
+        SessionFactory: Callable returning an async context manager yielding the session
+    """
+    return _session_factory(lambda: streamablehttp_client(url), read_timeout_seconds)
+
+
+def stdio_session_factory(
+    server: StdioServerParameters, read_timeout_seconds: float
+) -> SessionFactory:
+    """Return a factory starting the MCP server as a subprocess per session, over stdio.
+
+    Args:
+        server: Command, arguments and environment of the server process
+        read_timeout_seconds: Timeout for each request sent over the session
+
+    Returns:
+        SessionFactory: Callable returning an async context manager yielding the session
+    """
+    return _session_factory(lambda: stdio_client(server), read_timeout_seconds)
+
+
+class LatencyStats:
+    """Latency percentiles over the most recent calls."""
+
+    def __init__(self, max_samples: int = 1000) -> None:
+        self._samples: deque[float] = deque(maxlen=max_samples)
+        self._count = 0
+
+    def record(self, seconds: float) -> None:
+        """Record the duration of one call."""
+        self._samples.append(seconds)
+        self._count += 1
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Call count and p50, p95 and max latency in seconds over the recent calls."""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"calls": 0, "p50_seconds": 0.0, "p95_seconds": 0.0, "max_seconds": 0.0}
+        return {
+            "calls": self._count,
+            "p50_seconds": samples[len(samples) // 2],
+            "p95_seconds": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max_seconds": samples[-1],
+        }
+
+
+class _PooledSession:
+    """A single persistent MCP session kept open by a dedicated task.
+
+    The transport context managers are entered and exited by the same task, as anyio requires,
+    while the session itself is lent out to any caller.
+    """
+
+    def __init__(self, session_factory: SessionFactory) -> None:
+        self._session_factory = session_factory
+        self._session: ClientSession | None = None
+        self._ready = asyncio.Event()
+        self._close_requested = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._error: BaseException | None = None
+        self.last_used = time.monotonic()
+
+    @property
+    def session(self) -> ClientSession:
+        if self._session is None:
+            msg = "MCP session is not open"
+            raise RuntimeError(msg)
+        return self._session
+
+    @property
+    def is_alive(self) -> bool:
+        return self._session is not None and self._task is not None and not self._task.done()
+
+    async def open(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        try:
+            await self._ready.wait()
+        except BaseException:
+            # Stop a handshake the caller gave up on, which would otherwise keep the
+            # connection, or the stdio server process, open with nobody to close it
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            raise
+        if self._error is not None:
+            raise self._error
+
+    async def close(self) -> None:
+        self._close_requested.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        try:
+            async with self._session_factory() as session:
+                self._session = session
+                self._ready.set()
+                await self._close_requested.wait()
+        except Exception as e:  # noqa: BLE001
+            # Transports fail in many ways; any of them is surfaced to the caller of `open` if
+            # the session never came up
+            self._error = e
+            logger.warning("Pooled MCP session closed unexpectedly", exc_info=True)
+        finally:
+            self._session = None
+            self._ready.set()
+
+
+class MCPSessionPool:
+    """Pool of persistent MCP sessions to a single backend.
+
+    At most `max_size` sessions are open and lent out at once; further callers wait for a free
+    session. Idle sessions are pinged before reuse once they have been idle for longer than
+    `health_check_interval_seconds`, and dead or failing sessions are discarded and reopened.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: SessionFactory,
+        *,
+        max_size: int = 4,
+        health_check_interval_seconds: float = 30.0,
+        transport: str = "sse",
+    ) -> None:
+        self.name = name
+        self.transport = transport
+        self.call_latency = LatencyStats()
+        self._session_factory = session_factory
+        self._max_size = max_size
+        self._health_check_interval_seconds = health_check_interval_seconds
+        self._semaphore = asyncio.Semaphore(max_size)
+        self._idle: list[_PooledSession] = []
+        self._in_use = 0
+        self._opened = 0
+        self._discarded = 0
+        self._closed = False
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Counters describing the pool usage."""
+        return {
+            "max_size": self._max_size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "opened": self._opened,
+            "discarded": self._discarded,
+        }
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[ClientSession]:
+        """Borrow a healthy session for the duration of the context.
+
+        Sessions that raise anything but an MCP protocol error, request timeouts included, are
+        discarded, since the error may have left the underlying connection in an unknown state.
+
+        Yields:
+            ClientSession: An initialized MCP session
+        """
+        async with self._semaphore:
+            pooled = await self._acquire()
+            self._in_use += 1
+            try:
+                yield pooled.session
+            except BaseException as e:
+                if is_protocol_error(e):
+                    await self._release(pooled)
+                else:
+                    await self._discard(pooled)
+                raise
+            else:
+                await self._release(pooled)
+            finally:
+                self._in_use -= 1
+
+    async def run(
+        self, operation: Callable[[ClientSession], Awaitable[T]], *, retries: int = 1
+    ) -> T:
+        """Run `operation` on a pooled session, reconnecting on connection failures.
+
+        Args:
+            operation: Coroutine function receiving the session
+            retries: Number of times to retry on a fresh session after a non-protocol error
+
+        Returns:
+            The operation's result
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.session() as session:
+                    return await operation(session)
+            except Exception as e:
+                if is_protocol_error(e) or attempt >= retries:
+                    raise
+                attempt += 1
+                logger.warning("MCP %s session failed, reconnecting", self.name, exc_info=True)
+
+    async def close(self) -> None:
+        """Close every idle session. Sessions in use are closed when they are released."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(pooled.close() for pooled in idle))
+
+    async def _acquire(self) -> _PooledSession:
+        while self._idle:
+            pooled = self._idle.pop()
+            if await self._is_healthy(pooled):
+                return pooled
+            await self._discard(pooled)
+
+        pooled = _PooledSession(self._session_factory)
+        await pooled.open()
+        self._opened += 1
+        logger.info("Opened MCP %s session", self.name)
+        return pooled
+
+    async def _is_healthy(self, pooled: _PooledSession) -> bool:
+        if not pooled.is_alive:
+            return False
+        if time.monotonic() - pooled.last_used < self._health_check_interval_seconds:
+            return True
+        try:
+            await pooled.session.send_ping()
+        except Exception:  # noqa: BLE001 - any failed ping means the session is unusable
+            logger.warning("MCP %s session failed health check", self.name, exc_info=True)
+            return False
+        return True
+
+    async def _release(self, pooled: _PooledSession) -> None:
+        if self._closed:
+            await pooled.close()
+            return
+        pooled.last_used = time.monotonic()
+        self._idle.append(pooled)
+
+    async def _discard(self, pooled: _PooledSession) -> None:
+        self._discarded += 1
+        await pooled.close()
+
+
+class PooledMCPClient:
+    """MCP client borrowing sessions from an `MCPSessionPool`.
+
+    Implements the subset of `ClientSession` used by `McpToolSpec`, so it can replace
+    `BasicMCPClient` without opening a new connection per call. Results of cacheable tools are
+    served from `cache` when an identical call was made recently, then from the on-disk `store`
+    shared with other workers and earlier runs of the server. Identical calls made while one is
+    in flight share its request through `coalescer`.
+
+    Failed calls are retried by `breaker`, or by the pool when there is none, on a fresh
+    session. Calls to `side_effect_tools` are never retried, since the server may have run them
+    before failing.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        pool: MCPSessionPool,
+        breaker: CircuitBreaker | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+        cache: ToolResultCache | None = None,
+        store: ToolResultStore | None = None,
+        coalescer: ToolCallCoalescer | None = None,
+        side_effect_tools: Collection[str] = (),
+    ) -> None:
+        self.pool = pool
+        self.breaker = breaker
+        self.limiter = limiter
+        self.cache = cache
+        self.store = store
+        self.coalescer = coalescer
+        self.side_effect_tools = side_effect_tools
+        # Hash of each tool's schema, set when tools are built from the schemas
+        self.tool_schema_hashes: dict[str, str] = {}
+
+    async def _run(
+        self, operation: Callable[[ClientSession], Awaitable[T]], *, retry: bool = True
+    ) -> T:
+        if self.breaker is None:
+            return await self.pool.run(operation, retries=1 if retry else 0)
+        # The breaker's jittered retries are the only ones, each on a fresh session
+        return await self.breaker.call(
+            lambda: self.pool.run(operation, retries=0), retries=None if retry else 0
+        )
+
+    async def call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None = None
+    ) -> types.CallToolResult:
+        """Call a tool on the MCP server, waiting for a free slot if the server is at capacity."""
+        key = tool_call_key(
+            self.pool.name, tool_name, arguments, self.tool_schema_hashes.get(tool_name)
+        )
+        if self.cache is not None and self.cache.is_cacheable(tool_name):
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if self.coalescer is not None and self.coalescer.is_coalescable(tool_name):
+            return await self.coalescer.run(
+                key, lambda: self._load_tool_result(key, tool_name, arguments)
+            )
+        return await self._load_tool_result(key, tool_name, arguments)
+
+    async def _load_tool_result(
+        self, key: str, tool_name: str, arguments: dict[str, Any] | None
+    ) -> types.CallToolResult:
+        if self.cache is None or not self.cache.is_cacheable(tool_name):
+            return await self._call_tool(tool_name, arguments)
+
+        if self.store is not None:
+            stored = await asyncio.to_thread(self.store.get, key)
+            if stored is not None:
+                result, remaining_ttl = stored
+                self.cache.set(key, tool_name, result, remaining_ttl)
+                return result
+
+        result = await self._call_tool(tool_name, arguments)
+        self.cache.set(key, tool_name, result)
+        ttl = self.cache.ttl_for(tool_name)
+        if self.store is not None and ttl is not None and not result.isError:
+            await asyncio.to_thread(self.store.set, key, tool_name, result, ttl)
+        return result
+
+    async def _call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None
+    ) -> types.CallToolResult:
+        if self.limiter is None:
+            return await self._timed_call_tool(tool_name, arguments)
+
+        # Fail fast instead of queueing for a server that is known to be down
+        if self.breaker is not None:
+            self.breaker.ensure_available()
+        async with self.limiter.slot():
+            return await self._timed_call_tool(tool_name, arguments)
+
+    async def _timed_call_tool(
+        self, tool_name: str, arguments: dict[str, Any] | None
+    ) -> types.CallToolResult:
+        started = time.perf_counter()
+        result = await self._run(
+            lambda session: session.call_tool(tool_name, arguments),
+            retry=tool_name not in self.side_effect_tools,
+        )
+        self.pool.call_latency.record(time.perf_counter() - started)
+        return result
+
+    async def list_tools(self) -> types.ListToolsResult:
+        """List all available tools on the MCP server."""
+        return await self._run(lambda session: session.list_tools())
+
+    async def list_resources(self) -> types.ListResourcesResult:
+        """List all available resources on the MCP server."""
+        return await self._run(lambda session: session.list_resources())
+
+    async def read_resource(self, resource_name: str) -> types.ReadResourceResult:
+        """Read a resource from the MCP server."""
+        return await self._run(lambda session: session.read_resource(AnyUrl(resource_name)))
+
+
+def get_mcp_server_urls(mcp_config: MCPConfig) -> dict[str, str]:
+    """Map each MCP server name to its URL.
+
+    Servers using the stdio transport are identified by a `stdio:` URL built from their
+    command, so pools and snapshot entries follow command changes.
+
+    Args:
+        mcp_config: MCP configuration to read the URLs from
+
+    Returns:
+        dict[str, str]: Server name to URL
+    """
+    urls = {
+        "datawarehouse": mcp_config.datawarehouse_url,
+        "rag": mcp_config.rag_url,
+        "geospatial": mcp_config.geospatial_url,
+    }
+    for name, transport in mcp_config.transports.items():
+        if transport.type == "stdio" and transport.command is not None:
+            urls[name] = f"stdio:{shlex.join([transport.command, *transport.args])}"
+    return urls
+
+
+def get_session_factory(name: str, url: str, mcp_config: MCPConfig) -> SessionFactory:
+    """Return the session factory for the transport configured for server `name`.
+
+    Args:
+        name: Server name
+        url: Server URL, unused for stdio servers
+        mcp_config: MCP configuration holding the transports and timeouts
+
+    Returns:
+        SessionFactory: Factory opening initialized sessions to the server
+    """
+    transport = mcp_config.transports.get(name, MCPTransportConfig())
+    match transport.type:
+        case "sse":
+            return sse_session_factory(url, mcp_config.read_timeout_seconds)
+        case "streamable_http":
+            return streamable_http_session_factory(url, mcp_config.read_timeout_seconds)
+        case "stdio":
+            server = StdioServerParameters(
+                command=transport.command or "",
+                args=transport.args,
+                env=transport.env,
+                cwd=transport.cwd,
+            )
+            return stdio_session_factory(server, mcp_config.read_timeout_seconds)
+
+
+# Process-wide pools and circuit breakers keyed by backend URL
+_session_pools: dict[str, MCPSessionPool] = {}
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_concurrency_limiters: dict[str, ConcurrencyLimiter] = {}
+
+
+def get_session_pool(name: str, url: str, mcp_config: MCPConfig) -> MCPSessionPool:
+    """Return the shared session pool for `url`, creating it on first use.
+
+    Args:
+        name: Backend name used in logs
+        url: Endpoint of the MCP server
+        mcp_config: MCP configuration holding the transport and pool settings
+
+    Returns:
+        MCPSessionPool: The pool shared by every agent run
+    """
+    pool = _session_pools.get(url)
+    if pool is None:
+        # Enough sessions for every concurrent call, so calls only ever queue in the limiter
+        max_size = max(mcp_config.pool_size, mcp_config.max_concurrent_calls.get(name, 0))
+        pool = MCPSessionPool(
+            name,
+            get_session_factory(name, url, mcp_config),
+            max_size=max_size,
+            health_check_interval_seconds=mcp_config.health_check_interval_seconds,
+            transport=mcp_config.transports.get(name, MCPTransportConfig()).type,
+        )
+        _session_pools[url] = pool
+    return pool
+
+
+def get_circuit_breaker(name: str, url: str, mcp_config: MCPConfig) -> CircuitBreaker:
+    """Return the shared circuit breaker for `url`, creating it on first use."""
+    breaker = _circuit_breakers.get(url)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=mcp_config.circuit_failure_threshold,
+            recovery_timeout_seconds=mcp_config.circuit_recovery_seconds,
+            retries=mcp_config.retries,
+            retry_base_delay_seconds=mcp_config.retry_base_delay_seconds,
+        )
+        _circuit_breakers[url] = breaker
+    return breaker
+
+
+def get_concurrency_limiter(
+    name: str, url: str, mcp_config: MCPConfig
+) -> ConcurrencyLimiter | None:
+    """Return the shared concurrency limiter for `url`, None if its calls are unlimited."""
+    max_concurrency = mcp_config.max_concurrent_calls.get(name)
+    if max_concurrency is None:
+        return None
+    limiter = _concurrency_limiters.get(url)
+    if limiter is None:
+        limiter = ConcurrencyLimiter(name, max_concurrency, mcp_config.max_queue_seconds)
+        _concurrency_limiters[url] = limiter
+    return limiter
+
+
+def get_mcp_client(name: str, url: str, mcp_config: MCPConfig) -> PooledMCPClient:
+    """Return a client for `url` backed by the shared pool, breaker, limiter, cache and store."""
+    return PooledMCPClient(
+        get_session_pool(name, url, mcp_config),
+        get_circuit_breaker(name, url, mcp_config),
+        get_concurrency_limiter(name, url, mcp_config),
+        get_tool_cache(mcp_config.tool_cache),
+        get_tool_store(mcp_config.tool_cache),
+        get_tool_coalescer(mcp_config.tool_cache),
+        mcp_config.tool_cache.uncacheable_tools,
+    )
+
+
+def get_backend_stats() -> dict[str, dict[str, object]]:
+    """Transport, latency, pool, breaker and concurrency stats of every backend, keyed by URL."""
+    return {
+        url: {
+            "name": pool.name,
+            "transport": pool.transport,
+            "call_latency": pool.call_latency.stats,
+            "pool": pool.stats,
+            "circuit": _circuit_breakers[url].state if url in _circuit_breakers else None,
+            "concurrency": _concurrency_limiters[url].stats
+            if url in _concurrency_limiters
+            else None,
+        }
+        for url, pool in _session_pools.items()
+    }
+
+
+async def close_session_pools() -> None:
+    """Close and forget every session pool."""
+    pools = list(_session_pools.values())
+    _session_pools.clear()
+    await asyncio.gather(*(pool.close() for pool in pools))
@@ -0,0 +1,182 @@
+import json
+from collections.abc import Callable, Collection
+from typing import Any
+
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.utils import get_tokenizer  # type: ignore[misc]
+from logging_config import get_logger
+from mcp import types
+from schemas import OBSERVATION_ENCODINGS, ObservationConfig
+
+logger = get_logger(__name__)
+
+# Lists of records shorter than this are left as they are, a header would not pay off
+MIN_TABLE_ROWS = 2
+
+
+def records_columns(value: list[Any]) -> list[str] | None:
+    """Return the shared keys of a list of records, None if it is not one."""
+    if len(value) < MIN_TABLE_ROWS or not all(isinstance(item, dict) for item in value):
+        return None
+    columns = list(value[0])
+    if not columns or any(item.keys() != value[0].keys() for item in value[1:]):
+        return None
+    return columns
+
+
+def tabulate(value: Any) -> Any:  # noqa: ANN401
+    """Rewrite every list of records sharing the same keys as `{"columns": ..., "rows": ...}`.
+
+    Keys are written once in `columns` and each record becomes a row of values in that order,
+    so no value is lost. Records with differing keys are left as they are.
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item) for key, item in value.items()}  # type: ignore[misc]
+    if isinstance(value, list):
+        columns = records_columns(value)  # type: ignore[arg-type]
+        if columns is None:
+            return [tabulate(item) for item in value]  # type: ignore[misc]
+        return {
+            "columns": columns,
+            "rows": [[tabulate(record[column]) for column in columns] for record in value],  # type: ignore[misc]
+        }
+    return value
+
+
+OMITTED_PLACEHOLDER = "[{size} characters omitted from this observation, already sent to the user]"
+
+
+def omit_fields(payload: object, fields: Collection[str]) -> tuple[object, bool]:
+    """Replace the given top-level fields of a JSON object by a placeholder with their size.
+
+    Returns:
+        tuple[object, bool]: The payload and whether any field was replaced
+    """
+    if not isinstance(payload, dict) or not fields:
+        return payload, False  # type: ignore[return-value]
+    omitted = False
+    replaced: dict[str, Any] = {}
+    for key, value in payload.items():  # type: ignore[misc]
+        if key in fields and value:
+            size = len(value if isinstance(value, str) else json.dumps(value))
+            replaced[key] = OMITTED_PLACEHOLDER.format(size=size)
+            omitted = True
+        else:
+            replaced[key] = value
+    return replaced, omitted
+
+
+def encode_json(
+    text: str, encoding: OBSERVATION_ENCODINGS, omitted_fields: Collection[str] = ()
+) -> str | None:
+    """Re-encode a JSON document, None if `text` is not JSON or is left as it is."""
+    try:
+        payload = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    payload, omitted = omit_fields(payload, omitted_fields)
+    if encoding == "raw":
+        return json.dumps(payload, ensure_ascii=False, indent=2) if omitted else None
+    if encoding == "table":
+        payload = tabulate(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+class ObservationEncoder:
+    """Compact, lossless encoding of JSON tool observations.
+
+    MCP tool outputs are pretty-printed JSON wrapped in the `CallToolResult` repr. The encoder
+    replaces the observation with the minified JSON text, optionally written as tables, and
+    keeps any note prepended to the output, e.g. by the tool journal. Fields listed in
+    `omitted_fields`, like the `build_map` HTML, are replaced by a placeholder even for raw
+    encoding. Errors, non-JSON and non-text outputs are left untouched.
+    """
+
+    def __init__(self, observation_config: ObservationConfig) -> None:
+        self.observation_config = observation_config
+        self._tokenizer: Callable[[str], list[Any]] = get_tokenizer()
+        self._encoded = 0
+        self._tokens_before = 0
+        self._tokens_after = 0
+
+    def encoding_for(self, tool_name: str) -> OBSERVATION_ENCODINGS:
+        return self.observation_config.tool_encodings.get(
+            tool_name, self.observation_config.encoding
+        )
+
+    def _encode_content(
+        self, result: ToolCallResult, encoding: OBSERVATION_ENCODINGS
+    ) -> str | None:
+        content = str(result.tool_output.content)
+        omitted_fields = self.observation_config.omitted_fields.get(result.tool_name, [])
+        raw_output = result.tool_output.raw_output
+        if not isinstance(raw_output, types.CallToolResult):
+            return encode_json(content, encoding, omitted_fields)
+        raw_text = str(raw_output)
+        if raw_output.isError or not content.endswith(raw_text):
+            return None
+        texts: list[str] = []
+        encoded = False
+        for block in raw_output.content:
+            if not isinstance(block, types.TextContent):
+                return None
+            text = encode_json(block.text, encoding, omitted_fields)
+            encoded = encoded or text is not None
+            texts.append(block.text if text is None else text)
+        if not encoded:
+            return None
+        return content[: len(content) - len(raw_text)] + "\n".join(texts)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._tokenizer(text))
+
+    def encode(self, result: ToolCallResult) -> ToolCallResult:
+        """Return `result` with its observation re-encoded, logging the tokens saved."""
+        encoding = self.encoding_for(result.tool_name)
+        if result.tool_output.is_error:
+            return result
+        encoded = self._encode_content(result, encoding)
+        if encoded is None:
+            return result
+
+        tokens_before = self.count_tokens(str(result.tool_output.content))
+        tokens_after = self.count_tokens(encoded)
+        self._encoded += 1
+        self._tokens_before += tokens_before
+        self._tokens_after += tokens_after
+        logger.info(
+            "Encoded %s observation as %s: %d -> %d tokens, %d saved",
+            result.tool_name,
+            encoding,
+            tokens_before,
+            tokens_after,
+            tokens_before - tokens_after,
+        )
+        tool_output = result.tool_output.model_copy(update={"content": encoded})
+        return result.model_copy(update={"tool_output": tool_output})
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Encoded observation count and their token counts before and after encoding."""
+        return {
+            "encoded": self._encoded,
+            "tokens_before": self._tokens_before,
+            "tokens_after": self._tokens_after,
+            "tokens_saved": self._tokens_before - self._tokens_after,
+        }
+
+
+# Process-wide encoders keyed by their configuration
+_observation_encoders: dict[str, ObservationEncoder] = {}
+
+
+def get_observation_encoder(observation_config: ObservationConfig) -> ObservationEncoder | None:
+    """Return the shared encoder for `observation_config`, None if every tool is left raw."""
+    encodings = {observation_config.encoding, *observation_config.tool_encodings.values()}
+    if encodings == {"raw"} and not any(observation_config.omitted_fields.values()):
+        return None
+    key = observation_config.model_dump_json()
+    encoder = _observation_encoders.get(key)
+    if encoder is None:
+        encoder = _observation_encoders[key] = ObservationEncoder(observation_config)
+    return encoder
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import re
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+import numpy as np
+import numpy.typing as npt
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.memory import BaseMemory
+from llama_index.core.tools import AsyncBaseTool, ToolOutput
+from llama_index.core.workflow import Context
+from logging_config import get_logger
+from observation_encoding import records_columns
+from observations import BoundedObservationReActAgent, json_payload
+from pydantic import Field, PrivateAttr
+from schemas import ObservationStoreConfig
+from workflows.context.state_store import DictState
+
+logger = get_logger(__name__)
+
+_REFERENCE = re.compile(r"^(t\d+)\.(.+)$")
+
+STORED_NOTE = (
+    "[Numeric table {handle}{path}: {rows} rows, columns {columns}. Pass "
+    '"{handle}.<column>" to calculator tools instead of copying its numbers.]\n'
+)
+
+Columns = dict[str, npt.NDArray[np.float64]]
+
+
+@dataclass(frozen=True)
+class StoredColumn:
+    """Column of a stored table, passed to calculator tools in place of its reference."""
+
+    reference: str
+    values: npt.NDArray[np.float64]
+
+    def __str__(self) -> str:
+        """The reference, so the column is logged as the model wrote it."""
+        return self.reference
+
+
+def numeric_column(values: Sequence[object]) -> npt.NDArray[np.float64] | None:
+    """Return the values as floats, None unless they are numbers, numeric strings or nulls.
+
+    Nulls become NaN. A column of nulls only is not numeric.
+    """
+    if any(
+        isinstance(value, bool) or not isinstance(value, int | float | str | None)
+        for value in values
+    ):
+        return None
+    try:
+        column = np.array(
+            [np.nan if value is None else float(value) for value in values],  # type: ignore[arg-type]
+            dtype=np.float64,
+        )
+    except ValueError:
+        return None
+    return None if np.isnan(column).all() else column
+
+
+def find_tables(payload: object, min_rows: int, path: str = "") -> Iterator[tuple[str, Columns]]:
+    """Yield the JSON path and numeric columns of every list of records in `payload`."""
+    if isinstance(payload, dict):
+        for key, value in cast("dict[str, object]", payload).items():
+            yield from find_tables(value, min_rows, f"{path}.{key}" if path else key)
+        return
+    if not isinstance(payload, list):
+        return
+    items = cast("list[object]", payload)
+    columns = records_columns(items) if len(items) >= min_rows else None
+    if columns is None:
+        for index, item in enumerate(items):
+            yield from find_tables(item, min_rows, f"{path}[{index}]")
+        return
+    records = cast("list[dict[str, object]]", items)
+    numeric: Columns = {}
+    for column in columns:
+        values = numeric_column([record[column] for record in records])
+        if values is not None:
+            numeric[column] = values
+    if numeric:
+        yield path, numeric
+
+
+class ObservationStore:
+    """Numeric tables found in the tool observations of one agent run, by handle.
+
+    Every list of records with numeric fields is kept as NumPy columns under a handle such as
+    `t1`, so calculator tools can take `"t1.<column>"` instead of numbers copied by the model.
+    An observation seen again, e.g. a replayed call, keeps its handles as long as they are
+    stored; once one is evicted, the observation is stored again under new handles.
+    """
+
+    def __init__(self, store_config: ObservationStoreConfig) -> None:
+        self.store_config = store_config
+        self._tables: OrderedDict[str, Columns] = OrderedDict()
+        self._notes: dict[str, str] = {}
+        # Digest of the observation each stored table comes from
+        self._digests: dict[str, str] = {}
+        self._count = 0
+
+    def add(self, payload: object) -> str:
+        """Store the tables of a JSON payload, returning the note describing them."""
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        if digest in self._notes:
+            return self._notes[digest]
+        notes: dict[str, str] = {}
+        for path, columns in find_tables(payload, self.store_config.min_rows):
+            self._count += 1
+            handle = f"t{self._count}"
+            self._tables[handle] = columns
+            self._digests[handle] = digest
+            if len(self._tables) > self.store_config.max_tables:
+                self._evict()
+            notes[handle] = STORED_NOTE.format(
+                handle=handle,
+                path=f" ({path})" if path else "",
+                rows=len(next(iter(columns.values()))),
+                columns=", ".join(columns),
+            )
+        note = self._notes[digest] = "".join(
+            text for handle, text in notes.items() if handle in self._tables
+        )
+        return note
+
+    def _evict(self) -> None:
+        """Drop the oldest table, and the note of its observation since it names the table."""
+        handle, _ = self._tables.popitem(last=False)
+        self._notes.pop(self._digests.pop(handle), None)
+
+    def column(self, reference: str) -> StoredColumn:
+        """Return the column a `"<handle>.<column>"` reference points to.
+
+        Raises:
+            ValueError: If the table or the column is unknown
+        """
+        match = _REFERENCE.match(reference)
+        table = self._tables.get(match.group(1)) if match else None
+        if match is None or table is None:
+            known = ", ".join(self._tables) or "none"
+            msg = f"Unknown stored table in {reference!r}, stored tables: {known}"
+            raise ValueError(msg)
+        values = table.get(match.group(2))
+        if values is None:
+            msg = f"{match.group(1)} has no numeric column {match.group(2)!r}: {', '.join(table)}"
+            raise ValueError(msg)
+        return StoredColumn(reference, values)
+
+    def resolve(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Replace the column references among `arguments` by the stored columns.
+
+        Raises:
+            ValueError: If a reference points to an unknown table or column
+        """
+        return {
+            name: self.column(value)
+            if isinstance(value, str) and _REFERENCE.match(value)
+            else value
+            for name, value in arguments.items()
+        }
+
+
+class ObservationStoreReActAgent(BoundedObservationReActAgent):
+    """ReAct agent keeping an `ObservationStore` per run for its calculator tools.
+
+    Tables are stored before the observation is encoded, and a note naming their handles is
+    prepended to it. References passed to `column_tools` are resolved to the stored columns
+    before the tool is called; unknown ones fail the call with the tables that exist.
+    """
+
+    observation_store_config: ObservationStoreConfig | None = None
+    # Tools taking "<handle>.<column>" references in place of numbers
+    column_tools: list[str] = Field(default_factory=list)
+    _stores: weakref.WeakKeyDictionary[Context[DictState], ObservationStore] = PrivateAttr(  # type: ignore[misc]
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    def get_observation_store(self, ctx: Context[DictState]) -> ObservationStore | None:
+        """Return the store of the run owning `ctx`, None if storing tables is disabled."""
+        if self.observation_store_config is None or not self.observation_store_config.enabled:
+            return None
+        store = self._stores.get(ctx)
+        if store is None:
+            store = self._stores[ctx] = ObservationStore(self.observation_store_config)
+        return store
+
+    def _store_tables(self, store: ObservationStore, result: ToolCallResult) -> ToolCallResult:
+        if result.tool_output.is_error or result.tool_name in self.column_tools:
+            return result
+        payload = json_payload(result)
+        note = store.add(payload) if payload is not None else ""
+        if not note:
+            return result
+        logger.info("Stored numeric tables of %s observation", result.tool_name)
+        content = note + str(result.tool_output.content)
+        tool_output = result.tool_output.model_copy(update={"content": content})
+        return result.model_copy(update={"tool_output": tool_output})
+
+    async def handle_tool_call_results(
+        self, ctx: Context[DictState], results: list[ToolCallResult], memory: BaseMemory
+    ) -> None:
+        """Store the numeric tables of the observations before recording them."""
+        store = self.get_observation_store(ctx)
+        if store is not None:
+            results = [self._store_tables(store, result) for result in results]
+        await super().handle_tool_call_results(ctx, results, memory)
+
+    async def _call_tool(
+        self, ctx: Context[DictState], tool: AsyncBaseTool, tool_input: dict[str, Any]
+    ) -> ToolOutput:
+        store = self.get_observation_store(ctx)
+        tool_name = tool.metadata.get_name()
+        if store is None or tool_name not in self.column_tools:
+            return await super()._call_tool(ctx, tool, tool_input)  # type: ignore[misc]
+        try:
+            resolved = store.resolve(tool_input)
+        except ValueError as e:
+            return ToolOutput(
+                content=str(e),
+                tool_name=tool_name,
+                raw_input=tool_input,
+                raw_output=None,
+                is_error=True,
+            )
+        return await super()._call_tool(ctx, tool, resolved)  # type: ignore[misc]
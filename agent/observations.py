@@ -0,0 +1,212 @@
+import asyncio
+import json
+import re
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+from llama_index.core.agent.workflow import ReActAgent, ToolCallResult
+from llama_index.core.memory import BaseMemory
+from llama_index.core.tools.function_tool import FunctionTool
+from llama_index.core.workflow import Context
+from logging_config import get_logger
+from mcp import types
+from observation_encoding import ObservationEncoder
+from schemas import ObservationConfig
+from workflows.context.state_store import DictState
+
+logger = get_logger(__name__)
+
+READ_TOOL_NAME = "read_tool_output"
+
+_HANDLE = re.compile(r"^[0-9a-f]{32}$")
+
+# Maximum number of JSON keys listed in the summary of a spilled observation
+MAX_SUMMARY_KEYS = 20
+
+
+def json_payload(result: ToolCallResult) -> object | None:
+    """Return the first JSON document of a tool observation, None if it has none."""
+    raw_output = result.tool_output.raw_output
+    texts = [result.tool_output.content]
+    if isinstance(raw_output, types.CallToolResult):
+        texts = [block.text for block in raw_output.content if isinstance(block, types.TextContent)]
+    for text in texts:
+        try:
+            return json.loads(text)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _describe(value: object) -> str:
+    if isinstance(value, list):
+        return f"list of {len(value)} items"  # type: ignore[arg-type]
+    if isinstance(value, dict):
+        return f"object with {len(value)} keys"  # type: ignore[arg-type]
+    return type(value).__name__
+
+
+def summarize_structure(payload: object) -> str | None:
+    """Describe the shape of a JSON payload, e.g. its keys and list lengths."""
+    if isinstance(payload, dict):
+        items: list[tuple[str, Any]] = list(payload.items())  # type: ignore[arg-type]
+        keys = ", ".join(f"{key} ({_describe(value)})" for key, value in items[:MAX_SUMMARY_KEYS])
+        more = f" and {len(items) - MAX_SUMMARY_KEYS} more" if len(items) > MAX_SUMMARY_KEYS else ""
+        return f"JSON object with keys: {keys}{more}"
+    if isinstance(payload, list):
+        return f"JSON {_describe(payload)}"  # type: ignore[arg-type]
+    return None
+
+
+class ObservationSpill:
+    """Oversized tool observations spilled to disk, readable page by page through a handle.
+
+    Files live in `spill_dir`, or a private temporary directory, and are deleted once they are
+    older than `spill_ttl_seconds`, checked every `spill_purge_every` spills. Disk writes run in
+    a worker thread so they do not block the event loop.
+    """
+
+    def __init__(self, observation_config: ObservationConfig) -> None:
+        self.observation_config = observation_config
+        self._dir: Path | None = None
+        self._spilled = 0
+
+    @property
+    def directory(self) -> Path:
+        if self._dir is None:
+            if self.observation_config.spill_dir is None:
+                self._dir = Path(tempfile.mkdtemp(prefix="agent-observations-"))
+            else:
+                self._dir = Path(self.observation_config.spill_dir)
+                self._dir.mkdir(parents=True, exist_ok=True)
+        return self._dir
+
+    def max_chars_for(self, tool_name: str) -> int | None:
+        """Observation size above which `tool_name` results are spilled, None for no limit."""
+        return self.observation_config.tool_max_chars.get(
+            tool_name, self.observation_config.max_chars
+        )
+
+    def page_count(self, content: str) -> int:
+        return max(1, -(-len(content) // self.observation_config.page_chars))
+
+    async def spill(self, content: str) -> str:
+        """Write `content` to disk and return its handle."""
+        handle = uuid.uuid4().hex
+        purge = self._spilled % self.observation_config.spill_purge_every == 0
+        self._spilled += 1
+        await asyncio.to_thread(self._write, handle, content, purge=purge)
+        return handle
+
+    def _write(self, handle: str, content: str, *, purge: bool) -> None:
+        if purge:
+            self._purge_expired()
+        (self.directory / handle).write_text(content, encoding="utf-8")
+
+    def read(self, handle: str, page: int = 1) -> dict[str, Any]:
+        """Return one page of a spilled observation.
+
+        Raises:
+            ValueError: If the handle is unknown or expired, or the page is out of range
+        """
+        path = self.directory / handle
+        if not _HANDLE.match(handle) or not path.exists():
+            msg = f"Unknown or expired tool output handle: {handle}"
+            raise ValueError(msg)
+        content = path.read_text(encoding="utf-8")
+        pages = self.page_count(content)
+        if not 1 <= page <= pages:
+            msg = f"Page {page} out of range, {handle} has {pages} pages"
+            raise ValueError(msg)
+        page_chars = self.observation_config.page_chars
+        return {
+            "handle": handle,
+            "page": page,
+            "pages": pages,
+            "content": content[(page - 1) * page_chars : page * page_chars],
+        }
+
+    async def limit(self, result: ToolCallResult) -> ToolCallResult:
+        """Replace an oversized observation by its head, a summary and a handle."""
+        tool_name = result.tool_name
+        content = str(result.tool_output.content)
+        max_chars = self.max_chars_for(tool_name)
+        if max_chars is None or len(content) <= max_chars or tool_name == READ_TOOL_NAME:
+            return result
+
+        handle = await self.spill(content)
+        head_chars = min(self.observation_config.head_chars, max_chars)
+        structure = summarize_structure(json_payload(result))
+        lines = [
+            f"[{tool_name} returned {len(content)} characters, stored under handle {handle} "
+            f"in {self.page_count(content)} pages. Only the first {head_chars} characters are "
+            f'shown. Call {READ_TOOL_NAME} with handle="{handle}" and a page number to read more.]',
+        ]
+        if structure:
+            lines.append(f"[Structure: {structure}]")
+        lines.append(content[:head_chars])
+        logger.info("Spilled %d character %s observation to %s", len(content), tool_name, handle)
+        tool_output = result.tool_output.model_copy(update={"content": "\n".join(lines)})
+        return result.model_copy(update={"tool_output": tool_output})
+
+    def get_tools(self) -> list[FunctionTool]:
+        """Return the tool reading spilled observations back."""
+
+        def read_tool_output(handle: str, page: int = 1) -> dict[str, Any]:
+            """Read one page of a large tool output that was stored under a handle."""
+            return self.read(handle, page)
+
+        return [FunctionTool.from_defaults(fn=read_tool_output, name=READ_TOOL_NAME)]
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.observation_config.spill_ttl_seconds
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                logger.warning("Could not delete spilled observation %s", path, exc_info=True)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {"spilled": self._spilled}
+
+
+class BoundedObservationReActAgent(ReActAgent):
+    """ReAct agent encoding and bounding tool observations before they reach the LLM.
+
+    Observations are first re-encoded compactly, then spilled if still oversized.
+    `ToolCallResult` events are still streamed whole; only the observation recorded in the
+    reasoning, and sent back to the LLM on every later step, is shortened.
+    """
+
+    observation_encoder: ObservationEncoder | None = None
+    observation_spill: ObservationSpill | None = None
+
+    async def handle_tool_call_results(
+        self, ctx: Context[DictState], results: list[ToolCallResult], memory: BaseMemory
+    ) -> None:
+        """Record the observations, encoding them and spilling oversized ones to disk."""
+        if self.observation_encoder is not None:
+            results = [self.observation_encoder.encode(result) for result in results]
+        if self.observation_spill is not None:
+            results = [await self.observation_spill.limit(result) for result in results]
+        await super().handle_tool_call_results(ctx, results, memory)  # type: ignore[misc]
+
+
+# Process-wide spills keyed by their configuration
+_observation_spills: dict[str, ObservationSpill] = {}
+
+
+def get_observation_spill(observation_config: ObservationConfig) -> ObservationSpill | None:
+    """Return the shared spill for `observation_config`, None if observations are unlimited."""
+    if observation_config.max_chars is None and not observation_config.tool_max_chars:
+        return None
+    key = observation_config.model_dump_json()
+    spill = _observation_spills.get(key)
+    if spill is None:
+        spill = _observation_spills[key] = ObservationSpill(observation_config)
+    return spill
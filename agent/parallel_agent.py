@@ -0,0 +1,155 @@
+import asyncio
+import re
+import uuid
+import weakref
+from collections.abc import Sequence
+from typing import Any, cast
+
+from llama_index.core.agent.react.output_parser import ReActOutputParser
+from llama_index.core.agent.react.types import ActionReasoningStep, BaseReasoningStep
+from llama_index.core.agent.workflow import AgentOutput, ToolCall, ToolCallResult
+from llama_index.core.llms import ChatMessage
+from llama_index.core.llms.llm import ToolSelection
+from llama_index.core.memory import BaseMemory
+from llama_index.core.tools import AsyncBaseTool, ToolOutput
+from llama_index.core.workflow import Context, step  # type: ignore[misc]
+from logging_config import get_logger
+from pydantic import PrivateAttr
+from tool_journal import JournaledReActAgent
+from workflows.context.state_store import DictState
+
+logger = get_logger(__name__)
+
+# Upper bound for `max_parallel_tool_calls`: tool calls run by the workflow at the same time
+MAX_TOOL_WORKERS = 16
+
+# Context key holding the extra actions of the current step, keyed by tool id
+PARALLEL_ACTIONS_KEY = "parallel_actions"
+
+_ACTION_LINE = re.compile(r"^\s*Action\s*:", re.MULTILINE)
+
+# Section of the header prompt the parallel actions instructions are inserted before
+CONVERSATION_SECTION = "## Current Conversation"
+
+
+def parse_actions(content: str, output_parser: ReActOutputParser) -> list[ActionReasoningStep]:
+    """Parse every `Action`/`Action Input` pair of a ReAct step, in order.
+
+    Pairs that cannot be parsed are skipped, so a malformed extra action never fails the step.
+
+    Args:
+        content: Full LLM output of the step
+        output_parser: Parser for a single thought-action-input block
+
+    Returns:
+        list[ActionReasoningStep]: The step's actions, empty if it has none
+    """
+    starts = [match.start() for match in _ACTION_LINE.finditer(content)]
+    thought = content[: starts[0]].strip() if starts else ""
+    actions: list[ActionReasoningStep] = []
+    for start, end in zip(starts, [*starts[1:], len(content)], strict=True):
+        block = f"{thought or 'Thought: Running in parallel.'}\n{content[start:end].strip()}"
+        try:
+            reasoning_step = output_parser.parse(block, is_streaming=False)
+        except ValueError:
+            logger.warning("Skipping unparsable action: %s", content[start:end])
+            continue
+        if isinstance(reasoning_step, ActionReasoningStep):
+            actions.append(reasoning_step)
+    return actions
+
+
+def add_parallel_actions_prompt(header_prompt: str, parallel_actions_prompt: str) -> str:
+    """Insert the parallel actions instructions into the ReAct header prompt.
+
+    They go right before the current conversation section, or at the end of the header if it
+    has none.
+    """
+    if not parallel_actions_prompt:
+        return header_prompt
+    instructions = parallel_actions_prompt.strip() + "\n\n"
+    if CONVERSATION_SECTION not in header_prompt:
+        return header_prompt.rstrip() + "\n\n" + instructions
+    return header_prompt.replace(CONVERSATION_SECTION, instructions + CONVERSATION_SECTION, 1)
+
+
+class ParallelReActAgent(JournaledReActAgent):
+    """ReAct agent running the independent actions of one step concurrently.
+
+    The stock agent only acts on the first `Action` of each LLM turn. This one turns every
+    action of the turn into a tool call; the workflow runs them concurrently, at most
+    `max_parallel_tool_calls` at a time per run, and streams each `ToolCallResult` as soon as
+    it completes. Observations are recorded in the order the actions were written, each right
+    after its action, so the next turn reads like a sequential ReAct trace.
+    """
+
+    max_parallel_tool_calls: int = 4
+    _semaphores: weakref.WeakKeyDictionary[Context[DictState], asyncio.Semaphore] = PrivateAttr(  # type: ignore[misc]
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    async def take_step(
+        self,
+        ctx: Context[DictState],
+        llm_input: list[ChatMessage],
+        tools: Sequence[AsyncBaseTool],
+        memory: BaseMemory,
+    ) -> AgentOutput:
+        """Take a ReAct step, turning every action of the LLM output into a tool call."""
+        output = await super().take_step(ctx, llm_input, tools, memory)
+        if len(output.tool_calls) != 1 or not output.response.content:
+            return output
+
+        actions = parse_actions(output.response.content, self.output_parser)
+        if len(actions) <= 1:
+            return output
+
+        extra_actions = {str(uuid.uuid4()): action for action in actions[1:]}
+        await ctx.store.set(PARALLEL_ACTIONS_KEY, extra_actions)
+        logger.info("Running %d actions in parallel", len(actions))
+        output.tool_calls.extend(
+            ToolSelection(
+                tool_id=tool_id,
+                tool_name=action.action,
+                tool_kwargs=cast("dict[str, Any]", action.action_input),
+            )
+            for tool_id, action in extra_actions.items()
+        )
+        return output
+
+    @step(num_workers=MAX_TOOL_WORKERS)  # type: ignore[misc]
+    async def call_tool(self, ctx: Context[DictState], ev: ToolCall) -> ToolCallResult:
+        """Call the tool, streaming its result as soon as it completes."""
+        return await super().call_tool(ctx, ev)  # type: ignore[misc]
+
+    async def _call_tool(
+        self, ctx: Context[DictState], tool: AsyncBaseTool, tool_input: dict[str, Any]
+    ) -> ToolOutput:
+        semaphore = self._semaphores.get(ctx)
+        if semaphore is None:
+            semaphore = self._semaphores[ctx] = asyncio.Semaphore(self.max_parallel_tool_calls)
+        async with semaphore:
+            return await super()._call_tool(ctx, tool, tool_input)
+
+    async def handle_tool_call_results(
+        self, ctx: Context[DictState], results: list[ToolCallResult], memory: BaseMemory
+    ) -> None:
+        """Record each observation right after its action, in the order the actions were written."""
+        extra_actions: dict[str, ActionReasoningStep] = (
+            await ctx.store.get(PARALLEL_ACTIONS_KEY, default=None) or {}
+        )
+        if not extra_actions:
+            await super().handle_tool_call_results(ctx, results, memory)
+            return
+
+        await ctx.store.set(PARALLEL_ACTIONS_KEY, None)
+        order = {tool_id: index for index, tool_id in enumerate(extra_actions, start=1)}
+        for result in sorted(results, key=lambda result: order.get(result.tool_id, 0)):
+            action = extra_actions.get(result.tool_id)
+            if action is not None:
+                current_reasoning: list[BaseReasoningStep] = await ctx.store.get(
+                    self.reasoning_key, default=[]
+                )
+                current_reasoning.append(action)
+                await ctx.store.set(self.reasoning_key, current_reasoning)
+            await super().handle_tool_call_results(ctx, [result], memory)
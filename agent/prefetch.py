@@ -0,0 +1,68 @@
+import asyncio
+import time
+from typing import cast
+
+from llama_index.core.agent.workflow import ReActAgent
+from llama_index.core.tools import AsyncBaseTool
+from logging_config import get_logger
+from schemas import PrefetchConfig
+from tool_retrieval import tokenize
+
+logger = get_logger(__name__)
+
+# Keep references to running prefetches so they are not garbage collected
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+def should_prefetch(question: str, prefetch_config: PrefetchConfig) -> bool:
+    """Whether the question mentions one of the prefetch keywords."""
+    keywords = {term for keyword in prefetch_config.keywords for term in tokenize(keyword)}
+    return not keywords.isdisjoint(tokenize(question))
+
+
+def find_tool(agent: ReActAgent, tool_name: str) -> AsyncBaseTool | None:
+    """Return the agent's tool named `tool_name`, looking through its retriever's tools too."""
+    tools = cast("list[object]", agent.tools or getattr(agent.tool_retriever, "tools", []))  # type: ignore[misc]
+    return next(
+        (
+            tool
+            for tool in tools
+            if isinstance(tool, AsyncBaseTool) and tool.metadata.get_name() == tool_name
+        ),
+        None,
+    )
+
+
+async def _prefetch(tool: AsyncBaseTool, prefetch_config: PrefetchConfig) -> None:
+    started = time.perf_counter()
+    try:
+        await tool.acall(**prefetch_config.arguments)
+    except Exception:  # noqa: BLE001
+        logger.warning("Prefetching %s failed", prefetch_config.tool, exc_info=True)
+        return
+    logger.info("Prefetched %s in %.2fs", prefetch_config.tool, time.perf_counter() - started)
+
+
+def start_prefetch(
+    agent: ReActAgent, question: str, prefetch_config: PrefetchConfig
+) -> asyncio.Task[None] | None:
+    """Start the prefetch tool call in the background if the question calls for it.
+
+    It runs alongside the first LLM call. The tool cache keeps the result, and coalesces the
+    model's identical call with the prefetch if it is still in flight, so that call does not
+    reach the MCP server again. Failures are logged and left for the model's own call to retry.
+
+    Returns:
+        asyncio.Task | None: The prefetch, None if none was started
+    """
+    if not prefetch_config.enabled or not should_prefetch(question, prefetch_config):
+        return None
+    tool = find_tool(agent, prefetch_config.tool)
+    if tool is None:
+        logger.debug("Not prefetching %s, the agent does not have it", prefetch_config.tool)
+        return None
+
+    task = asyncio.create_task(_prefetch(tool, prefetch_config))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -0,0 +1,148 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+
+import yaml
+from llama_index.core.agent.react.formatter import ReActChatFormatter, get_react_tool_descriptions
+from llama_index.core.agent.react.types import BaseReasoningStep, ObservationReasoningStep
+from llama_index.core.base.llms.types import ChatMessage, MessageRole
+from llama_index.core.tools import BaseTool
+from logging_config import get_logger
+from schemas import Prompts
+
+logger = get_logger(__name__)
+
+PROMPTS_PATH = Path(__file__).parent / "prompts.yaml"
+
+# Maximum number of rendered headers kept, one per distinct header template and tool set
+MAX_RENDERED_HEADERS = 32
+
+
+class PromptFileCache:
+    """Parsed prompts file, reloaded only when the file changes.
+
+    The file is re-read when its modification time or size changes, and re-parsed only when
+    the content hash differs from the cached one.
+    """
+
+    def __init__(self, path: Path = PROMPTS_PATH) -> None:
+        self.path = path
+        self._stat_key: tuple[int, int] | None = None
+        self._content_hash: str | None = None
+        self._prompts: Prompts | None = None
+
+    def get(self) -> Prompts:
+        """Return the prompts, reloading them if the file changed.
+
+        Returns:
+            Prompts: The header and system prompts
+        """
+        stat = self.path.stat()
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if self._prompts is not None and stat_key == self._stat_key:
+            return self._prompts
+
+        content = self.path.read_bytes()
+        content_hash = hashlib.sha256(content).hexdigest()
+        if self._prompts is None or content_hash != self._content_hash:
+            logger.info("Loading prompts from %s", self.path)
+            prompts = yaml.safe_load(content)
+            self._prompts = Prompts(
+                header_prompt=prompts["header_prompt"],
+                system_prompt=prompts["system_prompt"],
+                parallel_actions_prompt=prompts.get("parallel_actions_prompt", ""),
+                version=content_hash,
+            )
+            self._content_hash = content_hash
+        self._stat_key = stat_key
+        return self._prompts
+
+
+prompt_file_cache = PromptFileCache()
+
+_tool_fingerprints: weakref.WeakKeyDictionary[BaseTool, str] = weakref.WeakKeyDictionary()
+_rendered_headers: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+
+def _tool_fingerprint(tool: BaseTool) -> str:
+    fingerprint = _tool_fingerprints.get(tool)
+    if fingerprint is None:
+        description = "\n".join(get_react_tool_descriptions([tool]))
+        fingerprint = hashlib.sha256(description.encode()).hexdigest()
+        _tool_fingerprints[tool] = fingerprint
+    return fingerprint
+
+
+def tool_set_hash(tools: Sequence[BaseTool]) -> str:
+    """Hash the names, descriptions and argument schemas of `tools`, in order."""
+    digest = hashlib.sha256()
+    for tool in tools:
+        digest.update(_tool_fingerprint(tool).encode())
+    return digest.hexdigest()
+
+
+def render_react_header(system_header: str, context: str, tools: Sequence[BaseTool]) -> str:
+    """Render the ReAct header for `tools`, reusing earlier renders of the same inputs.
+
+    Args:
+        system_header: Header template with `{tool_desc}` and `{tool_names}` placeholders
+        context: Value for an optional `{context}` placeholder
+        tools: Tools described in the header
+
+    Returns:
+        str: The fully rendered header
+    """
+    template_hash = hashlib.sha256(f"{system_header}\0{context}".encode()).hexdigest()
+    key = (template_hash, tool_set_hash(tools))
+    rendered = _rendered_headers.get(key)
+    if rendered is not None:
+        _rendered_headers.move_to_end(key)
+        return rendered
+
+    format_args = {
+        "tool_desc": "\n".join(get_react_tool_descriptions(tools)),
+        "tool_names": ", ".join([tool.metadata.get_name() for tool in tools]),
+    }
+    if context:
+        format_args["context"] = context
+    rendered = system_header.format(**format_args)
+
+    _rendered_headers[key] = rendered
+    if len(_rendered_headers) > MAX_RENDERED_HEADERS:
+        _rendered_headers.popitem(last=False)
+    return rendered
+
+
+class CachedReActChatFormatter(ReActChatFormatter):
+    """ReAct chat formatter that renders the header once per template and tool set.
+
+    The stock formatter re-expands `{tool_desc}` from every tool's schema on each ReAct step;
+    this one reuses the cached rendering.
+    """
+
+    def format(
+        self,
+        tools: Sequence[BaseTool],
+        chat_history: list[ChatMessage],
+        current_reasoning: list[BaseReasoningStep] | None = None,
+    ) -> list[ChatMessage]:
+        """Format chat history into list of ChatMessage."""
+        fmt_sys_header = render_react_header(self.system_header, self.context, tools)
+
+        reasoning_history = [
+            ChatMessage(
+                role=self.observation_role
+                if isinstance(reasoning_step, ObservationReasoningStep)
+                else MessageRole.ASSISTANT,
+                content=reasoning_step.get_content(),
+            )
+            for reasoning_step in current_reasoning or []
+        ]
+
+        return [
+            ChatMessage(role=MessageRole.SYSTEM, content=fmt_sys_header),
+            *chat_history,
+            *reasoning_history,
+        ]
@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+from circuit_breaker import add_open_handler
+from config import config
+from initialize import discovery_report
+from llama_index.core.agent.workflow import ReActAgent
+from logging_config import get_logger
+from mcp import types
+from mcp_pool import add_message_handler
+from schemas import Config
+from tool_snapshot import add_change_handler
+
+from agent import create_agent  # type: ignore[attr-defined]
+
+logger = get_logger(__name__)
+
+# Minimum delay between background rebuild attempts after a failed refresh
+REFRESH_RETRY_SECONDS = 30.0
+
+
+class AgentRegistry:
+    """Process-wide holder of the ReAct agent and its tools.
+
+    The agent is built once and shared by every request. It is rebuilt when it is older than
+    `refresh_interval_seconds`, when it is invalidated (e.g. by an MCP `tools/list_changed`
+    notification) or when `refresh` is called explicitly. Stale agents keep being served while
+    a background rebuild runs, so only the very first request waits for agent creation.
+    """
+
+    def __init__(
+        self,
+        specific_config: Config | None = None,
+        refresh_interval_seconds: float | None = None,
+    ) -> None:
+        self._config = specific_config
+        if refresh_interval_seconds is None:
+            refresh_interval_seconds = (specific_config or config).agent.refresh_interval_seconds
+        self._refresh_interval_seconds = refresh_interval_seconds
+        self._agent: ReActAgent | None = None
+        self._built_at = 0.0
+        self._is_stale = False
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task[None] | None = None
+        self._next_attempt = 0.0
+
+    @property
+    def config(self) -> Config:
+        """Config the agent is built from."""
+        return self._config or config
+
+    @property
+    def built_at(self) -> float:
+        """Monotonic timestamp of the last successful build, 0.0 if never built."""
+        return self._built_at
+
+    def _is_expired(self) -> bool:
+        if self._is_stale:
+            return True
+        if self._refresh_interval_seconds is None:
+            return False
+        return time.monotonic() - self._built_at >= self._refresh_interval_seconds
+
+    async def get_agent(self) -> ReActAgent:
+        """Return the shared agent, building it on first use.
+
+        Returns:
+            The shared ReAct agent
+        """
+        agent = self._agent
+        if agent is None:
+            async with self._lock:
+                if self._agent is None:
+                    await self._build()
+            return self._current()
+
+        if self._is_expired():
+            self._schedule_refresh()
+        return agent
+
+    async def refresh(self) -> ReActAgent:
+        """Rebuild the agent and its tools now.
+
+        Returns:
+            The freshly built ReAct agent
+        """
+        async with self._lock:
+            await self._build()
+        return self._current()
+
+    def invalidate(self) -> None:
+        """Mark the agent as stale so the next request triggers a background rebuild."""
+        logger.info("Agent registry invalidated")
+        self._is_stale = True
+
+    async def handle_mcp_message(self, message: object) -> None:
+        """MCP `ClientSession` message handler invalidating the agent on tool list changes.
+
+        Args:
+            message: Incoming request responder, notification or exception from the session
+        """
+        notification = getattr(message, "root", message)
+        if isinstance(notification, types.ToolListChangedNotification):
+            logger.info("Received tools/list_changed notification")
+            self.invalidate()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        if time.monotonic() < self._next_attempt:
+            return
+        self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            async with self._lock:
+                if self._is_expired():
+                    await self._build()
+        except Exception:
+            self._next_attempt = time.monotonic() + REFRESH_RETRY_SECONDS
+            logger.exception("Background agent refresh failed, keeping the previous agent")
+
+    def _current(self) -> ReActAgent:
+        if self._agent is None:
+            msg = "Agent registry has no agent"
+            raise RuntimeError(msg)
+        return self._agent
+
+    async def _build(self) -> None:
+        started = time.monotonic()
+        self._agent = await create_agent(self._config)
+        self._built_at = time.monotonic()
+        self._is_stale = False
+        logger.info("Agent registry built agent in %.2fs", self._built_at - started)
+
+        failed_servers = [name for name, report in discovery_report.items() if report.error]
+        if failed_servers:
+            # Built with a degraded tool set: retry soon instead of waiting for the TTL
+            logger.warning("Agent built without tools from %s", ", ".join(failed_servers))
+            self._is_stale = True
+            self._next_attempt = self._built_at + REFRESH_RETRY_SECONDS
+
+
+agent_registry = AgentRegistry()
+add_message_handler(agent_registry.handle_mcp_message)
+add_change_handler(agent_registry.invalidate)
+add_open_handler(agent_registry.invalidate)
+
+
+async def get_agent() -> ReActAgent:
+    """Return the process-wide shared agent."""
+    return await agent_registry.get_agent()
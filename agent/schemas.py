@@ -1,6 +1,6 @@
 from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class Message(BaseModel):
@@ -42,6 +42,9 @@ class ToolOutput(BaseModel):
 class Prompts(BaseModel):
     header_prompt: str
     system_prompt: str
+    # Added to the header prompt when the agent runs several actions per step
+    parallel_actions_prompt: str = ""
+    version: str | None = None  # Content hash of the prompts file
 
 
 class ServerConfig(BaseModel):
@@ -54,6 +57,20 @@ class ServerConfig(BaseModel):
 PROVIDERS = Literal["bedrock", "openai", "vertexai"]
 
 
+class LLMHTTPConfig(BaseModel):
+    """Connection pool settings for LLM provider requests."""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    # Idle connections are kept open this long before being closed
+    keepalive_expiry_seconds: float = 120.0
+    # Negotiated per host, falls back to HTTP/1.1 if the provider lacks it. Needs the optional
+    # `h2` package, which is not a dependency.
+    http2: bool = False
+    connect_timeout_seconds: float = 5.0
+    timeout_seconds: float = 600.0
+
+
 class LLMConfig(BaseModel):
     """LLM configuration settings."""
 
@@ -61,6 +78,74 @@ class LLMConfig(BaseModel):
     temperature: float
     provider: PROVIDERS
     region_name: str | None = None
+    http: LLMHTTPConfig = Field(default_factory=LLMHTTPConfig)
+
+
+MCP_TRANSPORTS = Literal["sse", "streamable_http", "stdio"]
+
+
+class MCPTransportConfig(BaseModel):
+    """How to reach a single MCP server."""
+
+    type: MCP_TRANSPORTS = "sse"
+    # stdio only: command launching the server as a subprocess, with its arguments
+    command: str | None = None
+    args: list[str] = Field(default_factory=list)
+    env: dict[str, str] | None = None
+    cwd: str | None = None
+
+    @model_validator(mode="after")
+    def check_command(self) -> "MCPTransportConfig":
+        """Require a command for stdio transports."""
+        if self.type == "stdio" and not self.command:
+            msg = "stdio MCP transports require a command"
+            raise ValueError(msg)
+        return self
+
+
+class ToolCacheConfig(BaseModel):
+    """Cross-request cache and coalescing of MCP tool results."""
+
+    enabled: bool = True
+    # Identical concurrent calls share one in-flight request, except for uncacheable tools
+    coalesce: bool = True
+    # Upper bound on the serialized size of every cached result together
+    max_bytes: int = 64 * 1024 * 1024
+    # TTL for tools without their own entry in `ttl_seconds`. None or 0 disables caching them,
+    # so only tools known to be read-only are cached.
+    default_ttl_seconds: float | None = 0.0
+    ttl_seconds: dict[str, float] = Field(
+        default_factory=lambda: {
+            "get_ccri_metadata": 3600.0,
+            "get_available_dataflows": 3600.0,
+            "get_all_indicators_for_dataflow": 3600.0,
+            "get_data_for_dataflow": 300.0,
+            "get_ccri_relevant_information": 300.0,
+        },
+    )
+    # Tools with side effects, never cached whatever their TTL
+    uncacheable_tools: list[str] = Field(
+        default_factory=lambda: ["create_temp_dir", "delete_temp_dir", "build_map"],
+    )
+    # SQLite file shared by every worker on the host, relative to the agent directory.
+    # None keeps results in memory only.
+    store_path: str | None = None
+    store_compression_level: int = Field(default=6, ge=0, le=9)
+    # Seconds a worker waits for another worker's write lock before giving up
+    store_busy_timeout_seconds: float = 5.0
+
+
+class WorkspaceConfig(BaseModel):
+    """Temp directory the server creates on an MCP server for each agent run."""
+
+    # Create and delete the directory outside the agent instead of letting the LLM call the tools
+    enabled: bool = True
+    server: str = "geospatial"
+    create_tool: str = "create_temp_dir"
+    delete_tool: str = "delete_temp_dir"
+    # Argument taking the directory in the server's tools and field holding it in the result
+    # of `create_tool`. It is hidden from the model and filled in on every call.
+    argument: str = "temp_dir"
 
 
 class MCPConfig(BaseModel):
@@ -69,6 +154,248 @@ class MCPConfig(BaseModel):
     datawarehouse_url: str
     rag_url: str
     geospatial_url: str
+    # Transport per server name, servers not listed use SSE on their `*_url`
+    transports: dict[str, MCPTransportConfig] = Field(default_factory=dict)
+    # Upper bound in seconds for listing the tools of a single MCP server
+    discovery_timeout_seconds: float = 10.0
+    # Timeout in seconds for a single request over an MCP session
+    read_timeout_seconds: float = 30.0
+    # Maximum number of persistent sessions per MCP server
+    pool_size: int = 4
+    # Idle sessions older than this are pinged before being reused
+    health_check_interval_seconds: float = 30.0
+    # Consecutive failed calls after which a server's circuit breaker opens
+    circuit_failure_threshold: int = 3
+    # Seconds an open circuit breaker waits before letting a probe call through
+    circuit_recovery_seconds: float = 30.0
+    # Retries of a failed call, with jittered exponential backoff between attempts
+    retries: int = 1
+    retry_base_delay_seconds: float = 0.2
+    # Maximum concurrent tool calls per server name, servers not listed are unlimited
+    max_concurrent_calls: dict[str, int] = Field(
+        default_factory=lambda: {"datawarehouse": 8, "rag": 8, "geospatial": 2}
+    )
+    # Tool calls waiting longer than this for a free slot fail instead of piling up
+    max_queue_seconds: float | None = 60.0
+    # Tool schema snapshot file, relative to the agent directory. None disables snapshots.
+    tool_snapshot_path: str | None = None
+    tool_cache: ToolCacheConfig = Field(default_factory=ToolCacheConfig)
+    workspace: WorkspaceConfig = Field(default_factory=WorkspaceConfig)
+
+
+class ServerDiscovery(BaseModel):
+    """Outcome of discovering the tools of a single MCP server."""
+
+    name: str
+    url: str
+    duration_seconds: float
+    tool_count: int = 0
+    tool_names: list[str] = Field(default_factory=list)
+    error: str | None = None
+    from_snapshot: bool = False
+
+
+class ToolSchema(BaseModel):
+    """Name, description and JSON input schema of an MCP tool."""
+
+    name: str
+    description: str | None = None
+    input_schema: dict[str, Any]
+
+
+class ServerToolSnapshot(BaseModel):
+    """Tool schemas discovered from a single MCP server."""
+
+    url: str
+    tools: list[ToolSchema]
+
+
+class ToolSnapshot(BaseModel):
+    """Versioned on-disk snapshot of the tool schemas of every MCP server."""
+
+    version: int
+    created_at: str
+    servers: dict[str, ServerToolSnapshot] = Field(default_factory=dict)
+
+
+OBSERVATION_ENCODINGS = Literal["raw", "json", "table"]
+
+
+class ObservationConfig(BaseModel):
+    """Encoding and size policy for tool observations sent to the LLM."""
+
+    # How JSON tool outputs are written into observations: "raw" as the tool returned them,
+    # "json" minified, "table" minified with lists of records written as columns and rows
+    encoding: OBSERVATION_ENCODINGS = "raw"
+    # Per-tool overrides of encoding
+    tool_encodings: dict[str, OBSERVATION_ENCODINGS] = Field(default_factory=dict)
+    # Top-level JSON fields replaced by a short placeholder in the observations of these tools,
+    # e.g. the map HTML that is streamed to the client but useless to the LLM
+    omitted_fields: dict[str, list[str]] = Field(
+        default_factory=lambda: {"build_map": ["html_content"]}
+    )
+    # Observations longer than this many characters are spilled to disk and replaced by their
+    # head, a summary and a handle. None keeps observations whole.
+    max_chars: int | None = None
+    # Per-tool overrides of max_chars
+    tool_max_chars: dict[str, int] = Field(default_factory=dict)
+    # Characters of a spilled observation kept in the LLM context
+    head_chars: int = 2000
+    # Characters returned per page when reading a spilled observation back
+    page_chars: int = Field(default=8000, gt=0)
+    # Directory for spilled observations, a private temporary directory if None
+    spill_dir: str | None = None
+    spill_ttl_seconds: float = 3600.0
+    # Files older than spill_ttl_seconds are deleted on the first spill and then once every this
+    # many spills, instead of scanning the directory on each
+    spill_purge_every: int = Field(default=100, ge=1)
+
+
+class ObservationStoreConfig(BaseModel):
+    """Per-run store of the numeric tables found in tool observations."""
+
+    # Store numeric lists of records under handles calculator tools take as "t1.<column>"
+    enabled: bool = False
+    # Lists of records shorter than this are left out of the store
+    min_rows: int = Field(default=2, ge=2)
+    # Tables kept per run, the oldest are dropped beyond it
+    max_tables: int = Field(default=50, ge=1)
+
+
+class ToolRetrievalConfig(BaseModel):
+    """Per-question selection of the tools described to the LLM."""
+
+    # Offer only the tools matching the question instead of every tool on each ReAct step
+    enabled: bool = False
+    # Best matching tools offered, on top of always_include
+    top_k: int = Field(default=8, ge=1)
+    # Tools offered for every question
+    always_include: list[str] = Field(default_factory=lambda: ["get_ccri_metadata"])
+    # Servers whose tools are all offered once one of them is selected, since their analyses
+    # chain more tools than top_k leaves room for
+    chained_servers: list[str] = Field(default_factory=lambda: ["geospatial"])
+
+
+class PrefetchConfig(BaseModel):
+    """Tool call started speculatively alongside the first LLM call of a run."""
+
+    enabled: bool = True
+    # Called with `arguments` when the question mentions one of `keywords`. The result lands in
+    # the tool cache, where the model's own identical call finds it.
+    tool: str = "get_ccri_metadata"
+    arguments: dict[str, Any] = Field(default_factory=dict)
+    keywords: list[str] = Field(
+        default_factory=lambda: [
+            "ccri",
+            "hazard",
+            "flood",
+            "drought",
+            "fire",
+            "wildfire",
+            "storm",
+            "cyclone",
+            "heatwave",
+            "exposure",
+            "exposed",
+        ]
+    )
+
+
+class CatalogSourceConfig(BaseModel):
+    """MCP tool listing the datasets of one source."""
+
+    # Label shown in search results, e.g. "datawarehouse" or "gee"
+    name: str
+    server: str
+    tool: str
+    arguments: dict[str, Any] = Field(default_factory=dict)
+
+
+class CatalogConfig(BaseModel):
+    """Local index of the available datasets, searched by the `search_catalog` tool."""
+
+    enabled: bool = False
+    sources: list[CatalogSourceConfig] = Field(default_factory=list)
+    # The catalog is re-read from the sources in the background once it is older than this
+    refresh_interval_seconds: float = 6 * 3600.0
+    # Record fields tried in order for a dataset's identifier and for its name
+    id_fields: list[str] = Field(default_factory=lambda: ["id", "code", "indicator", "dataset"])
+    name_fields: list[str] = Field(default_factory=lambda: ["name", "title", "label"])
+    max_results: int = Field(default=10, ge=1)
+
+
+class CatalogEntry(BaseModel):
+    """Dataset listed by a catalog source."""
+
+    source: str
+    id: str
+    name: str = ""
+    description: str = ""
+
+
+class GazetteerConfig(BaseModel):
+    """Offline country name lookup, used by the `resolve_country` tool."""
+
+    enabled: bool = False
+    # CSV with iso3, iso2, name and `|` separated aliases columns, relative to the agent directory
+    path: str = "countries.csv"
+    # Lowest similarity, between 0 and 1, for a misspelled name to resolve to a country
+    min_score: float = Field(default=0.8, ge=0.0, le=1.0)
+    # Other close countries listed with an inexact match
+    max_alternatives: int = Field(default=3, ge=0)
+
+
+class Country(BaseModel):
+    """Country of the gazetteer."""
+
+    iso3: str
+    iso2: str
+    name: str
+    aliases: list[str] = Field(default_factory=list)
+
+
+class AgentConfig(BaseModel):
+    """Agent registry configuration settings."""
+
+    # Seconds after which the shared agent and its tools are rebuilt. None disables TTL refresh.
+    refresh_interval_seconds: float | None = 3600.0
+    # Connect to MCP servers, build the agent and prime the LLM pool when the server starts
+    warmup_on_startup: bool = True
+    # Upper bound in seconds for each warm-up step
+    warmup_timeout_seconds: float = 60.0
+    # Identical tool calls after this many repeats within one run stop it as a loop.
+    # None only replays repeated calls from the run's journal.
+    max_repeated_tool_calls: int | None = Field(default=2, ge=0)
+    observations: ObservationConfig = Field(default_factory=ObservationConfig)
+    observation_store: ObservationStoreConfig = Field(default_factory=ObservationStoreConfig)
+    tool_retrieval: ToolRetrievalConfig = Field(default_factory=ToolRetrievalConfig)
+    prefetch: PrefetchConfig = Field(default_factory=PrefetchConfig)
+    catalog: CatalogConfig = Field(default_factory=CatalogConfig)
+    gazetteer: GazetteerConfig = Field(default_factory=GazetteerConfig)
+    # Run every Action of a ReAct step concurrently instead of only the first one
+    parallel_tool_calls: bool = False
+    # Tool calls running at the same time within one agent run when parallel_tool_calls is on
+    max_parallel_tool_calls: int = Field(default=4, ge=1, le=16)
+
+
+class DependencyStatus(BaseModel):
+    """Warm-up outcome of a single dependency of the agent."""
+
+    ready: bool = False
+    # Whether the server can answer questions without this dependency
+    required: bool = True
+    duration_seconds: float | None = None
+    error: str | None = None
+    detail: dict[str, Any] = Field(default_factory=dict)
+
+
+class Readiness(BaseModel):
+    """Cached readiness of the server, filled in by the startup warm-up."""
+
+    ready: bool = False
+    warmup_finished: bool = False
+    warmup_duration_seconds: float | None = None
+    dependencies: dict[str, DependencyStatus] = Field(default_factory=dict)
 
 
 class Config(BaseModel):
@@ -77,3 +404,4 @@ class Config(BaseModel):
     server: ServerConfig
     mcp: MCPConfig
     llm: LLMConfig
+    agent: AgentConfig = Field(default_factory=AgentConfig)
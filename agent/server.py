@@ -1,12 +1,14 @@
 import logging
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 import uvicorn
 from auth import authenticate_user, create_access_token, get_current_user
 from config import config
 from fastapi import Depends, FastAPI, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from logging_config import get_logger
 from pydantic import BaseModel
@@ -17,7 +19,19 @@ logging.getLogger("litellm").setLevel(logging.WARNING)
 
 logger = get_logger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Warm up the agent's dependencies on startup and release them on shutdown."""
+    # Imported lazily, like the handlers, so secrets are loaded before the agent modules
+    from warmup import shutdown, start_warm_up  # noqa: PLC0415
+
+    start_warm_up()
+    yield
+    await shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -26,6 +40,36 @@ async def root() -> dict[str, str]:
     return {"message": "Hello World"}
 
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Report whether the startup warm-up finished and the agent can answer questions.
+
+    Returns:
+        JSONResponse: Cached per-dependency status and warm-up timings, plus live pool, circuit
+        breaker and queue-time statistics per MCP backend, tool result cache and store counters
+        and dataset catalog sizes.
+        Status 503 until the shared agent is built, retrying a failed warm-up meanwhile.
+    """
+    from catalog import get_catalog_stats  # noqa: PLC0415
+    from mcp_pool import get_backend_stats  # noqa: PLC0415
+    from tool_cache import get_tool_cache_stats  # noqa: PLC0415
+    from tool_store import get_tool_store_stats  # noqa: PLC0415
+    from warmup import check_readiness  # noqa: PLC0415
+
+    readiness = check_readiness()
+
+    return JSONResponse(
+        {
+            **readiness.model_dump(),
+            "backends": get_backend_stats(),
+            "tool_cache": get_tool_cache_stats(),
+            "tool_store": get_tool_store_stats(),
+            "catalog": get_catalog_stats(),
+        },
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
 class Token(BaseModel):
     access_token: str
     username: str
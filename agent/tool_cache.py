@@ -0,0 +1,237 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
+from logging_config import get_logger
+from mcp import types
+from schemas import ToolCacheConfig
+
+logger = get_logger(__name__)
+
+
+def normalize_arguments(arguments: dict[str, Any] | None) -> str:
+    """Serialize tool arguments so that equivalent calls produce the same string.
+
+    Keys are sorted, arguments set to None are dropped and surrounding whitespace is stripped
+    from string values.
+    """
+
+    def normalize(value: object) -> object:
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, dict):
+            items = cast("dict[str, object]", value).items()
+            return {key: normalize(item) for key, item in items if item is not None}
+        if isinstance(value, list | tuple):
+            return [normalize(item) for item in cast("list[object] | tuple[object, ...]", value)]
+        return value
+
+    return json.dumps(normalize(arguments or {}), sort_keys=True, separators=(",", ":"))
+
+
+def tool_call_key(
+    server: str,
+    tool_name: str,
+    arguments: dict[str, Any] | None,
+    schema_hash: str | None = None,
+) -> str:
+    """Cache key of a tool call: server, tool name, schema hash if known and normalized arguments.
+
+    The schema hash keeps results of a tool from being served after its schema changed.
+    """
+    tool = f"{tool_name}@{schema_hash}" if schema_hash else tool_name
+    return f"{server}:{tool}:{normalize_arguments(arguments)}"
+
+
+def tool_ttl(cache_config: ToolCacheConfig, tool_name: str) -> float | None:
+    """TTL in seconds for results of `tool_name`, None if they must not be cached."""
+    if tool_name in cache_config.uncacheable_tools:
+        return None
+    return cache_config.ttl_seconds.get(tool_name, cache_config.default_ttl_seconds)
+
+
+class ToolResultCache:
+    """In-memory LRU cache of MCP tool results with a TTL per tool and a memory cap.
+
+    Only tools with a TTL are cached, and tools listed as uncacheable never are, since they
+    have side effects such as creating directories or rendering maps. Entry sizes are measured
+    on the serialized result, and the least recently used entries are evicted once the total
+    exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_config: ToolCacheConfig) -> None:
+        self.cache_config = cache_config
+        self._entries: OrderedDict[str, tuple[float, int, types.CallToolResult]] = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def ttl_for(self, tool_name: str) -> float | None:
+        """TTL in seconds for results of `tool_name`, None if they must not be cached."""
+        return tool_ttl(self.cache_config, tool_name)
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """Whether results of `tool_name` are cached."""
+        ttl = self.ttl_for(tool_name)
+        return ttl is not None and ttl > 0
+
+    def get(self, key: str) -> types.CallToolResult | None:
+        """Return the cached result for `key`, None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, size, result = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key, size)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return result
+
+    def set(
+        self,
+        key: str,
+        tool_name: str,
+        result: types.CallToolResult,
+        ttl: float | None = None,
+    ) -> None:
+        """Cache a successful result of `tool_name`, evicting old entries to stay in budget.
+
+        `ttl` overrides the tool's TTL, e.g. with the remaining TTL of a result read from disk.
+        """
+        if not self.is_cacheable(tool_name):
+            return
+        ttl = ttl if ttl is not None else self.ttl_for(tool_name)
+        if ttl is None or ttl <= 0 or result.isError:
+            return
+        size = len(result.model_dump_json())
+        if size > self.cache_config.max_bytes:
+            logger.info("Not caching %s result of %d bytes", tool_name, size)
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size_bytes -= previous[1]
+        self._entries[key] = (time.monotonic() + ttl, size, result)
+        self._size_bytes += size
+        while self._size_bytes > self.cache_config.max_bytes:
+            evicted_key, (_, evicted_size, _) = next(iter(self._entries.items()))
+            self._remove(evicted_key, evicted_size)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+        self._size_bytes = 0
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._size_bytes -= size
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit, miss and eviction counters and the current size."""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size_bytes,
+            "max_bytes": self.cache_config.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+
+
+class ToolCallCoalescer:
+    """Shares one in-flight MCP request between identical concurrent tool calls.
+
+    The first caller for a key starts the request as a task; callers arriving with the same key
+    while it runs await that task instead of sending a duplicate request. The task is shielded,
+    so a cancelled caller does not cancel the request for the others. Like caching, coalescing
+    is opt-in: only tools cached with a TTL are coalesced, so a tool with side effects that is
+    not listed anywhere is never shared between callers.
+    """
+
+    def __init__(self, cache_config: ToolCacheConfig) -> None:
+        self.cache_config = cache_config
+        self._in_flight: dict[str, asyncio.Task[types.CallToolResult]] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    def is_coalescable(self, tool_name: str) -> bool:
+        """Whether identical concurrent calls of `tool_name` may share one request."""
+        ttl = tool_ttl(self.cache_config, tool_name)
+        return ttl is not None and ttl > 0
+
+    async def run(
+        self, key: str, call: Callable[[], Awaitable[types.CallToolResult]]
+    ) -> types.CallToolResult:
+        """Return the result of the in-flight call for `key`, starting `call` if there is none."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self._started += 1
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task[types.CallToolResult]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Started and coalesced call counters and the calls currently in flight."""
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self._started,
+            "coalesced": self._coalesced,
+        }
+
+
+# Process-wide caches and coalescers keyed by their configuration, shared by every MCP client
+_tool_caches: dict[str, ToolResultCache] = {}
+_tool_coalescers: dict[str, ToolCallCoalescer] = {}
+
+
+def get_tool_cache(cache_config: ToolCacheConfig) -> ToolResultCache | None:
+    """Return the shared tool result cache for `cache_config`, None if caching is disabled."""
+    if not cache_config.enabled:
+        return None
+    key = cache_config.model_dump_json()
+    cache = _tool_caches.get(key)
+    if cache is None:
+        cache = _tool_caches[key] = ToolResultCache(cache_config)
+    return cache
+
+
+def get_tool_coalescer(cache_config: ToolCacheConfig) -> ToolCallCoalescer | None:
+    """Return the shared coalescer for `cache_config`, None if coalescing is disabled."""
+    if not cache_config.coalesce:
+        return None
+    key = cache_config.model_dump_json()
+    coalescer = _tool_coalescers.get(key)
+    if coalescer is None:
+        coalescer = _tool_coalescers[key] = ToolCallCoalescer(cache_config)
+    return coalescer
+
+
+def get_tool_cache_stats() -> dict[str, dict[str, dict[str, int]]]:
+    """Stats of every shared tool result cache and coalescer, keyed by configuration."""
+    return {
+        key: {
+            "cache": _tool_caches[key].stats if key in _tool_caches else {},
+            "coalescing": _tool_coalescers[key].stats if key in _tool_coalescers else {},
+        }
+        for key in {**_tool_caches, **_tool_coalescers}
+    }
@@ -0,0 +1,181 @@
+import time
+import weakref
+from collections import Counter
+from collections.abc import Collection, Sequence
+from typing import Any
+
+from llama_index.core.agent.workflow import AgentOutput
+from llama_index.core.llms import ChatMessage
+from llama_index.core.memory import BaseMemory
+from llama_index.core.tools import AsyncBaseTool, ToolOutput
+from llama_index.core.workflow import Context
+from logging_config import get_logger
+from observation_store import ObservationStoreReActAgent
+from pydantic import Field, PrivateAttr
+from tool_cache import normalize_arguments
+from workflows.context.state_store import DictState
+
+logger = get_logger(__name__)
+
+REPLAY_NOTE = "Repeated call with identical arguments, returning the earlier result:\n"
+
+LOOP_OBSERVATION = (
+    "Loop detected: {tool_name} was already called {repeats} times with these exact arguments. "
+    "Do not call any more tools. Write the final Answer now with the information gathered so far."
+)
+
+LOOP_ANSWER = (
+    "I stopped because I kept repeating the same {tool_name} call without making progress. "
+    "Please try rephrasing or narrowing down the question."
+)
+
+
+def _journal_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    return f"{tool_name}:{normalize_arguments(arguments)}"
+
+
+class ToolCallJournal:
+    """Every tool call made during one agent run, keyed by tool name and normalized arguments.
+
+    Repeated calls are answered with the recorded observation instead of calling the tool
+    again, except for side-effecting tools and failed calls. Once a call is repeated more than
+    `max_repeats` times, the run is flagged as looping.
+    """
+
+    def __init__(
+        self, max_repeats: int | None = None, unreplayable_tools: Collection[str] = ()
+    ) -> None:
+        self.max_repeats = max_repeats
+        self.unreplayable_tools = set(unreplayable_tools)
+        self.loop_tool: str | None = None
+        self._loop_repeats = 0
+        self._outputs: dict[str, ToolOutput] = {}
+        self._counts: Counter[str] = Counter()
+        self._tool_counts: Counter[str] = Counter()
+        self._replayed = 0
+        self._tool_seconds = 0.0
+
+    @property
+    def loop_detected(self) -> bool:
+        return self.loop_tool is not None
+
+    def register(self, tool_name: str, arguments: dict[str, Any]) -> int:
+        """Count a call of `tool_name`, returning how many identical calls came before it."""
+        key = _journal_key(tool_name, arguments)
+        repeats = self._counts[key]
+        self._counts[key] += 1
+        self._tool_counts[tool_name] += 1
+        if self.max_repeats is not None and repeats > self.max_repeats and not self.loop_detected:
+            self.loop_tool = tool_name
+            self._loop_repeats = repeats
+            logger.warning("Loop detected: %s repeated %d times", tool_name, repeats)
+        return repeats
+
+    def replay(self, tool_name: str, arguments: dict[str, Any]) -> ToolOutput | None:
+        """Return the recorded observation of an identical earlier call, None if there is none."""
+        if tool_name in self.unreplayable_tools:
+            return None
+        output = self._outputs.get(_journal_key(tool_name, arguments))
+        if output is None:
+            return None
+        self._replayed += 1
+        return output.model_copy(update={"content": REPLAY_NOTE + output.content})
+
+    def record(
+        self, tool_name: str, arguments: dict[str, Any], output: ToolOutput, duration: float
+    ) -> None:
+        """Record the observation of a call that reached the tool."""
+        self._tool_seconds += duration
+        if not output.is_error:
+            self._outputs[_journal_key(tool_name, arguments)] = output
+
+    def loop_output(self, tool_name: str, arguments: dict[str, Any]) -> ToolOutput:
+        """Observation telling the model to stop calling tools once a loop was detected."""
+        return ToolOutput(
+            content=LOOP_OBSERVATION.format(
+                tool_name=self.loop_tool or tool_name, repeats=self._loop_repeats
+            ),
+            tool_name=tool_name,
+            raw_input=arguments,
+            raw_output=None,
+            is_error=True,
+        )
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Call, repeat and replay counters of the run and the tool that looped, if any."""
+        return {
+            "calls": sum(self._counts.values()),
+            "unique_calls": len(self._counts),
+            "repeated_calls": sum(count - 1 for count in self._counts.values()),
+            "replayed_calls": self._replayed,
+            "tool_seconds": round(self._tool_seconds, 3),
+            "calls_per_tool": dict(self._tool_counts),
+            "loop_detected": self.loop_detected,
+            "loop_tool": self.loop_tool,
+        }
+
+
+class JournaledReActAgent(ObservationStoreReActAgent):
+    """ReAct agent keeping a `ToolCallJournal` per run.
+
+    Repeated tool calls are answered from the journal, and once a loop is detected further tool
+    calls are refused and the run ends with an answer explaining why it stopped.
+    """
+
+    max_repeated_tool_calls: int | None = 2
+    unreplayable_tools: list[str] = Field(default_factory=list)
+    _journals: weakref.WeakKeyDictionary[Context[DictState], ToolCallJournal] = PrivateAttr(  # type: ignore[misc]
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    def get_journal(self, ctx: Context[DictState]) -> ToolCallJournal:
+        """Return the journal of the run owning `ctx`, creating it on first use."""
+        journal = self._journals.get(ctx)
+        if journal is None:
+            journal = self._journals[ctx] = ToolCallJournal(
+                self.max_repeated_tool_calls, self.unreplayable_tools
+            )
+        return journal
+
+    async def take_step(
+        self,
+        ctx: Context[DictState],
+        llm_input: list[ChatMessage],
+        tools: Sequence[AsyncBaseTool],
+        memory: BaseMemory,
+    ) -> AgentOutput:
+        """Take a ReAct step, ending the run instead if it keeps calling tools after a loop."""
+        output = await super().take_step(ctx, llm_input, tools, memory)  # type: ignore[misc]
+        journal = self.get_journal(ctx)
+        if not journal.loop_detected or not output.tool_calls:
+            return output
+
+        logger.warning("Stopping run after a %s loop", journal.loop_tool)
+        return AgentOutput(
+            response=ChatMessage(
+                role="assistant", content=LOOP_ANSWER.format(tool_name=journal.loop_tool)
+            ),
+            tool_calls=[],
+            raw=output.raw,
+            current_agent_name=self.name,
+        )
+
+    async def _call_tool(
+        self, ctx: Context[DictState], tool: AsyncBaseTool, tool_input: dict[str, Any]
+    ) -> ToolOutput:
+        journal = self.get_journal(ctx)
+        tool_name = tool.metadata.get_name()
+        journal.register(tool_name, tool_input)
+        if journal.loop_detected:
+            return journal.loop_output(tool_name, tool_input)
+
+        replayed = journal.replay(tool_name, tool_input)
+        if replayed is not None:
+            logger.info("Replaying %s result from the run journal", tool_name)
+            return replayed
+
+        started = time.perf_counter()
+        output = await super()._call_tool(ctx, tool, tool_input)
+        journal.record(tool_name, tool_input, output, time.perf_counter() - started)
+        return output
@@ -0,0 +1,149 @@
+import math
+import re
+from collections import Counter
+from collections.abc import Collection, Sequence
+from typing import Any, cast
+
+from llama_index.core.objects.base import ObjectRetriever
+from llama_index.core.schema import QueryBundle
+from llama_index.core.tools import BaseTool
+from logging_config import get_logger
+from schemas import ToolRetrievalConfig
+
+logger = get_logger(__name__)
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Times a tool's name is repeated in its document, so name matches outweigh description matches
+NAME_WEIGHT = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CAMEL_CASE = re.compile(r"([a-z0-9])([A-Z])")
+
+_STOPWORDS = (
+    "a an and are as at be by can do does for from has have how i in is it its me my of on or "
+    "that the their them there these this to was what when where which who will with you your"
+)
+STOPWORDS = frozenset(_STOPWORDS.split())
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):  # noqa: PLR2004
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):  # noqa: PLR2004
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase, singular terms, breaking up snake_case and camelCase."""
+    words = _WORD.findall(_CAMEL_CASE.sub(r"\1 \2", text).lower())
+    return [_stem(word) for word in words if word not in STOPWORDS]
+
+
+def tool_document(tool: BaseTool) -> list[str]:
+    """Terms of a tool's name, description and parameters."""
+    metadata = tool.metadata
+    schema_dict = cast("dict[str, Any]", metadata.get_parameters_dict())  # type: ignore[misc]
+    parameters = cast("dict[str, dict[str, Any]]", schema_dict.get("properties", {}))
+    parts = [metadata.get_name()] * NAME_WEIGHT + [metadata.description]
+    for name, schema in parameters.items():
+        parts.extend([name, str(schema.get("description", ""))])
+    return tokenize(" ".join(parts))
+
+
+class BM25Index:
+    """Okapi BM25 over a small, fixed set of tokenized documents."""
+
+    def __init__(self, documents: Sequence[Sequence[str]]) -> None:
+        self._term_counts = [Counter(document) for document in documents]
+        self._lengths = [len(document) for document in documents]
+        self._average_length = sum(self._lengths) / len(documents) if documents else 0.0
+        document_frequency = Counter(term for document in documents for term in set(document))
+        self._idf = {
+            term: math.log(1 + (len(documents) - count + 0.5) / (count + 0.5))
+            for term, count in document_frequency.items()
+        }
+
+    def scores(self, query: Collection[str]) -> list[float]:
+        """Score every document against the distinct terms of `query`."""
+        terms = [term for term in set(query) if term in self._idf]
+        scores: list[float] = []
+        for term_counts, length in zip(self._term_counts, self._lengths, strict=True):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self._average_length or 1))
+            scores.append(
+                sum(
+                    self._idf[term] * term_counts[term] * (BM25_K1 + 1) / (term_counts[term] + norm)
+                    for term in terms
+                    if term_counts[term]
+                )
+            )
+        return scores
+
+
+class ToolRetriever(ObjectRetriever[BaseTool]):
+    """Lexical tool retriever picking the tools relevant to a question.
+
+    Tools are ranked with BM25 over their names, descriptions and parameters, entirely in
+    process. The `top_k` best matches are offered together with the `always_include` tools, in
+    their original order so the rendered header prompt stays cacheable. A selected tool brings
+    the rest of its `chains`, the tools a multi-step analysis uses together. If no tool matches
+    the question at all, every tool is offered.
+
+    The agent workflow also looks tools up by name when calling them, so a query that is
+    exactly a tool name returns that tool.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        retrieval_config: ToolRetrievalConfig,
+        always_include: Collection[str] = (),
+        chains: Collection[Collection[str]] = (),
+    ) -> None:
+        self.tools = list(tools)
+        self.retrieval_config = retrieval_config
+        self.always_include = {*retrieval_config.always_include, *always_include}
+        self.chains = [frozenset(chain) for chain in chains]
+        self._by_name = {tool.metadata.get_name(): tool for tool in self.tools}
+        self._index = BM25Index([tool_document(tool) for tool in self.tools])
+
+    def select(self, query: str) -> list[BaseTool]:
+        """Return the tools to offer for `query`."""
+        scores = self._index.scores(tokenize(query))
+        ranked = sorted(
+            (index for index, score in enumerate(scores) if score > 0),
+            key=lambda index: scores[index],
+            reverse=True,
+        )
+        if not ranked:
+            logger.info("No tool matches the question, offering all %d tools", len(self.tools))
+            return self.tools
+        matched = {
+            self.tools[index].metadata.get_name() for index in ranked[: self.retrieval_config.top_k]
+        }
+        selected = set(self.always_include).union(
+            matched, *(chain for chain in self.chains if not chain.isdisjoint(matched))
+        )
+        tools = [tool for tool in self.tools if tool.metadata.get_name() in selected]
+        logger.info(
+            "Offering %d of %d tools: %s",
+            len(tools),
+            len(self.tools),
+            ", ".join(tool.metadata.get_name() for tool in tools),
+        )
+        return tools
+
+    def retrieve(self, str_or_query_bundle: str | QueryBundle) -> list[BaseTool]:
+        query = (
+            str_or_query_bundle
+            if isinstance(str_or_query_bundle, str)
+            else str_or_query_bundle.query_str
+        )
+        tool = self._by_name.get(query)
+        return [tool] if tool is not None else self.select(query)
+
+    async def aretrieve(self, str_or_query_bundle: str | QueryBundle) -> list[BaseTool]:
+        return self.retrieve(str_or_query_bundle)
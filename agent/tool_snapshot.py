@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from llama_index.core.tools.function_tool import FunctionTool
+from llama_index.tools.mcp import McpToolSpec
+from logging_config import get_logger
+from mcp import types
+from mcp_pool import PooledMCPClient, close_session_pools, get_mcp_client, get_mcp_server_urls
+from pydantic import ValidationError
+from schemas import MCPConfig, ServerToolSnapshot, ToolSchema, ToolSnapshot, WorkspaceConfig
+from workspace import add_workspace_argument, hide_workspace_tools
+
+logger = get_logger(__name__)
+
+# Bump whenever the snapshot layout changes so older files are ignored instead of misread
+SNAPSHOT_VERSION = 1
+
+# Callbacks run when background revalidation finds that a server's tools changed
+change_handlers: list[Callable[[], None]] = []
+
+# Keep references to running revalidation tasks so they are not garbage collected
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+def add_change_handler(handler: Callable[[], None]) -> None:
+    """Register a callback for tool changes detected while revalidating the snapshot."""
+    change_handlers.append(handler)
+
+
+def resolve_snapshot_path(mcp_config: MCPConfig) -> Path | None:
+    """Return the absolute snapshot path, or None if snapshots are disabled.
+
+    Relative paths are resolved against the agent directory.
+    """
+    if mcp_config.tool_snapshot_path is None:
+        return None
+    return Path(__file__).parent / mcp_config.tool_snapshot_path
+
+
+def tool_schema_hash(tool_schema: ToolSchema) -> str:
+    """Short hash of a tool's name, description and input schema."""
+    return hashlib.sha256(tool_schema.model_dump_json().encode()).hexdigest()[:16]
+
+
+class SnapshotToolSpec(McpToolSpec):
+    """`McpToolSpec` whose tool list comes from known schemas instead of `tools/list`.
+
+    Tool calls still go through `client`, so sessions are only opened on the first call, and
+    their results are cached under the hash of the tool's schema. With a `workspace_config`, the
+    workspace tools and argument are hidden from the model and the current run's workspace is
+    passed to every tool taking it.
+    """
+
+    def __init__(
+        self,
+        client: PooledMCPClient,
+        tool_schemas: list[ToolSchema],
+        workspace_config: WorkspaceConfig | None = None,
+    ) -> None:
+        super().__init__(client=client)  # type: ignore[arg-type]
+        self.workspace_config = workspace_config
+        client.tool_schema_hashes = {tool.name: tool_schema_hash(tool) for tool in tool_schemas}
+        self.workspace_tools: set[str] = set()
+        if workspace_config is not None:
+            tool_schemas, self.workspace_tools = hide_workspace_tools(
+                tool_schemas, workspace_config
+            )
+        self.tool_schemas = tool_schemas
+
+    async def fetch_tools(self) -> list[types.Tool]:
+        """Return the known tool schemas as MCP tools."""
+        return [
+            types.Tool(
+                name=tool.name,
+                description=tool.description,
+                inputSchema=tool.input_schema,
+            )
+            for tool in self.tool_schemas
+        ]
+
+    def _create_tool_fn(self, tool_name: str) -> Callable[..., Any]:
+        if self.workspace_config is None or tool_name not in self.workspace_tools:
+            return super()._create_tool_fn(tool_name)  # type: ignore[misc]
+        argument = self.workspace_config.argument
+
+        async def async_tool_fn(**kwargs: Any) -> Any:  # noqa: ANN401
+            return await self.client.call_tool(
+                tool_name, await add_workspace_argument(kwargs, argument)
+            )
+
+        return async_tool_fn
+
+
+async def fetch_tool_schemas(client: PooledMCPClient) -> list[ToolSchema]:
+    """List the tools of an MCP server.
+
+    Args:
+        client: Client connected to the server
+
+    Returns:
+        list[ToolSchema]: The server's tool schemas
+    """
+    response = await client.list_tools()
+    return [
+        ToolSchema(name=tool.name, description=tool.description, input_schema=tool.inputSchema)
+        for tool in response.tools
+    ]
+
+
+async def build_function_tools(
+    client: PooledMCPClient,
+    tool_schemas: list[ToolSchema],
+    workspace_config: WorkspaceConfig | None = None,
+) -> list[FunctionTool]:
+    """Build agent tools bound to `client` from known tool schemas."""
+    return await SnapshotToolSpec(client, tool_schemas, workspace_config).to_tool_list_async()
+
+
+def load_tool_snapshot(path: Path) -> ToolSnapshot | None:
+    """Load a tool snapshot, ignoring missing, unreadable or outdated files.
+
+    Args:
+        path: Snapshot file path
+
+    Returns:
+        ToolSnapshot | None: The snapshot, or None if it cannot be used
+    """
+    if not path.exists():
+        return None
+    try:
+        snapshot = ToolSnapshot.model_validate_json(path.read_text())
+    except (OSError, ValidationError):
+        logger.warning("Ignoring unreadable tool snapshot %s", path, exc_info=True)
+        return None
+    if snapshot.version != SNAPSHOT_VERSION:
+        logger.info("Ignoring tool snapshot %s with version %s", path, snapshot.version)
+        return None
+    return snapshot
+
+
+def save_tool_snapshot(path: Path, servers: dict[str, ServerToolSnapshot]) -> None:
+    """Merge `servers` into the snapshot at `path`, writing it atomically.
+
+    Args:
+        path: Snapshot file path
+        servers: Server snapshots to add or replace
+    """
+    existing = load_tool_snapshot(path)
+    merged = {**(existing.servers if existing else {}), **servers}
+    snapshot = ToolSnapshot(
+        version=SNAPSHOT_VERSION,
+        created_at=datetime.now(UTC).isoformat(),
+        servers=merged,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(snapshot.model_dump_json(indent=2))
+    tmp_path.replace(path)
+    logger.info("Wrote tool snapshot for %s to %s", ", ".join(servers), path)
+
+
+async def _revalidate(
+    path: Path, servers: dict[str, ServerToolSnapshot], mcp_config: MCPConfig
+) -> None:
+    changed: dict[str, ServerToolSnapshot] = {}
+    for name, cached in servers.items():
+        client = get_mcp_client(name, cached.url, mcp_config)
+        try:
+            async with asyncio.timeout(mcp_config.discovery_timeout_seconds):
+                tool_schemas = await fetch_tool_schemas(client)
+        except Exception:  # noqa: BLE001
+            # Runs in the background, where any failure just keeps the cached tools
+            logger.warning("Could not revalidate %s tool snapshot", name, exc_info=True)
+            continue
+        if tool_schemas != cached.tools:
+            changed[name] = ServerToolSnapshot(url=cached.url, tools=tool_schemas)
+
+    if not changed:
+        logger.info("Tool snapshot is up to date")
+        return
+
+    logger.info("Tools changed on %s, updating snapshot", ", ".join(changed))
+    save_tool_snapshot(path, changed)
+    for handler in change_handlers:
+        handler()
+
+
+def revalidate_in_background(
+    path: Path, servers: dict[str, ServerToolSnapshot], mcp_config: MCPConfig
+) -> None:
+    """Compare snapshot entries against the live servers without blocking the caller.
+
+    Changed servers are written back to the snapshot and the change handlers are notified.
+
+    Args:
+        path: Snapshot file path
+        servers: Snapshot entries that were used to build tools
+        mcp_config: MCP configuration with the discovery timeout and pool settings
+    """
+    task = asyncio.create_task(_revalidate(path, servers, mcp_config))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def write_tool_snapshot(mcp_config: MCPConfig) -> None:
+    """Discover every MCP server and write a fresh snapshot, e.g. to bake into an image."""
+    path = resolve_snapshot_path(mcp_config)
+    if path is None:
+        msg = "mcp.tool_snapshot_path is not configured"
+        raise ValueError(msg)
+
+    servers: dict[str, ServerToolSnapshot] = {}
+    try:
+        for name, url in get_mcp_server_urls(mcp_config).items():
+            tool_schemas = await fetch_tool_schemas(get_mcp_client(name, url, mcp_config))
+            servers[name] = ServerToolSnapshot(url=url, tools=tool_schemas)
+    finally:
+        await close_session_pools()
+    save_tool_snapshot(path, servers)
+
+
+if __name__ == "__main__":
+    from config import config
+
+    asyncio.run(write_tool_snapshot(config.mcp))
@@ -0,0 +1,186 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from logging_config import get_logger
+from mcp import types
+from pydantic import ValidationError
+from schemas import ToolCacheConfig
+
+logger = get_logger(__name__)
+
+# Bump whenever the stored payload layout changes so older rows are ignored instead of misread
+STORE_VERSION = 1
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tool_results_v{STORE_VERSION} (
+    key TEXT PRIMARY KEY,
+    tool_name TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tool_results_v{STORE_VERSION}_expires_at
+    ON tool_results_v{STORE_VERSION} (expires_at);
+"""
+
+
+def resolve_store_path(cache_config: ToolCacheConfig) -> Path | None:
+    """Return the absolute store path, or None if the persistent store is disabled.
+
+    Relative paths are resolved against the agent directory.
+    """
+    if cache_config.store_path is None:
+        return None
+    return Path(__file__).parent / cache_config.store_path
+
+
+class ToolResultStore:
+    """SQLite store of MCP tool results that survives restarts.
+
+    Payloads are zlib-compressed and expire by wall-clock time, so every uvicorn worker on the
+    host can share one file. The database runs in WAL mode, letting readers proceed while a
+    worker writes, and writers wait up to `store_busy_timeout_seconds` for each other. Store errors
+    are logged and treated as misses, so a broken store never fails a tool call.
+
+    Methods block on disk I/O and are meant to run in a worker thread. Each thread keeps its own
+    connection, opened on its first call and reopened after an error.
+    """
+
+    def __init__(self, path: Path, cache_config: ToolCacheConfig) -> None:
+        self.path = path
+        self.cache_config = cache_config
+        self._table = f"tool_results_v{STORE_VERSION}"
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+        self._initialized = False
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+        connection = sqlite3.connect(
+            self.path, timeout=self.cache_config.store_busy_timeout_seconds, isolation_level=None
+        )
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                connection.executescript(_SCHEMA)
+                self._initialized = True
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._local.connection = connection
+        return connection
+
+    def _reset_connection(self) -> None:
+        # The connection may be what broke, so the thread's next call opens a new one
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def get(self, key: str) -> tuple[types.CallToolResult, float] | None:
+        """Return the stored result for `key` and its remaining TTL, None if missing or expired."""
+        try:
+            cursor = self._connection().execute(
+                f"SELECT expires_at, payload FROM {self._table} WHERE key = ?",  # noqa: S608
+                (key,),
+            )
+            row = cursor.fetchone()
+            if row is None or row[0] <= time.time():
+                self._misses += 1
+                return None
+            result = types.CallToolResult.model_validate_json(zlib.decompress(row[1]))
+        except (sqlite3.Error, zlib.error, ValidationError):
+            self._reset_connection()
+            self._errors += 1
+            logger.warning("Could not read tool result from %s", self.path, exc_info=True)
+            return None
+        self._hits += 1
+        return result, row[0] - time.time()
+
+    def set(self, key: str, tool_name: str, result: types.CallToolResult, ttl: float) -> None:
+        """Store a result of `tool_name` for `ttl` seconds, replacing any previous one."""
+        payload = zlib.compress(
+            result.model_dump_json(by_alias=True).encode(),
+            self.cache_config.store_compression_level,
+        )
+        try:
+            self._connection().execute(
+                f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?, ?)",  # noqa: S608
+                (key, tool_name, time.time() + ttl, payload),
+            )
+        except sqlite3.Error:
+            self._reset_connection()
+            self._errors += 1
+            logger.warning("Could not write tool result to %s", self.path, exc_info=True)
+            return
+        self._writes += 1
+
+    def purge_expired(self) -> int:
+        """Delete expired results, returning how many were removed."""
+        try:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self._table} WHERE expires_at <= ?",  # noqa: S608
+                (time.time(),),
+            )
+        except sqlite3.Error:
+            self._reset_connection()
+            self._errors += 1
+            logger.warning("Could not purge tool results from %s", self.path, exc_info=True)
+            return 0
+        return cursor.rowcount
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit, miss, write and error counters of this process."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "writes": self._writes,
+            "errors": self._errors,
+        }
+
+
+# Process-wide stores keyed by their file path
+_tool_stores: dict[Path, ToolResultStore] = {}
+
+# Purges of newly opened stores, kept referenced until they finish
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+async def _purge_expired(store: ToolResultStore) -> None:
+    purged = await asyncio.to_thread(store.purge_expired)
+    logger.info("Purged %d expired results from tool result store %s", purged, store.path)
+
+
+def get_tool_store(cache_config: ToolCacheConfig) -> ToolResultStore | None:
+    """Return the shared store for `cache_config`, None if it is disabled.
+
+    Expired results are purged in a worker thread when the store is first opened, so the
+    DELETE does not block the event loop.
+    """
+    path = resolve_store_path(cache_config)
+    if not cache_config.enabled or path is None:
+        return None
+    store = _tool_stores.get(path)
+    if store is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        store = _tool_stores[path] = ToolResultStore(path, cache_config)
+        logger.info("Opened tool result store %s", path)
+        task = asyncio.create_task(_purge_expired(store))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return store
+
+
+def get_tool_store_stats() -> dict[str, dict[str, int]]:
+    """Stats of every shared store, keyed by file path."""
+    return {str(path): store.stats for path, store in _tool_stores.items()}
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
+
+from config import config
+from initialize import discovery_report, get_prompts
+from llm_client import close_llm_clients, prime_llm_connection
+from logging_config import get_logger
+from mcp_pool import close_session_pools, get_mcp_server_urls, get_session_pool
+from registry import agent_registry
+from schemas import Config, DependencyStatus, Readiness
+
+logger = get_logger(__name__)
+
+# Readiness reported by the /ready endpoint, updated as warm-up steps finish
+readiness = Readiness()
+
+# Delay between warm-up attempts while the server is not ready
+WARMUP_RETRY_SECONDS = 30.0
+
+# Keep a reference to the running warm-up so it is not garbage collected
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+async def _check(
+    name: str,
+    step: Callable[[], Awaitable[dict[str, Any]]],
+    timeout_seconds: float,
+    *,
+    required: bool = True,
+) -> None:
+    status = DependencyStatus(required=required)
+    start = time.monotonic()
+    try:
+        async with asyncio.timeout(timeout_seconds):
+            status.detail = await step()
+        status.ready = True
+    except TimeoutError:
+        status.error = f"Timed out after {timeout_seconds}s"
+        logger.warning("Warm-up of %s timed out after %ss", name, timeout_seconds)
+    except Exception as e:  # noqa: BLE001
+        # A failing dependency is reported in the status, whatever the error
+        status.error = str(e) or type(e).__name__
+        logger.warning("Warm-up of %s failed", name, exc_info=True)
+    status.duration_seconds = time.monotonic() - start
+    readiness.dependencies[name] = status
+
+
+async def warm_up(specific_config: Config | None = None) -> Readiness:
+    """Connect to every dependency ahead of the first request and record their status.
+
+    MCP sessions, prompts and the LLM connection pool are warmed concurrently, then the shared
+    agent is built on top of the open sessions. The server is ready once the prompts are loaded
+    and the agent is built; MCP servers and the LLM provider are reported without gating it,
+    since the agent degrades to the tools that are reachable.
+
+    Args:
+        specific_config: Configuration to warm up, defaults to the global config
+
+    Returns:
+        Readiness: The updated readiness report
+    """
+    if specific_config is None:
+        specific_config = config
+
+    timeout_seconds = specific_config.agent.warmup_timeout_seconds
+    start = time.monotonic()
+    logger.info("Warming up")
+
+    async def load_prompts() -> dict[str, Any]:
+        return {"version": get_prompts().version}
+
+    async def prime_llm() -> dict[str, Any]:
+        return {"pool": await prime_llm_connection(specific_config.llm)}
+
+    def connect_mcp(name: str, url: str) -> Callable[[], Awaitable[dict[str, Any]]]:
+        async def connect() -> dict[str, Any]:
+            pool = get_session_pool(name, url, specific_config.mcp)
+            await pool.run(lambda session: session.send_ping())
+            return {"pool": pool.stats}
+
+        return connect
+
+    async def build_agent() -> dict[str, Any]:
+        agent = await agent_registry.get_agent()
+        agent_tools = cast(
+            "list[object]",
+            agent.tools or getattr(agent.tool_retriever, "tools", []),  # type: ignore[misc]
+        )
+        return {
+            "tool_count": len(agent_tools),
+            "discovery": {name: report.model_dump() for name, report in discovery_report.items()},
+        }
+
+    await asyncio.gather(
+        _check("prompts", load_prompts, timeout_seconds),
+        _check("llm", prime_llm, timeout_seconds, required=False),
+        *(
+            _check(f"mcp:{name}", connect_mcp(name, url), timeout_seconds, required=False)
+            for name, url in get_mcp_server_urls(specific_config.mcp).items()
+        ),
+    )
+    await _check("agent", build_agent, timeout_seconds)
+
+    readiness.warmup_finished = True
+    readiness.warmup_duration_seconds = time.monotonic() - start
+    readiness.ready = all(
+        status.ready for status in readiness.dependencies.values() if status.required
+    )
+    logger.info(
+        "Warm-up finished in %.2fs, ready=%s", readiness.warmup_duration_seconds, readiness.ready
+    )
+    return readiness
+
+
+async def _warm_up_until_ready() -> None:
+    while not (await warm_up()).ready:
+        logger.warning("Not ready after warm-up, retrying in %.0fs", WARMUP_RETRY_SECONDS)
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+
+def start_warm_up() -> None:
+    """Warm up in the background so liveness checks answer while dependencies connect.
+
+    A warm-up leaving the server unready is retried every `WARMUP_RETRY_SECONDS` until it is.
+    """
+    if not config.agent.warmup_on_startup:
+        logger.info("Warm-up disabled, the agent is built on the first request")
+        readiness.ready = True
+        return
+    task = asyncio.create_task(_warm_up_until_ready())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def check_readiness() -> Readiness:
+    """Return the readiness report, updated from the live agent registry.
+
+    Once warm-up finished, the server is ready as soon as the shared agent has been built, also
+    when a request built it between two warm-up attempts.
+
+    Returns:
+        Readiness: The readiness report
+    """
+    if readiness.warmup_finished and agent_registry.built_at > 0.0:
+        readiness.ready = True
+    return readiness
+
+
+async def shutdown() -> None:
+    """Stop a running warm-up and close the MCP session and LLM connection pools."""
+    for task in list(_background_tasks):
+        task.cancel()
+    await close_session_pools()
+    await close_llm_clients()
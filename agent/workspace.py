@@ -0,0 +1,159 @@
+import asyncio
+import contextvars
+import json
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+from logging_config import get_logger
+from mcp import types
+from mcp_pool import PooledMCPClient, get_mcp_client, get_mcp_server_urls
+from schemas import MCPConfig, ToolSchema, WorkspaceConfig
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Workspace of the agent run the current task belongs to, if any
+current_workspace: contextvars.ContextVar["TempWorkspace | None"] = contextvars.ContextVar(
+    "current_workspace", default=None
+)
+
+# Keep references to running cleanup tasks so they are not garbage collected
+_background_tasks: set[asyncio.Task[None]] = set()
+
+
+def parse_workspace_id(result: types.CallToolResult, argument: str) -> str:
+    """Read the directory created by the workspace tool from its result.
+
+    The result text may be a JSON object holding the directory under `argument`, a JSON string
+    or the plain directory.
+
+    Raises:
+        ValueError: If the tool failed or returned no directory
+    """
+    texts = [block.text for block in result.content if isinstance(block, types.TextContent)]
+    if result.isError or not texts:
+        msg = f"Could not create workspace: {' '.join(texts) or 'no result'}"
+        raise ValueError(msg)
+    try:
+        payload = json.loads(texts[0])
+    except ValueError:
+        payload = texts[0]
+    if isinstance(payload, dict):
+        payload = payload.get(argument)  # type: ignore[union-attr]
+    if not isinstance(payload, str) or not payload.strip():
+        msg = f"Workspace result has no {argument}: {texts[0]}"
+        raise ValueError(msg)
+    return payload.strip()
+
+
+def hide_workspace_tools(
+    tool_schemas: list[ToolSchema], workspace_config: WorkspaceConfig
+) -> tuple[list[ToolSchema], set[str]]:
+    """Drop the workspace tools and the workspace argument from a server's tool schemas.
+
+    Returns:
+        tuple: The schemas shown to the model and the names of the tools taking the workspace
+    """
+    hidden = {workspace_config.create_tool, workspace_config.delete_tool}
+    argument = workspace_config.argument
+    schemas: list[ToolSchema] = []
+    workspace_tools: set[str] = set()
+    for tool in tool_schemas:
+        if tool.name in hidden:
+            continue
+        properties: dict[str, Any] = tool.input_schema.get("properties", {})
+        if argument not in properties:
+            schemas.append(tool)
+            continue
+        workspace_tools.add(tool.name)
+        input_schema = {
+            **tool.input_schema,
+            "properties": {key: value for key, value in properties.items() if key != argument},
+            "required": [key for key in tool.input_schema.get("required", []) if key != argument],
+        }
+        schemas.append(tool.model_copy(update={"input_schema": input_schema}))
+    return schemas, workspace_tools
+
+
+class TempWorkspace:
+    """Temp directory on an MCP server owned by one agent run.
+
+    The directory is created on the first tool call that needs it, so runs that never reach
+    the server pay nothing, and deleted when the run ends.
+    """
+
+    def __init__(self, client: PooledMCPClient, workspace_config: WorkspaceConfig) -> None:
+        self.client = client
+        self.workspace_config = workspace_config
+        self.workspace_id: str | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_id(self) -> str:
+        """Return the directory, creating it on first use."""
+        async with self._lock:
+            if self.workspace_id is None:
+                result = await self.client.call_tool(self.workspace_config.create_tool, {})
+                self.workspace_id = parse_workspace_id(result, self.workspace_config.argument)
+                logger.info("Created workspace %s", self.workspace_id)
+        return self.workspace_id
+
+    async def delete(self) -> None:
+        """Delete the directory if it was created, logging instead of raising on failure."""
+        async with self._lock:
+            if self.workspace_id is None:
+                return
+            workspace_id, self.workspace_id = self.workspace_id, None
+        try:
+            await self.client.call_tool(
+                self.workspace_config.delete_tool, {self.workspace_config.argument: workspace_id}
+            )
+        except Exception:  # noqa: BLE001
+            logger.warning("Could not delete workspace %s", workspace_id, exc_info=True)
+            return
+        logger.info("Deleted workspace %s", workspace_id)
+
+
+async def add_workspace_argument(arguments: dict[str, Any], argument: str) -> dict[str, Any]:
+    """Fill in the current run's workspace, leaving arguments alone outside a run."""
+    workspace = current_workspace.get()
+    if workspace is None:
+        return arguments
+    return {**arguments, argument: await workspace.get_id()}
+
+
+def run_in_workspace(workspace: TempWorkspace | None, fn: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    """Call `fn` with `workspace` as the current workspace.
+
+    `fn` runs in a copy of the current context, so the tasks it starts, like the agent
+    workflow's steps, see the workspace while the caller's context is left untouched.
+    """
+    context = contextvars.copy_context()
+    context.run(current_workspace.set, workspace)
+    return context.run(fn, *args)
+
+
+@asynccontextmanager
+async def temp_workspace(mcp_config: MCPConfig) -> AsyncIterator[TempWorkspace | None]:
+    """Workspace for one agent run, deleted on exit even on error or cancellation.
+
+    Yields None if workspaces are disabled or their server is not configured.
+    """
+    workspace_config = mcp_config.workspace
+    url = get_mcp_server_urls(mcp_config).get(workspace_config.server)
+    if not workspace_config.enabled or url is None:
+        yield None
+        return
+
+    workspace = TempWorkspace(
+        get_mcp_client(workspace_config.server, url, mcp_config), workspace_config
+    )
+    try:
+        yield workspace
+    finally:
+        # Shielded so a cancelled run still deletes its directory
+        task = asyncio.create_task(workspace.delete())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        await asyncio.shield(task)
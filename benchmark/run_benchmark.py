@@ -2,6 +2,7 @@ import json
 import os
 import sys
 import uuid
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from pathlib import Path
 
@@ -15,6 +16,7 @@ import yaml
 from dotenv import load_dotenv
 from handlers import handle_response
 from logging_config import get_logger
+from mcp_pool import get_backend_stats
 from schemas import Message
 
 from benchmark.test_data import (
@@ -64,7 +66,8 @@ timestamp = datetime.now(UTC).strftime("%Y%m%d_%H:%M")
 
 NUMERICAL_RESULTS_FILE = Path(f"{RESULTS_PATH}/numerical/results_{timestamp}.tsv")
 TEXTUAL_RESULTS_FILE = Path(f"{RESULTS_PATH}/textual/results_{timestamp}.tsv")
-for file in [NUMERICAL_RESULTS_FILE, TEXTUAL_RESULTS_FILE]:
+LATENCY_RESULTS_FILE = Path(f"{RESULTS_PATH}/latency/results_{timestamp}.tsv")
+for file in [NUMERICAL_RESULTS_FILE, TEXTUAL_RESULTS_FILE, LATENCY_RESULTS_FILE]:
     if not file.parent.exists():
         file.parent.mkdir(parents=True)
     if file.exists():
@@ -88,6 +91,22 @@ extract_number_prompt = prompts["extract_number_prompt"]
 score_textual_answer_prompt = prompts["score_textual_answer_prompt"]
 
 
+@pytest.fixture(scope="session", autouse=True)
+def record_tool_call_latency() -> Iterator[None]:
+    """Write the per-call MCP tool latency of each backend and transport after the run."""
+    yield
+    with LATENCY_RESULTS_FILE.open("w") as fh:
+        logger.info("Writing tool call latency to %s", LATENCY_RESULTS_FILE)
+        fh.write("server\ttransport\tcalls\tp50_seconds\tp95_seconds\tmax_seconds\n")
+        for backend in get_backend_stats().values():
+            latency = backend["call_latency"]
+            fh.write(
+                f"{backend['name']}\t{backend['transport']}\t{latency['calls']}\t"
+                f"{latency['p50_seconds']:.3f}\t{latency['p95_seconds']:.3f}\t"
+                f"{latency['max_seconds']:.3f}\n"
+            )
+
+
 @pytest.mark.parametrize(("question", "expected", "response_type"), benchmark_list)
 @pytest.mark.asyncio
 async def test_agent_question(question: str, expected: str | int, response_type: str) -> None:
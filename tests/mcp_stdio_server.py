@@ -0,0 +1,15 @@
+# Minimal MCP server used by the transport tests, run as a stdio subprocess
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("test")
+
+
+@server.tool()
+def echo(text: str) -> str:
+    """Return the given text."""
+    return text
+
+
+if __name__ == "__main__":
+    server.run("stdio")
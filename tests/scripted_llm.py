@@ -0,0 +1,33 @@
+# LLM returning scripted ReAct responses, used by the agent workflow tests
+
+from collections.abc import Iterator
+from typing import Any
+
+from llama_index.core.llms import CompletionResponse, CustomLLM, LLMMetadata
+from llama_index.core.llms.callbacks import llm_completion_callback
+
+
+class ScriptedLLM(CustomLLM):
+    """LLM answering each turn with the next scripted response."""
+
+    responses: list[str]
+    prompts: list[str] = []
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata()
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:  # noqa: FBT001, FBT002
+        self.prompts.append(prompt)
+        return CompletionResponse(text=self.responses.pop(0))
+
+    @llm_completion_callback()
+    def stream_complete(
+        self,
+        prompt: str,
+        formatted: bool = False,  # noqa: FBT001, FBT002
+        **kwargs: Any,
+    ) -> Iterator[CompletionResponse]:
+        text = self.complete(prompt).text
+        yield CompletionResponse(text=text, delta=text)
@@ -1,19 +1,60 @@
 import asyncio
 import os
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
 from typing import cast
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
-from schemas import Config, LLMConfig, MCPConfig, ServerConfig
+from gazetteer import GAZETTEER_TOOL_NAME
+from llm_client import get_http_handler
+from schemas import Config, LLMConfig, MCPConfig, ServerConfig, ServerDiscovery
 from workflows.events import Event
 
 from agent import create_agent, get_llm, run_agent
 
+CALCULATOR_TOOLS = [
+    "add",
+    "subtract",
+    "multiply",
+    "divide",
+    "percentage",
+    "sum",
+    "mean",
+    "median",
+    "percentiles",
+    "growth_rates",
+    "weighted_average",
+]
+
+
+class FakeHandler:
+    """Workflow handler that is awaitable and provides stream_events()."""
+
+    async def stream_events(self) -> AsyncGenerator[Event, None]:
+        yield cast("Event", {"event": "chunk1"})
+        yield cast("Event", {"event": "chunk2"})
+
+    def __await__(self) -> AsyncGenerator[Event, None]:  # type: ignore[override]
+        """Return the final event."""
+
+        async def _final() -> Event:
+            return cast("Event", {"event": "final"})
+
+        return _final().__await__()  # type: ignore[return-value]
+
 
 class TestGetLLM:
     """Test cases for the get_llm function."""
 
+    @pytest.fixture(autouse=True)
+    def isolated_llm_clients(self) -> Iterator[None]:
+        """Start every test without shared LLM clients or connection pools."""
+        with (
+            patch.dict("llm_client._llms", clear=True),
+            patch.dict("llm_client._http_handlers", clear=True),
+        ):
+            yield
+
     @patch.dict(
         os.environ,
         {
@@ -22,7 +63,7 @@ class TestGetLLM:
             "LANGFUSE_PROJECT_ID": "test-project",
         },
     )
-    @patch("agent.LiteLLM")
+    @patch("llm_client.PooledLiteLLM")
     def test_get_llm_with_default_model(self, mock_litellm: MagicMock) -> None:
         """Test get_llm function with default model configuration."""
         mock_instance = MagicMock()
@@ -33,6 +74,8 @@ class TestGetLLM:
         result = get_llm(llm_config)
 
         mock_litellm.assert_called_once_with(
+            http_handler=get_http_handler(llm_config.http),
+            provider="openai",
             model="gpt-4o-mini",
             temperature=0.5,
             additional_kwargs={"stop": ["Observation:"], "aws_region_name": None},
@@ -46,7 +89,7 @@ class TestGetLLM:
             "LANGFUSE_PROJECT_ID": "custom-project",
         },
     )
-    @patch("agent.LiteLLM")
+    @patch("llm_client.PooledLiteLLM")
     def test_get_llm_with_custom_model(self, mock_litellm: MagicMock) -> None:
         """Test get_llm function with custom model configuration."""
         mock_instance = MagicMock()
@@ -57,12 +100,25 @@ class TestGetLLM:
         result = get_llm(llm_config)
 
         mock_litellm.assert_called_once_with(
+            http_handler=get_http_handler(llm_config.http),
+            provider="openai",
             model="gpt-4",
             temperature=0.7,
             additional_kwargs={"stop": ["Observation:"], "aws_region_name": None},
         )
         assert result == mock_instance
 
+    def test_get_llm_reuses_client_per_config(self) -> None:
+        """The same config returns the same client; the pool is shared between configs."""
+        bedrock_config = LLMConfig(model="bedrock/model", temperature=0.0, provider="bedrock")
+
+        llm = get_llm(bedrock_config)
+
+        assert get_llm(bedrock_config.model_copy()) is llm
+        other = get_llm(bedrock_config.model_copy(update={"temperature": 0.5}))
+        assert other is not llm
+        assert other._get_all_kwargs()["client"] is llm._get_all_kwargs()["client"]  # noqa: SLF001
+
 
 class TestCreateAgent:
     """Test cases for the create_agent function."""
@@ -83,7 +139,7 @@ class TestCreateAgent:
     @patch("agent.get_llm")
     @patch("agent.get_tools")
     @patch("agent.get_prompts")
-    @patch("agent.ReActAgent")
+    @patch("agent.JournaledReActAgent")
     @pytest.mark.asyncio
     def test_create_agent_with_default_parameters(
         self,
@@ -119,8 +175,16 @@ class TestCreateAgent:
         mock_get_tools.assert_called_once_with(sample_config.mcp)
         mock_react_agent.assert_called_once_with(
             tools=mock_tools,
+            tool_retriever=None,
             llm=mock_llm_instance,
             system_prompt=mock_prompts["system_prompt"],
+            formatter=ANY,
+            max_repeated_tool_calls=2,
+            unreplayable_tools=["create_temp_dir", "delete_temp_dir", "build_map"],
+            observation_encoder=ANY,
+            observation_spill=None,
+            observation_store_config=sample_config.agent.observation_store,
+            column_tools=CALCULATOR_TOOLS,
         )
         mock_agent_instance.update_prompts.assert_called_once()
         assert result == mock_agent_instance
@@ -128,7 +192,7 @@ class TestCreateAgent:
     @patch("agent.get_llm")
     @patch("agent.get_tools")
     @patch("agent.get_prompts")
-    @patch("agent.ReActAgent")
+    @patch("agent.JournaledReActAgent")
     @pytest.mark.asyncio
     async def test_create_agent_with_custom_temperature(
         self,
@@ -173,8 +237,16 @@ class TestCreateAgent:
         mock_get_tools.assert_called_once_with(config.mcp)
         mock_react_agent.assert_called_once_with(
             tools=mock_tools,
+            tool_retriever=None,
             llm=mock_llm_instance,
             system_prompt=mock_prompts["system_prompt"],
+            formatter=ANY,
+            max_repeated_tool_calls=2,
+            unreplayable_tools=["create_temp_dir", "delete_temp_dir", "build_map"],
+            observation_encoder=ANY,
+            observation_spill=None,
+            observation_store_config=config.agent.observation_store,
+            column_tools=CALCULATOR_TOOLS,
         )
         mock_agent_instance.update_prompts.assert_called_once()
         assert result == mock_agent_instance
@@ -192,23 +264,6 @@ class TestCreateAgent:
         session_id = "test-session-id"
 
         mock_agent_instance = MagicMock()
-
-        async def mock_stream_events() -> AsyncGenerator[Event, None]:
-            yield cast("Event", {"event": "chunk1"})
-            yield cast("Event", {"event": "chunk2"})
-
-        # Create a handler that is awaitable and provides stream_events()
-        class FakeHandler:
-            async def stream_events(self) -> AsyncGenerator[Event, None]:
-                async for ev in mock_stream_events():
-                    yield ev
-
-            def __await__(self) -> AsyncGenerator[Event, None]:  # type: ignore[override]
-                async def _final() -> Event:
-                    return cast("Event", {"event": "final"})
-
-                return _final().__await__()  # type: ignore[return-value]
-
         mock_agent_instance.run.return_value = FakeHandler()
 
         # Act
@@ -223,3 +278,97 @@ class TestCreateAgent:
             cast("Event", {"event": "chunk2"}),
             cast("Event", {"event": "final"}),
         ]
+
+    @patch.dict(
+        "agent.discovery_report",
+        {
+            "geospatial": ServerDiscovery(
+                name="geospatial", url="geo", duration_seconds=0.1, tool_names=["build_map"]
+            )
+        },
+    )
+    @patch("agent.get_llm")
+    @patch("agent.get_tools", return_value=[])
+    @patch("agent.get_prompts")
+    @patch("agent.JournaledReActAgent")
+    @pytest.mark.asyncio
+    async def test_create_agent_retrieves_tools(
+        self,
+        mock_react_agent: MagicMock,
+        mock_get_prompts: MagicMock,
+        mock_get_tools: MagicMock,
+        mock_get_llm: MagicMock,
+        sample_config: Config,
+    ) -> None:
+        """Only tools the agent was given are always included, and server tools are chained."""
+        sample_config.agent.tool_retrieval.enabled = True
+        sample_config.agent.gazetteer.enabled = True
+        mock_get_prompts.return_value = MagicMock(
+            system_prompt="You are a helpful assistant.", header_prompt="Think step by step."
+        )
+
+        await create_agent(sample_config)
+
+        tool_retriever = mock_react_agent.call_args.kwargs["tool_retriever"]
+        assert tool_retriever.always_include == {"get_ccri_metadata", GAZETTEER_TOOL_NAME}
+        assert tool_retriever.chains == [{"build_map"}]
+
+    @patch("agent.start_prefetch")
+    @patch("agent.temp_workspace")
+    @patch("agent.langfuse")
+    @pytest.mark.asyncio
+    async def test_run_agent_uses_the_given_config(
+        self,
+        mock_langfuse: MagicMock,
+        mock_temp_workspace: MagicMock,
+        mock_start_prefetch: MagicMock,
+        sample_config: Config,
+    ) -> None:
+        """Test run_agent sets up the run from the config the agent was built from."""
+        mock_temp_workspace.return_value.__aenter__.return_value = None
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.run.return_value = FakeHandler()
+
+        _ = [
+            event
+            async for event in run_agent(
+                mock_agent_instance, "Hello", "trace", "session", specific_config=sample_config
+            )
+        ]
+
+        mock_temp_workspace.assert_called_once_with(sample_config.mcp)
+        mock_start_prefetch.assert_called_once_with(
+            mock_agent_instance, "Hello", sample_config.agent.prefetch
+        )
+
+    @patch("agent.start_prefetch")
+    @patch("agent.temp_workspace")
+    @patch("agent.langfuse")
+    @pytest.mark.asyncio
+    async def test_run_agent_prefetches_on_the_latest_question(
+        self,
+        mock_langfuse: MagicMock,
+        mock_temp_workspace: MagicMock,
+        mock_start_prefetch: MagicMock,
+        sample_config: Config,
+    ) -> None:
+        """Test the prefetch matches the latest user message, not earlier turns."""
+        mock_temp_workspace.return_value.__aenter__.return_value = None
+        mock_agent_instance = MagicMock()
+        mock_agent_instance.run.return_value = FakeHandler()
+
+        _ = [
+            event
+            async for event in run_agent(
+                mock_agent_instance,
+                "User: Floods in Kenya?\nAssistant: ...\nUser: Thanks",
+                "trace",
+                "session",
+                specific_config=sample_config,
+                question="Thanks",
+            )
+        ]
+
+        mock_start_prefetch.assert_called_once_with(
+            mock_agent_instance, "Thanks", sample_config.agent.prefetch
+        )
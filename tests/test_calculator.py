@@ -1,5 +1,17 @@
 import pytest
-from calculator import add, divide, multiply, percentage, subtract
+from calculator import (
+    add,
+    divide,
+    growth_rates,
+    mean,
+    median,
+    multiply,
+    percentage,
+    percentiles,
+    subtract,
+    sum_values,
+    weighted_average,
+)
 
 
 class TestAdd:
@@ -90,3 +102,68 @@ class TestPercentage:
     def test_percentage_validation_error_zero_whole(self) -> None:
         with pytest.raises(ValueError, match="Percentage of zero is undefined"):
             percentage(1, 0)
+
+
+class TestElementWise:
+    def test_lists_are_computed_element_wise(self) -> None:
+        result = multiply([1, 2, 3], 2)
+        assert result["result"] == [2.0, 4.0, 6.0]
+        assert result["input_arguments"] == {"a": [1, 2, 3], "b": 2}
+
+    def test_mismatched_lengths(self) -> None:
+        with pytest.raises(ValueError, match="broadcast"):
+            add([1, 2, 3], [1, 2])
+
+
+class TestSeriesStatistics:
+    EXPECTED_SUM = 12.0
+    EXPECTED_MEAN = 4.0
+    EXPECTED_MEDIAN = 3.0
+    EXPECTED_MEAN_WITH_GAP = 2.0
+
+    def test_sum_mean_median(self) -> None:
+        values = [1, 3, 8]
+        assert sum_values(values)["result"] == self.EXPECTED_SUM
+        assert mean(values)["result"] == self.EXPECTED_MEAN
+        assert median(values)["result"] == self.EXPECTED_MEDIAN
+        assert sum_values(values)["input_arguments"] == {"values": [1, 3, 8]}
+
+    def test_missing_values_are_skipped(self) -> None:
+        assert mean([1, None, 3])["result"] == self.EXPECTED_MEAN_WITH_GAP
+
+    def test_no_values(self) -> None:
+        with pytest.raises(ValueError, match="No values given"):
+            sum_values([])
+
+    def test_percentiles(self) -> None:
+        result = percentiles([1, 2, 3, 4, 5], [50, 90])
+        assert result["result"] == pytest.approx([3.0, 4.6])
+        assert result["input_arguments"] == {"values": [1, 2, 3, 4, 5], "q": [50, 90]}
+
+    def test_percentiles_out_of_range(self) -> None:
+        with pytest.raises(ValueError, match="between 0 and 100"):
+            percentiles([1, 2], [150])
+
+
+class TestGrowthRates:
+    def test_growth_rates_right(self) -> None:
+        result = growth_rates([100, 110, 99])
+        assert result["result"] == pytest.approx([10.0, -10.0])
+        assert result["input_arguments"] == {"values": [100, 110, 99]}
+
+    def test_growth_from_zero(self) -> None:
+        with pytest.raises(ValueError, match="Growth from zero"):
+            growth_rates([0, 5])
+
+
+class TestWeightedAverage:
+    EXPECTED_AVERAGE = 17.5
+
+    def test_weighted_average_right(self) -> None:
+        result = weighted_average([10, 20, None], [1, 3, 5])
+        assert result["result"] == self.EXPECTED_AVERAGE
+        assert result["input_arguments"] == {"values": [10, 20, None], "weights": [1, 3, 5]}
+
+    def test_zero_weights(self) -> None:
+        with pytest.raises(ValueError, match="Weights sum to zero"):
+            weighted_average([1, 2], [0, 0])
@@ -0,0 +1,128 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from catalog import CatalogIndex, DatasetCatalog, parse_entries
+from mcp import types
+from schemas import CatalogConfig, CatalogEntry, CatalogSourceConfig, MCPConfig
+
+INDICATORS = {
+    "indicators": [
+        {"code": "CME_MRY0T4", "name": "Under-five mortality rate", "unit": "per 1000"},
+        {"code": "NT_ANT_HAZ_NE2", "name": "Stunting prevalence in children under 5"},
+    ]
+}
+DATASETS = ["river_flood_return_period_100y", "drought_frequency", "heatwave_days"]
+
+
+def make_result(payload: object, *, is_error: bool = False) -> types.CallToolResult:
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=json.dumps(payload))], isError=is_error
+    )
+
+
+def make_catalog() -> DatasetCatalog:
+    return DatasetCatalog(
+        CatalogConfig(
+            enabled=True,
+            sources=[
+                CatalogSourceConfig(
+                    name="datawarehouse", server="datawarehouse", tool="list_indicators"
+                ),
+                CatalogSourceConfig(name="gee", server="geospatial", tool="list_datasets"),
+            ],
+        ),
+        MCPConfig(datawarehouse_url="dw", rag_url="rag", geospatial_url="geo"),
+    )
+
+
+def make_client(results: dict[str, types.CallToolResult | Exception]) -> MagicMock:
+    client = MagicMock()
+    client.call_tool = AsyncMock(side_effect=lambda tool, arguments: _result(results[tool]))
+    return client
+
+
+def _result(result: types.CallToolResult | Exception) -> types.CallToolResult:
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+class TestCatalogIndex:
+    """Test cases for parsing listings and searching the index."""
+
+    def test_listings_are_parsed(self) -> None:
+        """Objects, wrapped lists and plain identifiers all become entries."""
+        entries = parse_entries("datawarehouse", make_result(INDICATORS), CatalogConfig())
+        datasets = parse_entries("gee", make_result(DATASETS), CatalogConfig())
+
+        assert entries[0] == CatalogEntry(
+            source="datawarehouse",
+            id="CME_MRY0T4",
+            name="Under-five mortality rate",
+            description="per 1000",
+        )
+        assert [entry.id for entry in datasets] == DATASETS
+
+    def test_best_matches_come_first(self) -> None:
+        """Entries sharing more terms with the query rank first."""
+        index = CatalogIndex(
+            parse_entries("datawarehouse", make_result(INDICATORS), CatalogConfig())
+            + parse_entries("gee", make_result(DATASETS), CatalogConfig())
+        )
+
+        assert [entry.id for entry in index.search("river floods", 5)] == [
+            "river_flood_return_period_100y"
+        ]
+        assert index.search("stunting children", 1)[0].id == "NT_ANT_HAZ_NE2"
+        assert index.search("earthquake", 5) == []
+
+
+class TestDatasetCatalog:
+    """Test cases for the DatasetCatalog class."""
+
+    @pytest.mark.asyncio
+    async def test_search_tool_answers_from_the_index(self) -> None:
+        """After a refresh, the tool answers from memory."""
+        catalog = make_catalog()
+        client = make_client(
+            {"list_indicators": make_result(INDICATORS), "list_datasets": make_result(DATASETS)}
+        )
+
+        with patch("catalog.get_mcp_client", return_value=client):
+            await catalog.refresh()
+        output = await catalog.get_tools()[0].acall(query="drought")
+
+        assert output.raw_output["matches"][0]["id"] == "drought_frequency"
+        assert output.raw_output["entries_per_source"] == {"datawarehouse": 2, "gee": 3}
+
+    @pytest.mark.asyncio
+    async def test_failed_source_keeps_its_entries(self) -> None:
+        """A source failing a later refresh keeps its entries; one never loaded is reported."""
+        catalog = make_catalog()
+        first = make_client(
+            {"list_indicators": make_result(INDICATORS), "list_datasets": RuntimeError("down")}
+        )
+        second = make_client(
+            {"list_indicators": RuntimeError("down"), "list_datasets": RuntimeError("down")}
+        )
+
+        with patch("catalog.get_mcp_client", return_value=first):
+            await catalog.refresh()
+        with patch("catalog.get_mcp_client", return_value=second):
+            await catalog.refresh()
+        result = catalog.search("mortality")
+
+        assert result["matches"][0]["id"] == "CME_MRY0T4"
+        assert result["unavailable_sources"] == ["gee"]
+        assert set(catalog.errors) == {"datawarehouse", "gee"}
+
+    @pytest.mark.asyncio
+    async def test_search_before_the_first_refresh(self) -> None:
+        """Searches before the catalog is loaded say so instead of reporting no data."""
+        catalog = make_catalog()
+
+        with patch("catalog.DatasetCatalog.refresh", new_callable=AsyncMock):
+            result = catalog.search("flood")
+
+        assert result["status"] == "loading"
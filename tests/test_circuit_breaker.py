@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+RECOVERY_SECONDS = 0.05
+
+
+def _breaker(retries: int) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test",
+        failure_threshold=2,
+        recovery_timeout_seconds=RECOVERY_SECONDS,
+        retries=retries,
+        retry_base_delay_seconds=0.0,
+    )
+
+
+class TestCircuitBreaker:
+    """Test cases for the CircuitBreaker class."""
+
+    @pytest.mark.asyncio
+    async def test_opens_after_threshold_and_fails_fast(self) -> None:
+        """Consecutive failures open the breaker and later calls skip the backend."""
+        breaker = _breaker(0)
+        operation = AsyncMock(side_effect=ConnectionError("down"))
+        handler = MagicMock()
+
+        with patch("circuit_breaker.open_handlers", [handler]):
+            for _ in range(2):
+                with pytest.raises(ConnectionError):
+                    await breaker.call(operation)
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(operation)
+
+        assert breaker.state is CircuitState.OPEN
+        assert operation.await_count == 2  # noqa: PLR2004
+        handler.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_closes_or_reopens(self) -> None:
+        """After the recovery timeout one probe is let through and decides the state."""
+        breaker = _breaker(0)
+        for _ in range(2):
+            breaker.record_failure()
+        await asyncio.sleep(RECOVERY_SECONDS)
+
+        assert breaker.state is CircuitState.HALF_OPEN
+        with pytest.raises(ConnectionError):
+            await breaker.call(AsyncMock(side_effect=ConnectionError("still down")))
+        assert breaker.is_open
+
+        await asyncio.sleep(RECOVERY_SECONDS)
+        assert await breaker.call(AsyncMock(return_value="ok")) == "ok"
+        assert breaker.state is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_during_probe_fail_fast(self) -> None:
+        """Only one half-open probe reaches the backend at a time."""
+        breaker = _breaker(0)
+        for _ in range(2):
+            breaker.record_failure()
+        await asyncio.sleep(RECOVERY_SECONDS)
+        release = asyncio.Event()
+
+        async def slow_probe() -> str:
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(breaker.call(slow_probe))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(AsyncMock())
+        release.set()
+
+        assert await probe == "ok"
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures(self) -> None:
+        """A failure followed by a success is retried and leaves the breaker closed."""
+        breaker = _breaker(1)
+        operation = AsyncMock(side_effect=[ConnectionError("blip"), "ok"])
+
+        assert await breaker.call(operation) == "ok"
+        assert breaker.state is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_protocol_errors_do_not_open(self) -> None:
+        """MCP protocol errors come from a healthy server and are not counted."""
+        breaker = _breaker(0)
+        operation = AsyncMock(side_effect=McpError(ErrorData(code=-1, message="bad args")))
+
+        for _ in range(3):
+            with pytest.raises(McpError):
+                await breaker.call(operation)
+
+        assert breaker.state is CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_request_timeouts_open(self) -> None:
+        """Read timeouts, raised by the MCP client as McpError, count as failures."""
+        breaker = _breaker(0)
+        operation = AsyncMock(side_effect=McpError(ErrorData(code=408, message="timed out")))
+
+        for _ in range(2):
+            with pytest.raises(McpError):
+                await breaker.call(operation)
+
+        assert breaker.is_open
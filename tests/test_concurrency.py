@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from concurrency import BackendBusyError, ConcurrencyLimiter
+
+CALL_COUNT = 6
+MAX_CONCURRENCY = 2
+
+
+class TestConcurrencyLimiter:
+    """Test cases for the ConcurrencyLimiter class."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrent_calls_and_records_queue_time(self) -> None:
+        """No more than max_concurrency calls run at once, the rest are queued."""
+        limiter = ConcurrencyLimiter("geospatial", MAX_CONCURRENCY)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def call() -> None:
+            nonlocal in_flight, max_in_flight
+            async with limiter.slot():
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+
+        await asyncio.gather(*(call() for _ in range(CALL_COUNT)))
+
+        assert max_in_flight == MAX_CONCURRENCY
+        assert limiter.stats["completed"] == CALL_COUNT
+        assert limiter.stats["in_flight"] == 0
+        assert limiter.stats["max_queue_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_calls_queued_too_long(self) -> None:
+        """Calls waiting longer than max_queue_seconds fail with BackendBusyError."""
+        limiter = ConcurrencyLimiter("geospatial", 1, max_queue_seconds=0.01)
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with limiter.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(BackendBusyError):
+            async with limiter.slot():
+                pass
+        release.set()
+        await holder
+
+        assert limiter.stats["rejected"] == 1
+        assert limiter.stats["queued"] == 0
+
+    @pytest.mark.asyncio
+    async def test_backlog_does_not_starve_other_backends(self) -> None:
+        """A saturated backend does not delay calls to another backend."""
+        geospatial = ConcurrencyLimiter("geospatial", 1)
+        datawarehouse = ConcurrencyLimiter("datawarehouse", 1)
+        release = asyncio.Event()
+
+        async def slow_reduction() -> None:
+            async with geospatial.slot():
+                await release.wait()
+
+        backlog = [asyncio.create_task(slow_reduction()) for _ in range(CALL_COUNT)]
+        await asyncio.sleep(0)
+
+        async with asyncio.timeout(0.1), datawarehouse.slot():
+            pass
+
+        assert geospatial.stats["queued"] == CALL_COUNT - 1
+        release.set()
+        await asyncio.gather(*backlog)
@@ -0,0 +1,52 @@
+import pytest
+from gazetteer import Gazetteer, get_gazetteer, normalize
+from schemas import GazetteerConfig
+
+
+@pytest.fixture(scope="module")
+def gazetteer() -> Gazetteer:
+    return Gazetteer.from_config(GazetteerConfig(enabled=True))
+
+
+class TestGazetteer:
+    """Test cases for the Gazetteer class."""
+
+    def test_names_are_normalized(self) -> None:
+        """Accents, case, punctuation and a leading article are ignored."""
+        assert normalize("The Côte d'Ivoire") == "cote d ivoire"
+        assert normalize("Trinidad & Tobago") == "trinidad and tobago"
+
+    @pytest.mark.parametrize(
+        "name",
+        ["Côte d'Ivoire", "cote d'ivoire", "Ivory Coast", "CIV", "CI", "civ", "Cote dIvoire"],
+    )
+    def test_names_aliases_and_codes(self, gazetteer: Gazetteer, name: str) -> None:
+        """Names, aliases and ISO codes, in any case, resolve exactly."""
+        result = gazetteer.resolve(name)
+
+        assert result["match"] == {"iso3": "CIV", "iso2": "CI", "name": "Côte d'Ivoire"}
+        assert result["score"] == 1.0
+
+    def test_misspellings_resolve(self, gazetteer: Gazetteer) -> None:
+        """A close misspelling resolves to the most similar country, listing the others."""
+        result = gazetteer.resolve("Nigera")
+
+        assert result["match"]["iso3"] == "NGA"
+        assert result["score"] < 1.0
+        assert "NER" in [alternative["iso3"] for alternative in result["alternatives"]]
+
+    def test_unknown_names(self, gazetteer: Gazetteer) -> None:
+        """Names unlike any country, and codes of none, do not resolve."""
+        assert gazetteer.resolve("Atlantis")["match"] is None
+        assert gazetteer.resolve("xq")["match"] is None
+
+    @pytest.mark.asyncio
+    async def test_tool(self, gazetteer: Gazetteer) -> None:
+        """The tool returns the resolution."""
+        output = await gazetteer.get_tools()[0].acall(name="Swaziland")
+
+        assert output.raw_output["match"]["iso3"] == "SWZ"
+
+    def test_disabled(self) -> None:
+        """No gazetteer is loaded when it is disabled."""
+        assert get_gazetteer(GazetteerConfig()) is None
@@ -0,0 +1,178 @@
+import asyncio
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from initialize import discovery_report, get_tools
+from llama_index.core.tools.function_tool import FunctionTool
+from mcp_pool import get_circuit_breaker
+from schemas import MCPConfig, ServerToolSnapshot, ToolSchema, WorkspaceConfig
+from tool_snapshot import load_tool_snapshot, save_tool_snapshot
+
+EXPECTED_SERVER_COUNT = 3
+
+
+def _tool(name: str) -> MagicMock:
+    tool = MagicMock(spec=FunctionTool)
+    tool.metadata.name = name
+    tool.metadata.get_name.return_value = name
+    return tool
+
+
+async def _build_function_tools(
+    client: str, tool_schemas: list[ToolSchema], workspace_config: WorkspaceConfig | None = None
+) -> list[MagicMock]:
+    return [_tool(tool_schema.name) for tool_schema in tool_schemas]
+
+
+class TestGetTools:
+    """Test cases for the get_tools function."""
+
+    @pytest.fixture(autouse=True)
+    def clear_discovery_report(self) -> Iterator[None]:
+        """Keep the module-level discovery report isolated between tests."""
+        yield
+        discovery_report.clear()
+
+    @pytest.fixture(autouse=True)
+    def fresh_circuit_breakers(self) -> Iterator[None]:
+        """Start every test with closed circuit breakers."""
+        with patch.dict("mcp_pool._circuit_breakers", clear=True):
+            yield
+
+    @pytest.fixture(autouse=True)
+    def no_calculator_tools(self) -> Iterator[None]:
+        """Leave calculator tools out of the discovered tool lists."""
+        with patch("initialize.get_calculator_tools", return_value=[]):
+            yield
+
+    @pytest.fixture
+    def mcp_config(self) -> MCPConfig:
+        """Sample MCP configuration for testing."""
+        return MCPConfig(
+            datawarehouse_url="http://dw:1/sse",
+            rag_url="http://rag:2/sse",
+            geospatial_url="http://geo:3/sse",
+            discovery_timeout_seconds=0.2,
+        )
+
+    @patch("initialize.build_function_tools", side_effect=_build_function_tools)
+    @patch("initialize.fetch_tool_schemas")
+    @patch("initialize.get_mcp_client", side_effect=lambda name, url, mcp_config: url)
+    @pytest.mark.asyncio
+    async def test_get_tools_uses_given_config_and_runs_concurrently(
+        self,
+        mock_client: MagicMock,
+        mock_fetch_tool_schemas: MagicMock,
+        mock_build_function_tools: MagicMock,
+        mcp_config: MCPConfig,
+    ) -> None:
+        """Servers from the given config are discovered concurrently."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fetch_tool_schemas(client: str) -> list[ToolSchema]:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [ToolSchema(name=client, input_schema={})]
+
+        mock_fetch_tool_schemas.side_effect = fetch_tool_schemas
+
+        tools = await get_tools(mcp_config)
+
+        assert [tool.metadata.name for tool in tools] == [
+            "http://dw:1/sse",
+            "http://rag:2/sse",
+            "http://geo:3/sse",
+        ]
+        assert max_in_flight == EXPECTED_SERVER_COUNT
+        assert set(discovery_report) == {"datawarehouse", "rag", "geospatial"}
+        assert all(report.error is None for report in discovery_report.values())
+        assert discovery_report["rag"].tool_names == ["http://rag:2/sse"]
+
+    @patch("initialize.build_function_tools", side_effect=_build_function_tools)
+    @patch("initialize.fetch_tool_schemas")
+    @patch("initialize.get_mcp_client", side_effect=lambda name, url, mcp_config: url)
+    @pytest.mark.asyncio
+    async def test_get_tools_skips_slow_server(
+        self,
+        mock_client: MagicMock,
+        mock_fetch_tool_schemas: MagicMock,
+        mock_build_function_tools: MagicMock,
+        mcp_config: MCPConfig,
+    ) -> None:
+        """A server exceeding its timeout contributes no tools and is reported."""
+
+        async def fetch_tool_schemas(client: str) -> list[ToolSchema]:
+            if client == mcp_config.geospatial_url:
+                await asyncio.sleep(10)
+            return [ToolSchema(name=client, input_schema={})]
+
+        mock_fetch_tool_schemas.side_effect = fetch_tool_schemas
+
+        tools = await get_tools(mcp_config)
+
+        assert len(tools) == EXPECTED_SERVER_COUNT - 1
+        assert discovery_report["geospatial"].error is not None
+        assert discovery_report["geospatial"].tool_count == 0
+        assert discovery_report["rag"].error is None
+
+    @patch("initialize.build_function_tools", side_effect=_build_function_tools)
+    @patch("initialize.fetch_tool_schemas", new_callable=AsyncMock)
+    @patch("initialize.get_mcp_client", side_effect=lambda name, url, mcp_config: url)
+    @pytest.mark.asyncio
+    async def test_get_tools_serves_snapshot_and_revalidates(
+        self,
+        mock_client: MagicMock,
+        mock_fetch_tool_schemas: AsyncMock,
+        mock_build_function_tools: MagicMock,
+        mcp_config: MCPConfig,
+        tmp_path: Path,
+    ) -> None:
+        """Snapshot servers skip tools/list; the others are discovered and saved."""
+        snapshot_path = tmp_path / "tool_snapshot.json"
+        mcp_config.tool_snapshot_path = str(snapshot_path)
+        rag_snapshot = ServerToolSnapshot(
+            url=mcp_config.rag_url, tools=[ToolSchema(name="search_docs", input_schema={})]
+        )
+        save_tool_snapshot(snapshot_path, {"rag": rag_snapshot})
+        mock_fetch_tool_schemas.return_value = [ToolSchema(name="live", input_schema={})]
+
+        with patch("initialize.revalidate_in_background") as mock_revalidate:
+            tools = await get_tools(mcp_config)
+
+        assert [tool.metadata.name for tool in tools] == ["live", "search_docs", "live"]
+        assert mock_fetch_tool_schemas.await_count == EXPECTED_SERVER_COUNT - 1
+        assert discovery_report["rag"].from_snapshot
+        mock_revalidate.assert_called_once_with(snapshot_path, {"rag": rag_snapshot}, mcp_config)
+        snapshot = load_tool_snapshot(snapshot_path)
+        assert snapshot is not None
+        assert set(snapshot.servers) == {"datawarehouse", "rag", "geospatial"}
+
+    @patch("initialize.build_function_tools", side_effect=_build_function_tools)
+    @patch("initialize.fetch_tool_schemas", new_callable=AsyncMock)
+    @patch("initialize.get_mcp_client", side_effect=lambda name, url, mcp_config: url)
+    @pytest.mark.asyncio
+    async def test_get_tools_skips_server_with_open_breaker(
+        self,
+        mock_client: MagicMock,
+        mock_fetch_tool_schemas: AsyncMock,
+        mock_build_function_tools: MagicMock,
+        mcp_config: MCPConfig,
+    ) -> None:
+        """A server whose circuit breaker is open is not contacted and contributes no tools."""
+        mock_fetch_tool_schemas.return_value = [ToolSchema(name="live", input_schema={})]
+        breaker = get_circuit_breaker("rag", mcp_config.rag_url, mcp_config)
+        for _ in range(mcp_config.circuit_failure_threshold):
+            breaker.record_failure()
+
+        tools = await get_tools(mcp_config)
+
+        assert len(tools) == EXPECTED_SERVER_COUNT - 1
+        assert mock_fetch_tool_schemas.await_count == EXPECTED_SERVER_COUNT - 1
+        assert discovery_report["rag"].error is not None
+        assert "unavailable" in discovery_report["rag"].error
@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import litellm
+import pytest
+from llm_client import (
+    PooledHTTPHandler,
+    close_llm_clients,
+    get_http_handler,
+    get_llm_pool_stats,
+    get_shared_llm,
+)
+from openai import AsyncOpenAI
+from schemas import LLMConfig, LLMHTTPConfig
+
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok"
+REQUEST_COUNT = 3
+
+
+@asynccontextmanager
+async def http_server() -> AsyncIterator[str]:
+    """Minimal keep-alive HTTP/1.1 server answering every request with 200."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(RESPONSE)
+            await writer.drain()
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/"
+    server.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_clients() -> Iterator[None]:
+    """Start every test without shared LLM clients or connection pools."""
+    with (
+        patch.dict("llm_client._llms", clear=True),
+        patch.dict("llm_client._http_handlers", clear=True),
+        patch("litellm.aclient_session", None),
+    ):
+        yield
+
+
+class TestPooledHTTPHandler:
+    """Test cases for the PooledHTTPHandler class."""
+
+    @pytest.mark.asyncio
+    async def test_requests_reuse_keep_alive_connection(self) -> None:
+        """Sequential requests share one pooled connection and are counted."""
+        handler = PooledHTTPHandler(LLMHTTPConfig())
+
+        async with http_server() as url:
+            for _ in range(REQUEST_COUNT):
+                response = await handler.get(url)
+                assert response.text == "ok"
+
+        assert handler.stats["requests"] == REQUEST_COUNT
+        assert handler.stats["connections"] == 1
+        assert handler.stats["idle"] == 1
+        await handler.close()
+
+
+class TestSharedLLM:
+    """Test cases for the shared LLM clients."""
+
+    @pytest.mark.asyncio
+    async def test_openai_client_uses_the_pool(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """OpenAI requests get their own client on the pooled connections, not a global one."""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        llm_config = LLMConfig(model="gpt-4o", temperature=0.0, provider="openai")
+        llm = get_shared_llm(llm_config)
+
+        client = llm._get_all_kwargs()["client"]  # noqa: SLF001
+
+        assert isinstance(client, AsyncOpenAI)
+        assert client._client is get_http_handler(llm_config.http).client  # noqa: SLF001
+        assert litellm.aclient_session is None
+        assert len(get_llm_pool_stats()) == 1
+
+        await close_llm_clients()
+
+        assert get_llm_pool_stats() == {}
@@ -0,0 +1,260 @@
+import asyncio
+import sys
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from concurrency import ConcurrencyLimiter
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+from mcp_pool import (
+    MCPSessionPool,
+    PooledMCPClient,
+    close_session_pools,
+    get_mcp_client,
+    get_mcp_server_urls,
+)
+from schemas import MCPConfig, MCPTransportConfig
+
+
+class FakeSessionFactory:
+    """Session factory handing out mock sessions and recording how many were opened."""
+
+    def __init__(self) -> None:
+        self.sessions: list[MagicMock] = []
+        self.open_count = 0
+        self.max_open = 0
+        # Raised by the calls of every session opened from now on
+        self.call_tool_side_effect: Exception | None = None
+
+    def __call__(self) -> AbstractAsyncContextManager[ClientSession]:
+        @asynccontextmanager
+        async def open_session() -> AsyncIterator[ClientSession]:
+            session = MagicMock(spec=ClientSession)
+            session.call_tool = AsyncMock(
+                return_value=f"result-{len(self.sessions)}",
+                side_effect=self.call_tool_side_effect,
+            )
+            session.send_ping = AsyncMock()
+            self.sessions.append(session)
+            self.open_count += 1
+            self.max_open = max(self.max_open, self.open_count)
+            try:
+                yield session
+            finally:
+                self.open_count -= 1
+
+        return open_session()
+
+
+class TestMCPSessionPool:
+    """Test cases for the MCPSessionPool class."""
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_reuse_session(self) -> None:
+        """Sequential calls share one persistent session."""
+        factory = FakeSessionFactory()
+        client = PooledMCPClient(MCPSessionPool("test", factory))
+
+        await client.call_tool("a", {})
+        await client.call_tool("b", {})
+
+        assert len(factory.sessions) == 1
+        assert factory.sessions[0].call_tool.await_count == 2  # noqa: PLR2004
+        await client.pool.close()
+        assert factory.open_count == 0
+
+    @pytest.mark.asyncio
+    async def test_pool_size_is_capped(self) -> None:
+        """No more than max_size sessions are open at once."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory, max_size=2)
+
+        async def slow_call(session: ClientSession) -> None:
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(pool.run(slow_call) for _ in range(6)))
+
+        assert factory.max_open == 2  # noqa: PLR2004
+        assert pool.stats["idle"] == 2  # noqa: PLR2004
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_session_is_replaced(self) -> None:
+        """A connection failure discards the session and retries on a new one."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory)
+        client = PooledMCPClient(pool)
+        await client.call_tool("warm", {})
+        factory.sessions[0].call_tool.side_effect = ConnectionError("reset")
+
+        result = await client.call_tool("a", {})
+
+        assert result == "result-1"
+        assert pool.stats["discarded"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_protocol_error_keeps_session(self) -> None:
+        """An MCP protocol error is raised without discarding the session."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory)
+        client = PooledMCPClient(pool)
+        await client.call_tool("warm", {})
+        factory.sessions[0].call_tool.side_effect = McpError(ErrorData(code=-1, message="bad"))
+
+        with pytest.raises(McpError):
+            await client.call_tool("a", {})
+
+        assert pool.stats["discarded"] == 0
+        assert pool.stats["idle"] == 1
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_request_timeout_discards_session(self) -> None:
+        """A request timed out on a session that is not returned to the pool."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory)
+        await pool.run(lambda session: session.call_tool("warm", {}))
+        timeout = McpError(ErrorData(code=408, message="timed out"))
+        factory.sessions[0].call_tool.side_effect = timeout
+
+        with pytest.raises(McpError):
+            await pool.run(lambda session: session.call_tool("a", {}), retries=0)
+
+        assert pool.stats["discarded"] == 1
+        assert pool.stats["idle"] == 0
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_handshake_closes_session(self) -> None:
+        """A caller cancelled while the session initializes leaves no connection behind."""
+        closed = asyncio.Event()
+
+        @asynccontextmanager
+        async def hanging_session() -> AsyncIterator[ClientSession]:
+            try:
+                await asyncio.Event().wait()
+                yield MagicMock(spec=ClientSession)
+            finally:
+                closed.set()
+
+        pool = MCPSessionPool("test", hanging_session)
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(pool.run(AsyncMock()), timeout=0.01)
+
+        assert closed.is_set()
+        assert pool.stats["opened"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_idle_session_is_replaced(self) -> None:
+        """Idle sessions failing the ping health check are reopened."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory, health_check_interval_seconds=0.0)
+        client = PooledMCPClient(pool)
+        await client.call_tool("warm", {})
+        factory.sessions[0].send_ping.side_effect = ConnectionError("gone")
+
+        await client.call_tool("a", {})
+
+        assert len(factory.sessions) == 2  # noqa: PLR2004
+        factory.sessions[1].call_tool.assert_awaited_once_with("a", {})
+        await pool.close()
+
+
+class TestPooledMCPClient:
+    """Test cases for the PooledMCPClient class."""
+
+    # The warm-up call, then the failing call and its single retry
+    EXPECTED_CALLS_WITH_RETRY = 3
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_before_queueing(self) -> None:
+        """Tool calls to a server with an open breaker fail without taking a call slot."""
+        factory = FakeSessionFactory()
+        breaker = CircuitBreaker("test", failure_threshold=1)
+        breaker.record_failure()
+        limiter = ConcurrencyLimiter("test", 1)
+        client = PooledMCPClient(MCPSessionPool("test", factory), breaker, limiter)
+
+        with pytest.raises(CircuitOpenError):
+            await client.call_tool("a", {})
+
+        assert limiter.stats["completed"] == 0
+        assert factory.sessions == []
+
+    @pytest.mark.asyncio
+    async def test_failures_are_retried_once(self) -> None:
+        """Only the breaker retries a failing call, and never for a side-effecting tool."""
+        factory = FakeSessionFactory()
+        pool = MCPSessionPool("test", factory)
+        breaker = CircuitBreaker("test", retries=1, retry_base_delay_seconds=0.0)
+        client = PooledMCPClient(pool, breaker, side_effect_tools=["build_map"])
+        await client.call_tool("warm", {})
+        factory.sessions[0].call_tool.side_effect = ConnectionError("reset")
+        factory.call_tool_side_effect = ConnectionError("reset")
+
+        calls: list[int] = []
+        for tool_name in ("a", "build_map"):
+            with pytest.raises(ConnectionError):
+                await client.call_tool(tool_name, {})
+            calls.append(
+                sum(len(session.call_tool.await_args_list) for session in factory.sessions)
+            )
+
+        assert calls == [self.EXPECTED_CALLS_WITH_RETRY, self.EXPECTED_CALLS_WITH_RETRY + 1]
+        await pool.close()
+
+
+class TestTransports:
+    """Test cases for the configurable MCP transports."""
+
+    @pytest.fixture
+    def stdio_config(self) -> Iterator[MCPConfig]:
+        """Configuration running every server as the test stdio server, with fresh pools."""
+        transport = MCPTransportConfig(
+            type="stdio",
+            command=sys.executable,
+            args=[str(Path(__file__).parent / "mcp_stdio_server.py")],
+        )
+        with (
+            patch.dict("mcp_pool._session_pools", clear=True),
+            patch.dict("mcp_pool._circuit_breakers", clear=True),
+            patch.dict("mcp_pool._concurrency_limiters", clear=True),
+        ):
+            yield MCPConfig(
+                datawarehouse_url="http://dw:1/sse",
+                rag_url="http://rag:2/mcp",
+                geospatial_url="http://geo:3/sse",
+                transports={"datawarehouse": transport, "rag": transport},
+            )
+
+    def test_server_urls_identify_stdio_commands(self, stdio_config: MCPConfig) -> None:
+        """Stdio servers get a URL built from their command, others keep their URL."""
+        urls = get_mcp_server_urls(stdio_config)
+
+        assert urls["datawarehouse"].startswith("stdio:")
+        assert urls["datawarehouse"].endswith("mcp_stdio_server.py")
+        assert urls["geospatial"] == stdio_config.geospatial_url
+
+    @pytest.mark.asyncio
+    async def test_stdio_transport_lists_and_calls_tools(self, stdio_config: MCPConfig) -> None:
+        """A stdio server is reachable through the pooled client like an SSE server."""
+        url = get_mcp_server_urls(stdio_config)["datawarehouse"]
+        client = get_mcp_client("datawarehouse", url, stdio_config)
+
+        try:
+            tools = await client.list_tools()
+            result = await client.call_tool("echo", {"text": "hi"})
+        finally:
+            await close_session_pools()
+
+        assert [tool.name for tool in tools.tools] == ["echo"]
+        assert not result.isError
+        assert client.pool.transport == "stdio"
+        assert client.pool.call_latency.stats["calls"] == 1
@@ -0,0 +1,124 @@
+import json
+from typing import Any
+
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.tools import ToolOutput
+from mcp import types
+from observation_encoding import ObservationEncoder, get_observation_encoder, tabulate
+from schemas import ObservationConfig
+
+SERIES = {
+    "input_arguments": {"country": "KEN", "indicator": "CME_MRY0T4"},
+    "data": [
+        {"year": 2000 + offset, "value": 100.5 - offset, "unit": "per 1000"} for offset in range(20)
+    ],
+}
+
+
+def untabulate(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, dict):
+        if value.keys() == {"columns", "rows"}:
+            return [
+                dict(zip(value["columns"], map(untabulate, row), strict=True))
+                for row in value["rows"]
+            ]
+        return {key: untabulate(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [untabulate(item) for item in value]
+    return value
+
+
+def make_result(
+    payload: object, tool_name: str = "get_indicator", *, is_error: bool = False
+) -> ToolCallResult:
+    raw_output = types.CallToolResult(
+        content=[types.TextContent(type="text", text=json.dumps(payload, indent=2))],
+        isError=is_error,
+    )
+    return ToolCallResult(
+        tool_name=tool_name,
+        tool_kwargs={},
+        tool_id="tool-1",
+        tool_output=ToolOutput(
+            content=str(raw_output),
+            tool_name=tool_name,
+            raw_input={},
+            raw_output=raw_output,
+            is_error=is_error,
+        ),
+        return_direct=False,
+    )
+
+
+class TestTabulate:
+    """Test cases for the tabulate function."""
+
+    def test_records_become_columns_and_rows(self) -> None:
+        """Lists of records are written as a header and rows and lose no value."""
+        table = tabulate(SERIES)
+
+        assert table["data"]["columns"] == ["year", "value", "unit"]
+        assert table["data"]["rows"][0] == [2000, 100.5, "per 1000"]
+        assert untabulate(table) == SERIES
+
+    def test_mixed_records_are_kept(self) -> None:
+        """Records with differing keys, and single records, are left as they are."""
+        value = {"mixed": [{"a": 1}, {"b": 2}], "single": [{"a": 1}]}
+
+        assert tabulate(value) == value
+
+
+class TestObservationEncoder:
+    """Test cases for the ObservationEncoder class."""
+
+    def test_table_encoding_saves_tokens(self) -> None:
+        """The observation is replaced by compact JSON with fewer tokens."""
+        encoder = ObservationEncoder(ObservationConfig(encoding="table"))
+        result = make_result(SERIES)
+
+        encoded = encoder.encode(result)
+
+        assert untabulate(json.loads(encoded.tool_output.content)) == SERIES
+        assert encoder.stats["encoded"] == 1
+        assert encoder.stats["tokens_saved"] > encoder.stats["tokens_after"]
+        assert result.tool_output.content == str(result.tool_output.raw_output)
+
+    def test_prepended_notes_are_kept(self) -> None:
+        """Text added in front of the tool output, like a journal replay note, survives."""
+        result = make_result(SERIES)
+        replayed = result.tool_output.model_copy(
+            update={"content": "Replayed:\n" + result.tool_output.content}
+        )
+
+        encoded = ObservationEncoder(ObservationConfig(encoding="json")).encode(
+            result.model_copy(update={"tool_output": replayed})
+        )
+
+        assert encoded.tool_output.content.startswith('Replayed:\n{"input_arguments":')
+
+    def test_errors_and_raw_tools_are_untouched(self) -> None:
+        """Failed calls and tools configured as raw keep their output."""
+        encoder = ObservationEncoder(
+            ObservationConfig(encoding="table", tool_encodings={"get_indicator": "raw"})
+        )
+        error = make_result(SERIES, is_error=True)
+
+        assert encoder.encode(error) is error
+        assert encoder.encode(make_result(SERIES)).tool_output.content.startswith("meta=")
+
+    def test_raw_config_has_no_encoder(self) -> None:
+        """No encoder is created when every tool is left raw."""
+        assert get_observation_encoder(ObservationConfig(omitted_fields={})) is None
+
+    def test_map_html_is_omitted(self) -> None:
+        """The build_map HTML is replaced by its size, even with raw encoding."""
+        html = "<html>" + "<div></div>" * 1000 + "</html>"
+        map_output = {"input_arguments": {"layers": ["flood"]}, "html_content": html}
+        result = make_result(map_output, "build_map")
+
+        encoded = ObservationEncoder(ObservationConfig()).encode(result)
+
+        observation = json.loads(encoded.tool_output.content)
+        assert observation["input_arguments"] == {"layers": ["flood"]}
+        assert observation["html_content"].startswith(f"[{len(html)} characters omitted")
+        assert html in result.tool_output.content
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+import pytest
+from calculator import get_calculator_tools, percentage
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.tools import FunctionTool
+from observation_store import ObservationStore, ObservationStoreReActAgent, find_tables
+from schemas import ObservationStoreConfig
+
+from tests.scripted_llm import ScriptedLLM
+
+SERIES = {
+    "country": "KEN",
+    "data": [
+        {"year": 2020, "exposed": 50, "population": 200, "unit": "persons"},
+        {"year": "2021", "exposed": 30, "population": 120, "unit": "persons"},
+        {"year": 2022, "exposed": None, "population": 100, "unit": "persons"},
+    ],
+}
+
+GET_SERIES = """Thought: I need the exposure series.
+Action: get_series
+Action Input: {"country": "KEN"}"""
+
+PERCENTAGE = """Thought: I can compute the share for every year at once.
+Action: percentage
+Action Input: {"part": "t1.exposed", "whole": "t1.population"}"""
+
+ANSWER = """Thought: I can answer without using any more tools.
+Answer: Done."""
+
+
+class TestObservationStore:
+    """Test cases for the ObservationStore class."""
+
+    def test_numeric_columns_are_found(self) -> None:
+        """Numbers, numeric strings and nulls make numeric columns; other fields are left out."""
+        [(path, columns)] = list(find_tables(SERIES, min_rows=2))
+
+        assert path == "data"
+        assert list(columns) == ["year", "exposed", "population"]
+        np.testing.assert_array_equal(columns["year"], [2020, 2021, 2022])
+        assert np.isnan(columns["exposed"][2])
+
+    def test_references_resolve_to_columns(self) -> None:
+        """Stored tables are referenced by handle and column."""
+        store = ObservationStore(ObservationStoreConfig(enabled=True))
+
+        note = store.add(SERIES)
+        resolved = store.resolve({"a": "t1.population", "b": 2})
+
+        assert note.startswith("[Numeric table t1 (data): 3 rows")
+        np.testing.assert_array_equal(resolved["a"].values, [200, 120, 100])
+        assert resolved["b"] == 2  # noqa: PLR2004
+
+    def test_repeated_observations_keep_their_handles(self) -> None:
+        """The same payload is not stored twice."""
+        store = ObservationStore(ObservationStoreConfig(enabled=True))
+
+        assert store.add(SERIES) == store.add(json.loads(json.dumps(SERIES)))
+        assert store.add({"rows": [{"value": 1}, {"value": 2}]}).startswith("[Numeric table t2")
+
+    def test_unknown_references_and_eviction(self) -> None:
+        """Unknown and evicted tables or columns are rejected with what is stored."""
+        store = ObservationStore(ObservationStoreConfig(enabled=True, max_tables=1))
+        store.add(SERIES)
+        store.add({"rows": [{"value": 1}, {"value": 2}]})
+
+        with pytest.raises(ValueError, match="stored tables: t2"):
+            store.column("t1.exposed")
+        with pytest.raises(ValueError, match="no numeric column 'unit'"):
+            store.column("t2.unit")
+
+    def test_evicted_tables_are_stored_again(self) -> None:
+        """An observation whose table was evicted is not described by its stale handle."""
+        store = ObservationStore(ObservationStoreConfig(enabled=True, max_tables=1))
+        store.add(SERIES)
+        store.add({"rows": [{"value": 1}, {"value": 2}]})
+
+        note = store.add(SERIES)
+
+        assert note.startswith("[Numeric table t3 (data)")
+        np.testing.assert_array_equal(store.column("t3.exposed").values[:2], [50, 30])
+
+    def test_calculator_takes_columns(self) -> None:
+        """Calculator tools compute element-wise, missing values as null, and echo references."""
+        store = ObservationStore(ObservationStoreConfig(enabled=True))
+        store.add(SERIES)
+
+        result = percentage(**store.resolve({"part": "t1.exposed", "whole": "t1.population"}))
+
+        assert result["result"] == [25.0, 25.0, None]
+        assert json.loads(json.dumps(result, allow_nan=False))["result"] == [25.0, 25.0, None]
+        assert result["input_arguments"] == {"part": "t1.exposed", "whole": "t1.population"}
+
+
+@pytest.mark.asyncio
+async def test_agent_resolves_references_for_calculator_tools() -> None:
+    """A whole column goes through the calculator in one call, without the LLM copying it."""
+
+    def get_series(country: str) -> str:
+        """Return the exposure series of `country`."""
+        return json.dumps(SERIES)
+
+    llm = ScriptedLLM(responses=[GET_SERIES, PERCENTAGE, ANSWER])
+    calculator_tools = get_calculator_tools()
+    agent = ObservationStoreReActAgent(
+        tools=[FunctionTool.from_defaults(fn=get_series), *calculator_tools],
+        llm=llm,
+        observation_store_config=ObservationStoreConfig(enabled=True),
+        column_tools=[tool.metadata.get_name() for tool in calculator_tools],
+    )
+
+    handler = agent.run("What share of Kenyans was exposed each year?")
+    streamed = [
+        event async for event in handler.stream_events() if isinstance(event, ToolCallResult)
+    ]
+    await handler
+
+    assert streamed[0].tool_output.content == json.dumps(SERIES)
+    assert "[Numeric table t1 (data)" in llm.prompts[1]
+    assert not streamed[1].tool_output.is_error
+    assert streamed[1].tool_output.raw_output["result"][:2] == [25.0, 25.0]
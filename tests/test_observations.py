@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.tools import FunctionTool, ToolOutput
+from observations import (
+    READ_TOOL_NAME,
+    BoundedObservationReActAgent,
+    ObservationSpill,
+    get_observation_spill,
+)
+from schemas import ObservationConfig
+
+from tests.scripted_llm import ScriptedLLM
+
+GET_INDICATOR = """Thought: I need the indicator values.
+Action: get_indicator
+Action Input: {"country": "KEN"}"""
+
+ANSWER = """Thought: I can answer without using any more tools.
+Answer: Done."""
+
+
+def make_result(content: str, tool_name: str = "get_indicator") -> ToolCallResult:
+    return ToolCallResult(
+        tool_name=tool_name,
+        tool_kwargs={},
+        tool_id="tool-1",
+        tool_output=ToolOutput(
+            content=content, tool_name=tool_name, raw_input={}, raw_output=content
+        ),
+        return_direct=False,
+    )
+
+
+@pytest.fixture
+def spill(tmp_path: Path) -> ObservationSpill:
+    return ObservationSpill(
+        ObservationConfig(max_chars=100, head_chars=20, page_chars=50, spill_dir=str(tmp_path))
+    )
+
+
+class TestObservationSpill:
+    """Test cases for the ObservationSpill class."""
+
+    @pytest.mark.asyncio
+    async def test_small_observations_are_kept(self, spill: ObservationSpill) -> None:
+        """Observations within the limit are passed through unchanged."""
+        result = make_result("x" * 100)
+
+        assert await spill.limit(result) is result
+
+    @pytest.mark.asyncio
+    async def test_large_observations_are_spilled(self, spill: ObservationSpill) -> None:
+        """Oversized observations keep their head, a structure summary and a handle."""
+        content = json.dumps({"country": "KEN", "values": list(range(100))})
+
+        limited = await spill.limit(make_result(content))
+
+        text = limited.tool_output.content
+        assert "JSON object with keys: country (str), values (list of 100 items)" in text
+        assert text.endswith(content[:20])
+        assert spill.stats["spilled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_spilled_observations_are_paged(self, spill: ObservationSpill) -> None:
+        """Spilled content is read back page by page."""
+        content = "".join(str(index % 10) for index in range(120))
+        handle = await spill.spill(content)
+
+        pages = [spill.read(handle, page)["content"] for page in (1, 2, 3)]
+
+        assert "".join(pages) == content
+        assert spill.read(handle)["pages"] == 3  # noqa: PLR2004
+        with pytest.raises(ValueError, match="out of range"):
+            spill.read(handle, 4)
+
+    @pytest.mark.asyncio
+    async def test_expired_files_are_purged_every_few_spills(self, tmp_path: Path) -> None:
+        """Expired files are deleted on the first spill and then every spill_purge_every spills."""
+        spill = ObservationSpill(
+            ObservationConfig(
+                max_chars=10, spill_dir=str(tmp_path), spill_ttl_seconds=60, spill_purge_every=2
+            )
+        )
+        expired = time.time() - 120
+
+        def add_expired_file(name: str) -> Path:
+            path = tmp_path / name
+            path.write_text("old")
+            os.utime(path, (expired, expired))
+            return path
+
+        first = add_expired_file("first")
+        await spill.spill("content")
+        second = add_expired_file("second")
+        await spill.spill("content")
+        assert not first.exists()
+        assert second.exists()
+
+        await spill.spill("content")
+        assert not second.exists()
+
+    def test_unknown_handles_are_rejected(self, spill: ObservationSpill) -> None:
+        """Handles that were never issued, or try to escape the directory, are refused."""
+        with pytest.raises(ValueError, match="Unknown"):
+            spill.read("0" * 32)
+        with pytest.raises(ValueError, match="Unknown"):
+            spill.read("../config.yaml")
+
+    @pytest.mark.asyncio
+    async def test_per_tool_limits(self, tmp_path: Path) -> None:
+        """tool_max_chars overrides the default limit for one tool."""
+        spill = ObservationSpill(
+            ObservationConfig(tool_max_chars={"build_map": 10}, spill_dir=str(tmp_path))
+        )
+
+        assert (await spill.limit(make_result("x" * 1000))).tool_output.content == "x" * 1000
+        assert (
+            "handle" in (await spill.limit(make_result("x" * 11, "build_map"))).tool_output.content
+        )
+
+    def test_unlimited_config_has_no_spill(self) -> None:
+        """No spill, and no read tool, is created when observations are unlimited."""
+        assert get_observation_spill(ObservationConfig()) is None
+
+
+@pytest.mark.asyncio
+async def test_agent_sends_only_the_head_to_the_llm(spill: ObservationSpill) -> None:
+    """The LLM sees the shortened observation while the streamed result stays whole."""
+
+    def get_indicator(country: str) -> str:
+        """Return the indicator values for `country`."""
+        return country * 200
+
+    llm = ScriptedLLM(responses=[GET_INDICATOR, ANSWER])
+    agent = BoundedObservationReActAgent(
+        tools=[FunctionTool.from_defaults(fn=get_indicator), *spill.get_tools()],
+        llm=llm,
+        observation_spill=spill,
+    )
+
+    handler = agent.run("What is the indicator for Kenya?")
+    streamed = [
+        event async for event in handler.stream_events() if isinstance(event, ToolCallResult)
+    ]
+    await handler
+
+    assert streamed[0].tool_output.content == "KEN" * 200
+    assert "KEN" * 200 not in llm.prompts[-1]
+    assert READ_TOOL_NAME in llm.prompts[-1]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from llama_index.core.agent.react.output_parser import ReActOutputParser
+from llama_index.core.agent.workflow import ToolCallResult
+from llama_index.core.tools import FunctionTool
+from parallel_agent import ParallelReActAgent, add_parallel_actions_prompt, parse_actions
+
+from tests.scripted_llm import ScriptedLLM
+
+TOOL_SECONDS = 0.1
+
+MAX_PARALLEL_TOOL_CALLS = 2
+
+THREE_ACTIONS = """Thought: I need the exposure of three countries.
+Action: get_exposure
+Action Input: {"country": "KEN"}
+Action: get_exposure
+Action Input: {"country": "UGA"}
+Action: get_exposure
+Action Input: {"country": "TZA"}"""
+
+
+def test_parse_actions_returns_every_action_in_order() -> None:
+    """Every Action/Action Input pair of a step is parsed."""
+    actions = parse_actions(THREE_ACTIONS, ReActOutputParser())
+
+    assert [action.action_input for action in actions] == [
+        {"country": "KEN"},
+        {"country": "UGA"},
+        {"country": "TZA"},
+    ]
+
+
+def test_parallel_actions_prompt_goes_before_the_conversation() -> None:
+    """The instructions are inserted before the current conversation section."""
+    header = "## Tools\n\n## Current Conversation\n"
+
+    assert add_parallel_actions_prompt(header, "## Parallel Actions") == (
+        "## Tools\n\n## Parallel Actions\n\n## Current Conversation\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_actions_of_one_step_run_concurrently() -> None:
+    """Actions run at most max_parallel_tool_calls at a time, observations stay in order."""
+    in_flight = 0
+    peak = 0
+
+    async def get_exposure(country: str) -> str:
+        """Return the number of children exposed to floods in `country`."""
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(TOOL_SECONDS)
+        in_flight -= 1
+        return f"{country}: 100"
+
+    llm = ScriptedLLM(responses=[THREE_ACTIONS, "Thought: Done.\nAnswer: 300"])
+    agent = ParallelReActAgent(
+        tools=[FunctionTool.from_defaults(async_fn=get_exposure)],
+        llm=llm,
+        max_parallel_tool_calls=MAX_PARALLEL_TOOL_CALLS,
+    )
+
+    handler = agent.run("How many children are exposed in Kenya, Uganda and Tanzania?")
+    results = [
+        event async for event in handler.stream_events() if isinstance(event, ToolCallResult)
+    ]
+    await handler
+
+    assert len(results) == 3  # noqa: PLR2004
+    assert peak == MAX_PARALLEL_TOOL_CALLS
+    last_prompt = llm.prompts[-1]
+    assert last_prompt.index("KEN: 100") < last_prompt.index("UGA") < last_prompt.index("TZA: 100")
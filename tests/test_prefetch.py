@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from llama_index.core.tools import FunctionTool
+from mcp import types
+from mcp_pool import LatencyStats, MCPSessionPool, PooledMCPClient
+from prefetch import should_prefetch, start_prefetch
+from schemas import PrefetchConfig, ToolCacheConfig
+from tool_cache import ToolCallCoalescer, ToolResultCache
+
+
+def make_client() -> PooledMCPClient:
+    pool = MagicMock(spec=MCPSessionPool)
+    pool.name = "geospatial"
+    pool.call_latency = LatencyStats()
+    pool.run = AsyncMock(
+        return_value=types.CallToolResult(content=[types.TextContent(type="text", text="{}")])
+    )
+    return PooledMCPClient(
+        pool,
+        cache=ToolResultCache(ToolCacheConfig()),
+        coalescer=ToolCallCoalescer(ToolCacheConfig()),
+    )
+
+
+def make_agent(client: PooledMCPClient) -> MagicMock:
+    async def get_ccri_metadata() -> types.CallToolResult:
+        """Get the CCRI metadata."""
+        return await client.call_tool("get_ccri_metadata", {})
+
+    agent = MagicMock()
+    agent.tools = [FunctionTool.from_defaults(async_fn=get_ccri_metadata)]
+    return agent
+
+
+class TestPrefetch:
+    """Test cases for the metadata prefetch."""
+
+    def test_hazard_questions_are_prefetched(self) -> None:
+        """Questions mentioning a keyword, in any form, trigger the prefetch."""
+        assert should_prefetch(
+            "How many children are exposed to Floods in Kenya?", PrefetchConfig()
+        )
+        assert not should_prefetch("What is 15% of 2,400?", PrefetchConfig())
+        assert not should_prefetch("Which climate reports cover Kenya?", PrefetchConfig())
+
+    @pytest.mark.asyncio
+    async def test_model_call_reuses_the_prefetch(self) -> None:
+        """The model's call joins the in-flight prefetch instead of calling the server."""
+        client = make_client()
+        agent = make_agent(client)
+
+        task = start_prefetch(agent, "Drought risk in Ethiopia", PrefetchConfig())
+        result = await agent.tools[0].acall()
+        assert task is not None
+        await task
+
+        assert client.pool.run.await_count == 1
+        assert not result.is_error
+
+    @pytest.mark.asyncio
+    async def test_failures_are_logged(self) -> None:
+        """A failing prefetch does not raise."""
+        client = make_client()
+        client.pool.run.side_effect = RuntimeError("server down")
+
+        task = start_prefetch(make_agent(client), "Flood maps", PrefetchConfig())
+        assert task is not None
+        await task
+
+    def test_missing_tool_or_disabled(self) -> None:
+        """Nothing starts when the agent lacks the tool or the prefetch is disabled."""
+        agent = MagicMock()
+        agent.tools = []
+
+        assert start_prefetch(agent, "Flood maps", PrefetchConfig()) is None
+        assert start_prefetch(agent, "Flood maps", PrefetchConfig(enabled=False)) is None
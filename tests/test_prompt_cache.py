@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+from llama_index.core.agent.react.formatter import ReActChatFormatter
+from llama_index.core.agent.react.types import ActionReasoningStep, ObservationReasoningStep
+from llama_index.core.base.llms.types import ChatMessage, MessageRole
+from llama_index.core.prompts import PromptTemplate
+from llama_index.core.tools.function_tool import FunctionTool
+from prompt_cache import CachedReActChatFormatter, PromptFileCache, prompt_file_cache
+
+PROMPTS_YAML = """\
+header_prompt: "Tools: {tool_desc}"
+system_prompt: "Be helpful."
+"""
+
+
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+def multiply(a: int, b: int) -> int:
+    """Multiply two numbers."""
+    return a * b
+
+
+class TestPromptFileCache:
+    """Test cases for the PromptFileCache class."""
+
+    def test_reloads_only_when_file_changes(self, tmp_path: Path) -> None:
+        """The file is parsed once, touched files with the same content are not re-parsed."""
+        path = tmp_path / "prompts.yaml"
+        path.write_text(PROMPTS_YAML)
+        cache = PromptFileCache(path)
+
+        with patch("prompt_cache.yaml.safe_load", wraps=yaml.safe_load) as load:
+            first = cache.get()
+            assert cache.get() is first
+            os.utime(path, ns=(0, 0))
+            assert cache.get() is first
+            path.write_text(PROMPTS_YAML.replace("helpful", "concise"))
+            os.utime(path, ns=(1, 1))
+            second = cache.get()
+
+        assert load.call_count == 2  # noqa: PLR2004
+        assert second.system_prompt == "Be concise."
+        assert second.version != first.version
+
+    def test_default_path_does_not_depend_on_working_directory(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """The repository prompts load from any working directory."""
+        monkeypatch.chdir(tmp_path)
+
+        prompts = PromptFileCache().get()
+
+        assert "{tool_desc}" in prompts.header_prompt
+
+
+class TestCachedReActChatFormatter:
+    """Test cases for the CachedReActChatFormatter class."""
+
+    def test_matches_stock_formatter(self) -> None:
+        """Messages are identical to the ones built by the stock ReAct formatter."""
+        prompts = prompt_file_cache.get()
+        header = PromptTemplate(prompts.header_prompt).format()
+        tools = [FunctionTool.from_defaults(add), FunctionTool.from_defaults(multiply)]
+        chat_history = [ChatMessage(role=MessageRole.USER, content="What is 2 + 3?")]
+        reasoning = [
+            ActionReasoningStep(thought="Add", action="add", action_input={"a": 2, "b": 3}),
+            ObservationReasoningStep(observation="5"),
+        ]
+        stock = ReActChatFormatter.from_defaults(context=prompts.system_prompt)
+        cached = CachedReActChatFormatter.from_defaults(context=prompts.system_prompt)
+        stock.system_header = cached.system_header = header
+
+        assert cached.format(tools, chat_history, reasoning) == stock.format(
+            tools, chat_history, reasoning
+        )
+
+    def test_renders_header_once_per_tool_set(self) -> None:
+        """Tool descriptions are expanded once per distinct tool set."""
+        formatter = CachedReActChatFormatter(system_header="Uncached header: {tool_desc}")
+        add_tool = FunctionTool.from_defaults(add)
+        multiply_tool = FunctionTool.from_defaults(multiply)
+
+        with patch(
+            "prompt_cache.get_react_tool_descriptions",
+            side_effect=lambda tools: [tool.metadata.name for tool in tools],
+        ) as describe:
+            formatter.format([add_tool], [])
+            formatter.format([add_tool], [])
+            first_calls = describe.call_count
+            messages = formatter.format([add_tool, multiply_tool], [])
+
+        assert describe.call_count == first_calls + 2  # noqa: PLR2004
+        assert messages[0].content == "Uncached header: add\nmultiply"
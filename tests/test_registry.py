@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types
+from registry import AgentRegistry
+
+
+class TestAgentRegistry:
+    """Test cases for the AgentRegistry class."""
+
+    @patch("registry.create_agent", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_build(self, mock_create_agent: AsyncMock) -> None:
+        """Concurrent first requests build the agent only once."""
+        mock_agent = MagicMock()
+        mock_create_agent.return_value = mock_agent
+        registry = AgentRegistry(refresh_interval_seconds=None)
+
+        agents = await asyncio.gather(*(registry.get_agent() for _ in range(5)))
+
+        assert all(agent is mock_agent for agent in agents)
+        mock_create_agent.assert_awaited_once()
+
+    @patch("registry.create_agent", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_refresh_rebuilds_agent(self, mock_create_agent: AsyncMock) -> None:
+        """Explicit refresh always rebuilds the agent."""
+        first, second = MagicMock(), MagicMock()
+        mock_create_agent.side_effect = [first, second]
+        registry = AgentRegistry(refresh_interval_seconds=None)
+
+        assert await registry.get_agent() is first
+        assert await registry.refresh() is second
+        assert await registry.get_agent() is second
+
+    @patch("registry.create_agent", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_expired_agent_is_refreshed_in_background(
+        self, mock_create_agent: AsyncMock
+    ) -> None:
+        """An expired agent is still served while a background rebuild runs."""
+        first, second = MagicMock(), MagicMock()
+        mock_create_agent.side_effect = [first, second]
+        registry = AgentRegistry(refresh_interval_seconds=0.0)
+
+        assert await registry.get_agent() is first
+        assert await registry.get_agent() is first
+        await asyncio.sleep(0)
+        assert await registry.get_agent() is second
+
+    @patch("registry.create_agent", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_failed_background_refresh_keeps_previous_agent(
+        self, mock_create_agent: AsyncMock
+    ) -> None:
+        """A failing background rebuild keeps serving the previous agent."""
+        first = MagicMock()
+        mock_create_agent.side_effect = [first, RuntimeError("MCP down")]
+        registry = AgentRegistry(refresh_interval_seconds=None)
+
+        await registry.get_agent()
+        registry.invalidate()
+        assert await registry.get_agent() is first
+        await asyncio.sleep(0)
+        assert await registry.get_agent() is first
+
+    @patch("registry.create_agent", new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_tool_list_changed_notification_invalidates(
+        self, mock_create_agent: AsyncMock
+    ) -> None:
+        """A tools/list_changed notification triggers a rebuild."""
+        first, second = MagicMock(), MagicMock()
+        mock_create_agent.side_effect = [first, second]
+        registry = AgentRegistry(refresh_interval_seconds=None)
+        await registry.get_agent()
+
+        await registry.handle_mcp_message(
+            types.ServerNotification(
+                types.ToolListChangedNotification(method="notifications/tools/list_changed")
+            )
+        )
+        await registry.get_agent()
+        await asyncio.sleep(0)
+
+        assert await registry.get_agent() is second
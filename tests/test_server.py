@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi import status
 from fastapi.testclient import TestClient
+from schemas import DependencyStatus, Readiness
 from server import User, app, get_current_user
 
 # Override authentication dependency for tests
@@ -38,6 +39,26 @@ class TestServer:
         assert "message" in response.json()
         assert isinstance(response.json()["message"], str)
 
+    def test_ready_endpoint_reports_not_ready_until_warm(self) -> None:
+        """Ready endpoint returns 503 with the cached report until warm-up succeeds."""
+        report = Readiness(dependencies={"agent": DependencyStatus(error="building")})
+
+        with patch("warmup.readiness", report):
+            response = self.client.get("/ready")
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["dependencies"]["agent"]["error"] == "building"
+
+    def test_ready_endpoint_reports_ready(self) -> None:
+        """Ready endpoint returns 200 once warm-up succeeded."""
+        report = Readiness(ready=True, warmup_finished=True, warmup_duration_seconds=1.5)
+
+        with patch("warmup.readiness", report):
+            response = self.client.get("/ready")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["warmup_duration_seconds"] == report.warmup_duration_seconds
+
     @patch("handlers.handle_response")
     @patch("server.uuid.uuid4")
     def test_ask_endpoint_happy_path(
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types
+from mcp_pool import LatencyStats, MCPSessionPool, PooledMCPClient
+from schemas import ToolCacheConfig
+from tool_cache import ToolCallCoalescer, ToolResultCache, tool_call_key
+
+
+def make_result(text: str, *, is_error: bool = False) -> types.CallToolResult:
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=text)], isError=is_error
+    )
+
+
+class TestToolCallKey:
+    """Test cases for tool call cache keys."""
+
+    def test_equivalent_arguments_share_a_key(self) -> None:
+        """Key order, None values and surrounding whitespace do not change the key."""
+        first = tool_call_key("datawarehouse", "get_indicator", {"country": " KEN ", "year": 2020})
+        second = tool_call_key(
+            "datawarehouse", "get_indicator", {"year": 2020, "country": "KEN", "sex": None}
+        )
+
+        assert first == second
+
+    def test_server_and_tool_are_part_of_the_key(self) -> None:
+        """The same arguments on another tool or server produce another key."""
+        key = tool_call_key("datawarehouse", "get_indicator", {"country": "KEN"})
+
+        assert key != tool_call_key("datawarehouse", "get_metadata", {"country": "KEN"})
+        assert key != tool_call_key("rag", "get_indicator", {"country": "KEN"})
+        assert key != tool_call_key("datawarehouse", "get_indicator", {"country": "KEN"}, "v2")
+
+
+class TestToolResultCache:
+    """Test cases for the ToolResultCache class."""
+
+    def test_hit_after_set(self) -> None:
+        """A cached result is returned and counted as a hit."""
+        cache = ToolResultCache(ToolCacheConfig())
+        result = make_result("metadata")
+
+        assert cache.get("key") is None
+        cache.set("key", "get_ccri_metadata", result)
+
+        assert cache.get("key") is result
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_uncacheable_and_error_results_are_not_stored(self) -> None:
+        """Side-effecting tools and error results are never cached."""
+        cache = ToolResultCache(ToolCacheConfig())
+
+        cache.set("map", "build_map", make_result("<html>"))
+        cache.set("error", "get_ccri_metadata", make_result("boom", is_error=True))
+
+        assert not cache.is_cacheable("create_temp_dir")
+        assert cache.stats["entries"] == 0
+
+    def test_only_listed_tools_are_cached_by_default(self) -> None:
+        """Tools without their own TTL are not cached unless a default TTL is set."""
+        assert ToolResultCache(ToolCacheConfig()).is_cacheable("get_data_for_dataflow")
+        assert not ToolResultCache(ToolCacheConfig()).is_cacheable("unknown_tool")
+        assert ToolResultCache(ToolCacheConfig(default_ttl_seconds=60)).is_cacheable("unknown_tool")
+
+    def test_entries_expire_after_ttl(self) -> None:
+        """Entries older than their tool's TTL are dropped."""
+        cache = ToolResultCache(ToolCacheConfig(ttl_seconds={"get_ccri_metadata": 10}))
+        cache.set("key", "get_ccri_metadata", make_result("metadata"))
+
+        with patch("tool_cache.time.monotonic", return_value=time.monotonic() + 11):
+            assert cache.get("key") is None
+        assert cache.stats["entries"] == 0
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        """Going over max_bytes evicts the least recently used entries first."""
+        entry_size = len(make_result("a").model_dump_json())
+        cache = ToolResultCache(
+            ToolCacheConfig(max_bytes=entry_size * 2, ttl_seconds={"get_indicator": 60})
+        )
+        cache.set("a", "get_indicator", make_result("a"))
+        cache.set("b", "get_indicator", make_result("b"))
+        cache.get("a")
+
+        cache.set("c", "get_indicator", make_result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats["evictions"] == 1
+        assert cache.stats["size_bytes"] <= cache.stats["max_bytes"]
+
+
+class TestCachedClient:
+    """Test cases for PooledMCPClient with a tool result cache."""
+
+    @pytest.fixture
+    def pool(self) -> MagicMock:
+        pool = MagicMock(spec=MCPSessionPool)
+        pool.name = "geospatial"
+        pool.call_latency = LatencyStats()
+        pool.run = AsyncMock(return_value=make_result("metadata"))
+        return pool
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_skip_the_server(self, pool: MagicMock) -> None:
+        """Identical calls to a cacheable tool only reach the server once."""
+        client = PooledMCPClient(pool, cache=ToolResultCache(ToolCacheConfig()))
+
+        first = await client.call_tool("get_ccri_metadata", {})
+        second = await client.call_tool("get_ccri_metadata", {"unused": None})
+
+        assert first is second
+        assert pool.run.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_tools_always_reach_the_server(self, pool: MagicMock) -> None:
+        """Side-effecting tools are called every time."""
+        client = PooledMCPClient(pool, cache=ToolResultCache(ToolCacheConfig()))
+
+        await client.call_tool("create_temp_dir", {})
+        await client.call_tool("create_temp_dir", {})
+
+        assert pool.run.await_count == 2  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_reach_the_server_once(self, pool: MagicMock) -> None:
+        """Identical calls made while one is in flight are coalesced."""
+        client = PooledMCPClient(
+            pool, coalescer=ToolCallCoalescer(ToolCacheConfig(ttl_seconds={"get_exposure": 60}))
+        )
+
+        await asyncio.gather(
+            *(client.call_tool("get_exposure", {"country": "KEN"}) for _ in range(3))
+        )
+
+        assert pool.run.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_unlisted_tools_are_not_coalesced(self, pool: MagicMock) -> None:
+        """A tool without a TTL may have side effects, so every caller gets its own request."""
+        client = PooledMCPClient(pool, coalescer=ToolCallCoalescer(ToolCacheConfig()))
+
+        await asyncio.gather(*(client.call_tool("send_report", {"to": "KEN"}) for _ in range(3)))
+
+        assert pool.run.await_count == 3  # noqa: PLR2004
+
+
+class TestToolCallCoalescer:
+    """Test cases for the ToolCallCoalescer class."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_share_one_request(self) -> None:
+        """Calls arriving while an identical one is in flight await its result."""
+        coalescer = ToolCallCoalescer(ToolCacheConfig())
+        release = asyncio.Event()
+        request_count = 0
+
+        async def request() -> types.CallToolResult:
+            nonlocal request_count
+            request_count += 1
+            await release.wait()
+            return make_result("exposure")
+
+        waiters = [asyncio.create_task(coalescer.run("key", request)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert request_count == 1
+        assert results[0] is results[1] is results[2]
+        assert coalescer.stats == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_request(self) -> None:
+        """The shared request keeps running for the other callers."""
+        coalescer = ToolCallCoalescer(ToolCacheConfig())
+        release = asyncio.Event()
+
+        async def request() -> types.CallToolResult:
+            await release.wait()
+            return make_result("exposure")
+
+        leader = asyncio.create_task(coalescer.run("key", request))
+        follower = asyncio.create_task(coalescer.run("key", request))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        assert await follower == make_result("exposure")
+
+    def test_side_effecting_tools_are_not_coalesced(self) -> None:
+        """Each create_temp_dir call must create its own directory."""
+        coalescer = ToolCallCoalescer(ToolCacheConfig())
+
+        assert not coalescer.is_coalescable("create_temp_dir")
+        assert coalescer.is_coalescable("get_ccri_metadata")
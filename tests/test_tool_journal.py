@@ -0,0 +1,83 @@
+import pytest
+from llama_index.core.tools import FunctionTool, ToolOutput
+from tool_journal import JournaledReActAgent, ToolCallJournal
+
+from tests.scripted_llm import ScriptedLLM
+
+CHECK_AVAILABILITY = """Thought: I need to check the data availability.
+Action: check_availability
+Action Input: {"country": "KEN"}"""
+
+
+def make_output(content: str, *, is_error: bool = False) -> ToolOutput:
+    return ToolOutput(
+        content=content,
+        tool_name="check_availability",
+        raw_input={},
+        raw_output=None,
+        is_error=is_error,
+    )
+
+
+class TestToolCallJournal:
+    """Test cases for the ToolCallJournal class."""
+
+    def test_repeated_calls_are_replayed(self) -> None:
+        """An identical call returns the recorded observation."""
+        journal = ToolCallJournal()
+        journal.register("check_availability", {"country": "KEN"})
+        journal.record("check_availability", {"country": "KEN"}, make_output("available"), 0.5)
+
+        journal.register("check_availability", {"country": " KEN "})
+        replayed = journal.replay("check_availability", {"country": " KEN "})
+
+        assert replayed is not None
+        assert replayed.content.endswith("available")
+        assert journal.stats["repeated_calls"] == 1
+        assert journal.stats["replayed_calls"] == 1
+
+    def test_failed_and_side_effecting_calls_are_not_replayed(self) -> None:
+        """Errors may be transient and side-effecting tools must run again."""
+        journal = ToolCallJournal(unreplayable_tools=["create_temp_dir"])
+        journal.record("check_availability", {}, make_output("boom", is_error=True), 0.1)
+        journal.record("create_temp_dir", {}, make_output("maps/run-1"), 0.1)
+
+        assert journal.replay("check_availability", {}) is None
+        assert journal.replay("create_temp_dir", {}) is None
+
+    def test_loop_is_flagged_after_max_repeats(self) -> None:
+        """More than max_repeats identical calls flag the run as looping."""
+        journal = ToolCallJournal(max_repeats=2)
+
+        for _ in range(3):
+            journal.register("check_availability", {"country": "KEN"})
+        assert not journal.loop_detected
+
+        journal.register("check_availability", {"country": "KEN"})
+        assert journal.loop_tool == "check_availability"
+        assert journal.stats["loop_detected"]
+
+
+@pytest.mark.asyncio
+async def test_agent_replays_repeats_and_stops_loops() -> None:
+    """Repeated calls skip the tool and a looping run ends with an explanation."""
+    tool_calls: list[str] = []
+
+    def check_availability(country: str) -> str:
+        """Check whether flood data is available for `country`."""
+        tool_calls.append(country)
+        return "available"
+
+    llm = ScriptedLLM(responses=[CHECK_AVAILABILITY] * 4)
+    agent = JournaledReActAgent(
+        tools=[FunctionTool.from_defaults(fn=check_availability)],
+        llm=llm,
+        max_repeated_tool_calls=1,
+    )
+
+    handler = agent.run("Is flood data available for Kenya?")
+    response = await handler
+
+    assert tool_calls == ["KEN"]
+    assert "check_availability" in str(response.response.content)
+    assert agent.get_journal(handler.ctx).stats["loop_detected"]
@@ -0,0 +1,96 @@
+import pytest
+from calculator import get_calculator_tools
+from llama_index.core.tools import BaseTool, FunctionTool
+from schemas import ToolRetrievalConfig
+from tool_retrieval import BM25Index, ToolRetriever, tokenize
+
+
+def make_tool(name: str, description: str) -> FunctionTool:
+    def fn(country: str) -> str:
+        return country
+
+    return FunctionTool.from_defaults(fn=fn, name=name, description=description)
+
+
+def make_tools() -> list[BaseTool]:
+    return [
+        make_tool("get_ccri_metadata", "List the CCRI hazard and exposure layers."),
+        make_tool("get_indicator", "Get time series values of a datawarehouse indicator."),
+        make_tool("search_documents", "Search UNICEF reports and documentation."),
+        make_tool("build_map", "Build a map of hazard layers for a country."),
+        *get_calculator_tools(),
+    ]
+
+
+def names(tools: list[BaseTool]) -> list[str]:
+    return [tool.metadata.get_name() for tool in tools]
+
+
+class TestBM25:
+    """Test cases for the tokenizer and the BM25 index."""
+
+    def test_tokenize_splits_identifiers(self) -> None:
+        """snake_case, camelCase and plurals are normalized and stopwords dropped."""
+        assert tokenize("get_ccri_metadata of the buildMap Countries") == [
+            "get",
+            "ccri",
+            "metadata",
+            "build",
+            "map",
+            "country",
+        ]
+
+    def test_rare_terms_rank_higher(self) -> None:
+        """A document matching a rare query term outranks one matching a common term."""
+        index = BM25Index([["map", "hazard"], ["hazard", "data"], ["hazard", "report"]])
+
+        scores = index.scores(["map", "hazard"])
+
+        assert scores[0] > scores[1] == scores[2] > 0
+
+
+class TestToolRetriever:
+    """Test cases for the ToolRetriever class."""
+
+    def test_arithmetic_question_gets_calculator_tools(self) -> None:
+        """Only the matching tools and the always-included ones are offered, in order."""
+        retriever = ToolRetriever(make_tools(), ToolRetrievalConfig(top_k=2))
+
+        tools = retriever.select("What percentage of 250 is 40? Divide and compute it.")
+
+        assert names(tools) == ["get_ccri_metadata", "divide", "percentage"]
+
+    def test_unmatched_question_gets_every_tool(self) -> None:
+        """A question sharing no term with any tool is offered every tool."""
+        retriever = ToolRetriever(make_tools(), ToolRetrievalConfig(top_k=2))
+
+        assert len(retriever.select("Hello!")) == len(make_tools())
+
+    def test_tool_names_are_looked_up(self) -> None:
+        """The workflow looks tools up by name, even ones outside the top k."""
+        retriever = ToolRetriever(make_tools(), ToolRetrievalConfig(top_k=1))
+
+        assert names(retriever.retrieve("build_map")) == ["build_map"]
+
+    @pytest.mark.asyncio
+    async def test_extra_always_included_tools(self) -> None:
+        """Tools passed to always_include are offered on top of the configured ones."""
+        retriever = ToolRetriever(
+            make_tools(), ToolRetrievalConfig(top_k=1), always_include=["search_documents"]
+        )
+
+        tools = await retriever.aretrieve("Show a flood hazard map for Kenya")
+
+        assert names(tools) == ["get_ccri_metadata", "search_documents", "build_map"]
+
+    def test_chained_tools_are_offered_together(self) -> None:
+        """A selected tool brings the rest of its chain, even beyond the top k."""
+        retriever = ToolRetriever(
+            make_tools(),
+            ToolRetrievalConfig(top_k=1),
+            chains=[["search_documents", "build_map"], ["add", "subtract"]],
+        )
+
+        tools = retriever.select("Show a flood hazard map for Kenya")
+
+        assert names(tools) == ["get_ccri_metadata", "search_documents", "build_map"]
@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types
+from schemas import MCPConfig, ServerToolSnapshot, ToolSchema
+from tool_snapshot import (
+    SNAPSHOT_VERSION,
+    _revalidate,  # type: ignore[attr-defined]
+    build_function_tools,
+    load_tool_snapshot,
+    save_tool_snapshot,
+    tool_schema_hash,
+)
+
+SEARCH_SCHEMA = ToolSchema(
+    name="search",
+    description="Search the documentation",
+    input_schema={
+        "type": "object",
+        "properties": {"query": {"type": "string", "description": "Search query"}},
+        "required": ["query"],
+    },
+)
+
+
+class TestToolSnapshot:
+    """Test cases for the tool_snapshot module."""
+
+    def test_save_and_load_round_trip(self, tmp_path: Path) -> None:
+        """Saved snapshots load back and merge with existing servers."""
+        path = tmp_path / "snapshot.json"
+        save_tool_snapshot(path, {"rag": ServerToolSnapshot(url="u1", tools=[SEARCH_SCHEMA])})
+        save_tool_snapshot(path, {"datawarehouse": ServerToolSnapshot(url="u2", tools=[])})
+
+        snapshot = load_tool_snapshot(path)
+
+        assert snapshot is not None
+        assert snapshot.version == SNAPSHOT_VERSION
+        assert snapshot.servers["rag"].tools == [SEARCH_SCHEMA]
+        assert snapshot.servers["datawarehouse"].url == "u2"
+
+    def test_load_ignores_other_versions(self, tmp_path: Path) -> None:
+        """Snapshots written with another layout version are ignored."""
+        path = tmp_path / "snapshot.json"
+        path.write_text(
+            json.dumps({"version": SNAPSHOT_VERSION + 1, "created_at": "", "servers": {}})
+        )
+
+        assert load_tool_snapshot(path) is None
+        assert load_tool_snapshot(tmp_path / "missing.json") is None
+
+    @pytest.mark.asyncio
+    async def test_build_function_tools_binds_lazily(self) -> None:
+        """Tools are built from schemas and only call the client when invoked."""
+        client = MagicMock()
+        client.call_tool = AsyncMock(return_value="ok")
+
+        tools = await build_function_tools(client, [SEARCH_SCHEMA])
+
+        assert [tool.metadata.name for tool in tools] == ["search"]
+        assert "query" in tools[0].metadata.get_parameters_dict()["properties"]
+        client.call_tool.assert_not_called()
+        await tools[0].acall(query="ccri")
+        client.call_tool.assert_awaited_once_with("search", {"query": "ccri"})
+        assert client.tool_schema_hashes == {"search": tool_schema_hash(SEARCH_SCHEMA)}
+        changed = SEARCH_SCHEMA.model_copy(update={"description": "Search the docs"})
+        assert tool_schema_hash(changed) != tool_schema_hash(SEARCH_SCHEMA)
+
+    @patch("tool_snapshot.get_mcp_client")
+    @pytest.mark.asyncio
+    async def test_revalidate_updates_changed_servers(
+        self, mock_get_mcp_client: MagicMock, tmp_path: Path
+    ) -> None:
+        """Revalidation rewrites changed servers and notifies the change handlers."""
+        path = tmp_path / "snapshot.json"
+        cached = {"rag": ServerToolSnapshot(url="u1", tools=[SEARCH_SCHEMA])}
+        save_tool_snapshot(path, cached)
+        client = MagicMock()
+        client.list_tools = AsyncMock(
+            return_value=types.ListToolsResult(
+                tools=[types.Tool(name="search_v2", description=None, inputSchema={})]
+            )
+        )
+        mock_get_mcp_client.return_value = client
+        handler = MagicMock()
+
+        with patch("tool_snapshot.change_handlers", [handler]):
+            await _revalidate(
+                path, cached, MCPConfig(datawarehouse_url="", rag_url="u1", geospatial_url="")
+            )
+
+        snapshot = load_tool_snapshot(path)
+        assert snapshot is not None
+        assert [tool.name for tool in snapshot.servers["rag"].tools] == ["search_v2"]
+        handler.assert_called_once()
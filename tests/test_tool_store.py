@@ -0,0 +1,173 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types
+from mcp_pool import LatencyStats, MCPSessionPool, PooledMCPClient
+from schemas import ToolCacheConfig
+from tool_cache import ToolResultCache
+from tool_store import ToolResultStore, get_tool_store
+
+WRITER_COUNT = 8
+
+
+def make_result(text: str) -> types.CallToolResult:
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+@pytest.fixture
+def store_path(tmp_path: Path) -> Path:
+    return tmp_path / "tool_results.sqlite3"
+
+
+class TestToolResultStore:
+    """Test cases for the ToolResultStore class."""
+
+    def test_results_survive_a_new_store(self, store_path: Path) -> None:
+        """A result written by one store is read back by another on the same file."""
+        ToolResultStore(store_path, ToolCacheConfig()).set(
+            "key", "get_ccri_metadata", make_result("metadata"), ttl=60
+        )
+
+        stored = ToolResultStore(store_path, ToolCacheConfig()).get("key")
+
+        assert stored is not None
+        result, remaining_ttl = stored
+        assert result == make_result("metadata")
+        assert 0 < remaining_ttl <= 60  # noqa: PLR2004
+
+    def test_payloads_are_compressed(self, store_path: Path) -> None:
+        """Stored payloads are smaller than the serialized result."""
+        result = make_result("indicator " * 1000)
+        ToolResultStore(store_path, ToolCacheConfig()).set("key", "get_indicator", result, ttl=60)
+
+        with sqlite3.connect(store_path) as connection:
+            (payload,) = connection.execute("SELECT payload FROM tool_results_v1").fetchone()
+
+        assert len(payload) < len(result.model_dump_json())
+
+    def test_expired_results_are_misses_and_purged(self, store_path: Path) -> None:
+        """Results past their TTL are not returned and are removed by purge_expired."""
+        store = ToolResultStore(store_path, ToolCacheConfig())
+        store.set("key", "get_indicator", make_result("value"), ttl=10)
+
+        with patch("tool_store.time.time", return_value=time.time() + 11):
+            assert store.get("key") is None
+            assert store.purge_expired() == 1
+        assert store.stats["misses"] == 1
+
+    def test_concurrent_writers_share_the_file(self, store_path: Path) -> None:
+        """Several stores writing to one file at once, as workers do, lose no results."""
+        stores = [ToolResultStore(store_path, ToolCacheConfig()) for _ in range(WRITER_COUNT)]
+
+        def write(index: int) -> None:
+            stores[index].set(f"key-{index}", "get_indicator", make_result(str(index)), ttl=60)
+
+        with ThreadPoolExecutor(WRITER_COUNT) as executor:
+            list(executor.map(write, range(WRITER_COUNT)))
+
+        reader = ToolResultStore(store_path, ToolCacheConfig())
+        assert all(reader.get(f"key-{index}") is not None for index in range(WRITER_COUNT))
+        assert sum(store.stats["errors"] for store in stores) == 0
+
+    def test_connection_is_reused(self, store_path: Path) -> None:
+        """Calls from one thread share a connection instead of reconnecting every time."""
+        store = ToolResultStore(store_path, ToolCacheConfig())
+
+        with patch("tool_store.sqlite3.connect", wraps=sqlite3.connect) as connect:
+            store.set("key", "get_indicator", make_result("value"), ttl=60)
+            store.get("key")
+            store.get("other")
+
+        assert connect.call_count == 1
+
+    def test_unreadable_file_is_a_miss(self, tmp_path: Path) -> None:
+        """A corrupt database file is logged and treated as a miss."""
+        path = tmp_path / "corrupt.sqlite3"
+        path.write_bytes(b"not a database" * 100)
+        store = ToolResultStore(path, ToolCacheConfig())
+
+        assert store.get("key") is None
+        assert store.stats["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_store_purges_off_the_event_loop(self, store_path: Path) -> None:
+        """Opening the shared store purges expired results in a worker thread."""
+        purge_threads: list[int] = []
+
+        def purge_expired(store: ToolResultStore) -> int:
+            purge_threads.append(threading.get_ident())
+            return 0
+
+        with (
+            patch.dict("tool_store._tool_stores", clear=True),
+            patch.object(ToolResultStore, "purge_expired", purge_expired),
+        ):
+            get_tool_store(ToolCacheConfig(store_path=str(store_path)))
+            assert purge_threads == []
+            for _ in range(100):
+                if purge_threads:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert purge_threads
+        assert purge_threads[0] != threading.get_ident()
+
+
+class TestStoredClient:
+    """Test cases for PooledMCPClient with a persistent store."""
+
+    @pytest.mark.asyncio
+    async def test_stored_results_skip_the_server(self, store_path: Path) -> None:
+        """A restarted process answers from the store without calling the server."""
+        ToolResultStore(store_path, ToolCacheConfig()).set(
+            "geospatial:get_ccri_metadata:{}", "get_ccri_metadata", make_result("meta"), ttl=60
+        )
+        pool = MagicMock(spec=MCPSessionPool)
+        pool.name = "geospatial"
+        pool.call_latency = LatencyStats()
+        pool.run = AsyncMock(return_value=make_result("live"))
+        cache_config = ToolCacheConfig(ttl_seconds={"get_ccri_metadata": 60, "get_indicator": 60})
+        client = PooledMCPClient(
+            pool,
+            cache=ToolResultCache(cache_config),
+            store=ToolResultStore(store_path, cache_config),
+        )
+
+        result = await client.call_tool("get_ccri_metadata", {})
+        await client.call_tool("get_indicator", {"country": "KEN"})
+        await client.call_tool("get_indicator", {"country": "KEN"})
+
+        assert result == make_result("meta")
+        assert pool.run.await_count == 1
+        assert client.store is not None
+        assert client.store.stats["writes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_results_of_another_schema_are_not_served(self, store_path: Path) -> None:
+        """A tool whose schema changed since its result was stored is called again."""
+        cache_config = ToolCacheConfig()
+        pool = MagicMock(spec=MCPSessionPool)
+        pool.name = "geospatial"
+        pool.call_latency = LatencyStats()
+        pool.run = AsyncMock(return_value=make_result("live"))
+        clients = [
+            PooledMCPClient(
+                pool,
+                cache=ToolResultCache(cache_config),
+                store=ToolResultStore(store_path, cache_config),
+            )
+            for _ in range(2)
+        ]
+        clients[0].tool_schema_hashes = {"get_ccri_metadata": "old"}
+        clients[1].tool_schema_hashes = {"get_ccri_metadata": "new"}
+
+        for client in clients:
+            await client.call_tool("get_ccri_metadata", {})
+
+        assert pool.run.await_count == 2  # noqa: PLR2004
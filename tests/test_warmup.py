@@ -0,0 +1,124 @@
+from collections.abc import Iterator
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from schemas import Config, LLMConfig, MCPConfig, Prompts, Readiness, ServerConfig
+from warmup import _warm_up_until_ready, check_readiness, warm_up
+
+SERVER_COUNT = 3
+
+
+@pytest.fixture
+def sample_config() -> Config:
+    """Sample configuration for testing."""
+    return Config(
+        server=ServerConfig(host="localhost", port=8000),
+        mcp=MCPConfig(
+            datawarehouse_url="http://localhost:3001",
+            rag_url="http://localhost:3002",
+            geospatial_url="http://localhost:3003",
+        ),
+        llm=LLMConfig(model="gpt-4o-mini", temperature=0.0, provider="openai"),
+    )
+
+
+@pytest.fixture
+def dependencies() -> Iterator[SimpleNamespace]:
+    """Patch every warmed dependency with a healthy mock and reset the readiness report."""
+    pool = MagicMock()
+    pool.run = AsyncMock()
+    pool.stats = {"idle": 1}
+    registry = MagicMock()
+    registry.get_agent = AsyncMock(return_value=MagicMock(tools=[MagicMock(), MagicMock()]))
+    registry.built_at = 0.0
+    with (
+        patch("warmup.readiness", Readiness()) as readiness,
+        patch("warmup.get_prompts", return_value=Prompts(header_prompt="", system_prompt="")),
+        patch("warmup.prime_llm_connection", new_callable=AsyncMock, return_value={}) as llm,
+        patch("warmup.get_session_pool", return_value=pool),
+        patch("warmup.agent_registry", registry),
+    ):
+        yield SimpleNamespace(readiness=readiness, llm=llm, pool=pool, registry=registry)
+
+
+class TestWarmUp:
+    """Test cases for the warm_up function."""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_connects_every_dependency(
+        self, dependencies: SimpleNamespace, sample_config: Config
+    ) -> None:
+        """All dependencies are warmed, timed and the server becomes ready."""
+        readiness = await warm_up(sample_config)
+
+        assert readiness is dependencies.readiness
+        assert readiness.ready
+        assert readiness.warmup_finished
+        assert set(readiness.dependencies) == {
+            "prompts",
+            "llm",
+            "mcp:datawarehouse",
+            "mcp:rag",
+            "mcp:geospatial",
+            "agent",
+        }
+        assert all(
+            status.duration_seconds is not None for status in readiness.dependencies.values()
+        )
+        assert readiness.dependencies["agent"].detail["tool_count"] == 2  # noqa: PLR2004
+        assert dependencies.pool.run.await_count == SERVER_COUNT
+        dependencies.llm.assert_awaited_once_with(sample_config.llm)
+
+    @pytest.mark.asyncio
+    async def test_optional_dependency_failure_is_reported(
+        self, dependencies: SimpleNamespace, sample_config: Config
+    ) -> None:
+        """An unreachable LLM provider is reported without blocking readiness."""
+        dependencies.llm.side_effect = ConnectionError("unreachable")
+
+        readiness = await warm_up(sample_config)
+
+        assert readiness.ready
+        assert not readiness.dependencies["llm"].ready
+        assert readiness.dependencies["llm"].error == "unreachable"
+
+    @pytest.mark.asyncio
+    async def test_agent_failure_is_not_ready(
+        self, dependencies: SimpleNamespace, sample_config: Config
+    ) -> None:
+        """The server is not ready if the agent cannot be built."""
+        dependencies.registry.get_agent.side_effect = RuntimeError("no tools")
+
+        readiness = await warm_up(sample_config)
+
+        assert readiness.warmup_finished
+        assert not readiness.ready
+        assert readiness.dependencies["agent"].error == "no tools"
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_is_retried(
+        self, dependencies: SimpleNamespace, sample_config: Config
+    ) -> None:
+        """Warm-up is retried until the agent can be built."""
+        agent = MagicMock(tools=[MagicMock()])
+        dependencies.registry.get_agent.side_effect = [RuntimeError("no tools"), agent]
+
+        with patch("warmup.WARMUP_RETRY_SECONDS", 0.0), patch("warmup.config", sample_config):
+            await _warm_up_until_ready()
+
+        assert dependencies.readiness.ready
+        assert dependencies.registry.get_agent.await_count == 2  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_readiness_follows_the_registry(
+        self, dependencies: SimpleNamespace, sample_config: Config
+    ) -> None:
+        """An agent built by a request after a failed warm-up makes the server ready."""
+        dependencies.registry.get_agent.side_effect = RuntimeError("no tools")
+        await warm_up(sample_config)
+        assert not check_readiness().ready
+
+        dependencies.registry.built_at = 1.0
+
+        assert check_readiness().ready
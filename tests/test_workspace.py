@@ -0,0 +1,147 @@
+import asyncio
+import json
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from mcp import types
+from mcp_pool import PooledMCPClient
+from schemas import MCPConfig, ToolSchema, WorkspaceConfig
+from tool_snapshot import build_function_tools
+from workspace import (
+    TempWorkspace,
+    hide_workspace_tools,
+    parse_workspace_id,
+    run_in_workspace,
+    temp_workspace,
+)
+
+TOOL_SCHEMAS = [
+    ToolSchema(name="create_temp_dir", input_schema={"type": "object", "properties": {}}),
+    ToolSchema(
+        name="delete_temp_dir",
+        input_schema={"type": "object", "properties": {"temp_dir": {"type": "string"}}},
+    ),
+    ToolSchema(
+        name="build_map",
+        description="Build a map.",
+        input_schema={
+            "type": "object",
+            "properties": {"temp_dir": {"type": "string"}, "layers": {"type": "array"}},
+            "required": ["temp_dir", "layers"],
+        },
+    ),
+    ToolSchema(
+        name="get_ccri_metadata",
+        description="Get CCRI metadata.",
+        input_schema={"type": "object", "properties": {}},
+    ),
+]
+
+
+def make_result(text: str, *, is_error: bool = False) -> types.CallToolResult:
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=text)], isError=is_error
+    )
+
+
+def make_client() -> MagicMock:
+    client = MagicMock(spec=PooledMCPClient)
+
+    async def call_tool(tool_name: str, arguments: dict[str, Any]) -> types.CallToolResult:
+        if tool_name == "create_temp_dir":
+            return make_result(json.dumps({"temp_dir": "maps/run-1"}))
+        return make_result(json.dumps(arguments))
+
+    client.call_tool = AsyncMock(side_effect=call_tool)
+    return client
+
+
+class TestWorkspaceTools:
+    """Test cases for hiding and parsing the workspace tools."""
+
+    def test_workspace_tools_and_argument_are_hidden(self) -> None:
+        """The lifecycle tools are dropped and the workspace argument removed."""
+        schemas, workspace_tools = hide_workspace_tools(TOOL_SCHEMAS, WorkspaceConfig())
+
+        assert [tool.name for tool in schemas] == ["build_map", "get_ccri_metadata"]
+        assert schemas[0].input_schema["properties"] == {"layers": {"type": "array"}}
+        assert schemas[0].input_schema["required"] == ["layers"]
+        assert workspace_tools == {"build_map"}
+
+    def test_workspace_id_formats(self) -> None:
+        """The directory is read from a JSON object, a JSON string or plain text."""
+        assert parse_workspace_id(make_result('{"temp_dir": "a"}'), "temp_dir") == "a"
+        assert parse_workspace_id(make_result('"b"'), "temp_dir") == "b"
+        assert parse_workspace_id(make_result("c\n"), "temp_dir") == "c"
+        with pytest.raises(ValueError, match="Could not create workspace"):
+            parse_workspace_id(make_result("disk full", is_error=True), "temp_dir")
+
+
+class TestTempWorkspace:
+    """Test cases for the TempWorkspace class."""
+
+    @pytest.mark.asyncio
+    async def test_workspace_is_created_once_and_deleted(self) -> None:
+        """Concurrent tool calls share one directory, which is deleted at the end."""
+        client = make_client()
+        workspace = TempWorkspace(client, WorkspaceConfig())
+
+        ids = await asyncio.gather(workspace.get_id(), workspace.get_id())
+        await workspace.delete()
+
+        assert ids == ["maps/run-1", "maps/run-1"]
+        assert [call.args for call in client.call_tool.await_args_list] == [
+            ("create_temp_dir", {}),
+            ("delete_temp_dir", {"temp_dir": "maps/run-1"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unused_workspace_is_never_created(self) -> None:
+        """A run that never needs the directory makes no workspace calls."""
+        client = make_client()
+
+        with patch("workspace.get_mcp_client", return_value=client):
+            async with temp_workspace(
+                MCPConfig(datawarehouse_url="dw", rag_url="rag", geospatial_url="geo")
+            ):
+                pass
+
+        client.call_tool.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_workspace_is_deleted_on_error(self) -> None:
+        """The directory is deleted when the run fails."""
+        client = make_client()
+        mcp_config = MCPConfig(datawarehouse_url="dw", rag_url="rag", geospatial_url="geo")
+
+        async def fail_run() -> None:
+            async with temp_workspace(mcp_config) as workspace:
+                assert workspace is not None
+                await workspace.get_id()
+                raise RuntimeError
+
+        with patch("workspace.get_mcp_client", return_value=client):
+            with pytest.raises(RuntimeError):
+                await fail_run()
+
+        assert client.call_tool.await_args.args[0] == "delete_temp_dir"
+
+
+@pytest.mark.asyncio
+async def test_tools_receive_the_run_workspace() -> None:
+    """Tools taking the workspace get the current run's directory filled in."""
+    client = make_client()
+    tools = await build_function_tools(client, TOOL_SCHEMAS, WorkspaceConfig())
+    build_map = next(tool for tool in tools if tool.metadata.name == "build_map")
+    workspace = TempWorkspace(client, WorkspaceConfig())
+
+    output = await run_in_workspace(
+        workspace, asyncio.ensure_future, build_map.acall(layers=["flood"])
+    )
+
+    assert [tool.metadata.name for tool in tools] == ["build_map", "get_ccri_metadata"]
+    assert json.loads(output.raw_output.content[0].text) == {
+        "layers": ["flood"],
+        "temp_dir": "maps/run-1",
+    }